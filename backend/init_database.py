@@ -11,8 +11,7 @@ import os
 # 添加 src 目錄到路徑
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.models.database import engine, Base
-from src.models import User, Resource, Upload, Recommendation
+from src.models.database import engine
 
 def create_database():
     """連接到 Zeabur MySQL 資料庫"""
@@ -42,10 +41,13 @@ def create_database():
     return True
 
 def create_tables():
-    """建立資料表"""
+    """以 migrations 建立或升級資料表"""
     try:
-        # 建立所有表
-        Base.metadata.create_all(bind=engine)
+        from alembic import command
+        from alembic.config import Config
+        
+        # 執行所有尚未套用的遷移（等同 alembic upgrade head）
+        command.upgrade(Config(os.path.join(os.path.dirname(__file__), 'alembic.ini')), "head")
         print("✅ 資料表建立成功")
         
         # 檢查表是否建立
@@ -0,0 +1,111 @@
+"""建立初始資料表（與先前 create_all 建立的結構相同）
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(50), nullable=False),
+        sa.Column("email", sa.String(100), nullable=True),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("full_name", sa.String(100), nullable=True),
+        sa.Column("is_active", sa.String(1), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "resources",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("category", sa.String(100), nullable=True),
+        sa.Column("url", sa.String(500), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_resources_id", "resources", ["id"])
+
+    op.create_table(
+        "uploads",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("filename", sa.String(255), nullable=False),
+        sa.Column("file_path", sa.String(500), nullable=False),
+        sa.Column("file_size", sa.Integer(), nullable=True),
+        sa.Column("data", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_uploads_id", "uploads", ["id"])
+
+    op.create_table(
+        "pdf_uploads",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("filename", sa.String(255), nullable=False),
+        sa.Column("file_path", sa.String(500), nullable=False),
+        sa.Column("file_size", sa.Integer(), nullable=True),
+        sa.Column("raw_text", sa.Text(), nullable=True),
+        sa.Column("processed_data", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("processing_time", sa.Float(), nullable=True),
+        sa.Column("page_count", sa.Integer(), nullable=True),
+        sa.Column("word_count", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_pdf_uploads_id", "pdf_uploads", ["id"])
+
+    op.create_table(
+        "pdf_analyses",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("pdf_upload_id", sa.Integer(), sa.ForeignKey("pdf_uploads.id"), nullable=False),
+        sa.Column("analysis_type", sa.String(50), nullable=False),
+        sa.Column("analysis_data", sa.Text(), nullable=False),
+        sa.Column("confidence_score", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_pdf_analyses_id", "pdf_analyses", ["id"])
+
+    op.create_table(
+        "recommendations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("upload_id", sa.Integer(), sa.ForeignKey("uploads.id"), nullable=True),
+        sa.Column("pdf_upload_id", sa.Integer(), sa.ForeignKey("pdf_uploads.id"), nullable=True),
+        sa.Column("department", sa.String(255), nullable=False),
+        sa.Column("university", sa.String(255), nullable=True),
+        sa.Column("major", sa.String(255), nullable=True),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("reason", sa.Text(), nullable=True),
+        sa.Column("rank", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_recommendations_id", "recommendations", ["id"])
+
+
+def downgrade():
+    op.drop_table("recommendations")
+    op.drop_table("pdf_analyses")
+    op.drop_table("pdf_uploads")
+    op.drop_table("uploads")
+    op.drop_table("resources")
+    op.drop_table("users")
@@ -0,0 +1,57 @@
+"""推薦模型版本、回饋標籤、特徵向量與 MinHash 簽章
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+以 create_all 建立、且已包含這些欄位的資料庫會略過已存在的部分。
+"""
+
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def _columns(inspector, table):
+    """資料表現有的欄位（--sql 離線模式無法檢查，視為皆不存在）"""
+    if inspector is None:
+        return set()
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def upgrade():
+    inspector = None if context.is_offline_mode() else sa.inspect(op.get_bind())
+
+    if "model_version" not in _columns(inspector, "recommendations"):
+        op.add_column("recommendations", sa.Column("model_version", sa.String(64), nullable=True))
+
+    pdf_upload_columns = _columns(inspector, "pdf_uploads")
+    if "feature_vector" not in pdf_upload_columns:
+        op.add_column("pdf_uploads", sa.Column("feature_vector", sa.LargeBinary(), nullable=True))
+    if "minhash_signature" not in pdf_upload_columns:
+        op.add_column("pdf_uploads", sa.Column("minhash_signature", sa.LargeBinary(), nullable=True))
+
+    if inspector is None or not inspector.has_table("recommendation_feedback"):
+        op.create_table(
+            "recommendation_feedback",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("recommendation_id", sa.Integer(), sa.ForeignKey("recommendations.id"), nullable=True),
+            sa.Column("upload_id", sa.Integer(), sa.ForeignKey("uploads.id"), nullable=True),
+            sa.Column("pdf_upload_id", sa.Integer(), sa.ForeignKey("pdf_uploads.id"), nullable=True),
+            sa.Column("accepted", sa.String(1), nullable=False),
+            sa.Column("department", sa.String(255), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_recommendation_feedback_id", "recommendation_feedback", ["id"])
+
+
+def downgrade():
+    op.drop_table("recommendation_feedback")
+    op.drop_column("pdf_uploads", "minhash_signature")
+    op.drop_column("pdf_uploads", "feature_vector")
+    op.drop_column("recommendations", "model_version")
@@ -0,0 +1,44 @@
+"""熱門查詢的複合索引：先以 user_id 篩選，再依分數、上傳記錄或建立時間取資料
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# 索引名稱 -> (資料表, 欄位)，與模型的 __table_args__ 一致
+INDEXES = {
+    "ix_recommendations_user_score": ("recommendations", ["user_id", "score"]),
+    "ix_recommendations_user_upload": ("recommendations", ["user_id", "upload_id"]),
+    "ix_recommendations_user_pdf_upload": ("recommendations", ["user_id", "pdf_upload_id"]),
+    "ix_uploads_user_created": ("uploads", ["user_id", "created_at"]),
+    "ix_pdf_uploads_user_created": ("pdf_uploads", ["user_id", "created_at"]),
+}
+
+
+def upgrade():
+    # 近期以 create_all 建立的資料庫已有這些索引，略過已存在的索引
+    existing = set()
+    if not context.is_offline_mode():
+        inspector = sa.inspect(op.get_bind())
+        for table in {table for table, _ in INDEXES.values()}:
+            existing.update(index["name"] for index in inspector.get_indexes(table))
+    for name, (table, columns) in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    # MySQL 建立複合索引後會捨棄外鍵自動建立的 user_id 索引，刪除前需先補回，否則外鍵無索引可用
+    if op.get_bind().dialect.name == "mysql":
+        for table in sorted({table for table, _ in INDEXES.values()}):
+            op.create_index(f"ix_{table}_user_id", table, ["user_id"])
+    for name, (table, _) in reversed(list(INDEXES.items())):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,28 @@
+"""唯讀副本複寫延遲量測用的心跳表
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    heartbeat = op.create_table(
+        "replication_heartbeat",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("beat_ms", sa.BigInteger(), nullable=False),
+    )
+    # 只有一列，各 worker 以 UPDATE 更新，不會同時 INSERT 衝突
+    op.bulk_insert(heartbeat, [{"id": 1, "beat_ms": 0}])
+
+
+def downgrade():
+    op.drop_table("replication_heartbeat")
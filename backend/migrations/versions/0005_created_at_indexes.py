@@ -0,0 +1,29 @@
+"""上傳建立時間索引：保留與歸檔依 created_at 篩選過期上傳
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# 索引名稱 -> (資料表, 欄位)，與模型的 __table_args__ 一致
+INDEXES = {
+    "ix_uploads_created_id": ("uploads", ["created_at", "id"]),
+    "ix_pdf_uploads_created_id": ("pdf_uploads", ["created_at", "id"]),
+}
+
+
+def upgrade():
+    for name, (table, columns) in INDEXES.items():
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, (table, _) in reversed(list(INDEXES.items())):
+        op.drop_index(name, table_name=table)
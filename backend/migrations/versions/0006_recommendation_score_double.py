@@ -0,0 +1,25 @@
+"""推薦分數改為雙精度：MySQL 的 FLOAT 為單精度，與游標中的十進位值比較時同分的資料列會被略過
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite 以重建資料表的方式變更型別（REAL 本來就是雙精度）
+    with op.batch_alter_table("recommendations") as batch_op:
+        batch_op.alter_column("score", type_=sa.Double(), existing_type=sa.Float(), existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table("recommendations") as batch_op:
+        batch_op.alter_column("score", type_=sa.Float(), existing_type=sa.Double(), existing_nullable=False)
@@ -0,0 +1,87 @@
+"""
+管理控制器
+模型熱更新等內部管理端點，需帶入 X-Admin-Token
+"""
+
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from typing import Optional
+from ..config import ADMIN_TOKEN
+
+admin_router = APIRouter(prefix="/api/admin", tags=["管理"])
+
+def verify_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """驗證管理權杖（未設定 ADMIN_TOKEN 時停用所有管理端點）"""
+    # 固定時間比較，避免以回應時間逐字元猜出權杖（以位元組比較，非 ASCII 的標頭也不會出錯）
+    if not ADMIN_TOKEN or not secrets.compare_digest((x_admin_token or "").encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access denied"
+        )
+
+@admin_router.get("/model", dependencies=[Depends(verify_admin_token)])
+async def get_model_status():
+    """獲取使用中的模型版本與可用版本"""
+    from ..services.model_registry import model_registry
+    return model_registry.status()
+
+@admin_router.post("/model/reload", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(verify_admin_token)])
+async def reload_model(version: Optional[str] = None):
+    """在背景載入指定（預設最新）版本的模型，預熱後切換"""
+    from ..services.model_registry import model_registry
+    
+    target = version or (model_registry.list_versions() or [None])[-1]
+    if target is None or target not in model_registry.list_versions():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Model bundle not found"
+        )
+    
+    model_registry.reload_in_background(target)
+    return {
+        "message": "Model reload started",
+        "target_version": target,
+        "active_version": model_registry.active_version
+    }
+
+@admin_router.get("/recommenders", dependencies=[Depends(verify_admin_token)])
+async def get_recommender_status():
+    """獲取推薦引擎狀態與各引擎最近的延遲百分位數"""
+    from ..services.recommender_registry import recommender_registry
+    return recommender_registry.status()
+
+@admin_router.get("/db-pool", dependencies=[Depends(verify_admin_token)])
+async def get_db_pool_status():
+    """獲取本 worker 資料庫連線池的即時狀態（使用中、溢出與取得連線耗時）"""
+    from ..models.database import pool_status
+    return pool_status()
+
+@admin_router.get("/db-replica", dependencies=[Depends(verify_admin_token)])
+async def get_db_replica_status():
+    """獲取唯讀副本的複寫延遲、是否可用與讀取分流次數"""
+    from ..services.replica_routing import replica_router
+    return replica_router.status()
+
+@admin_router.get("/sql", dependencies=[Depends(verify_admin_token)])
+async def get_sql_stats():
+    """獲取本 worker 各路由每個請求的平均查詢數、資料庫耗時與最慢的語句"""
+    from ..services.query_stats import route_query_stats
+    return route_query_stats.status()
+
+@admin_router.get("/retention", dependencies=[Depends(verify_admin_token)])
+async def get_retention_status():
+    """獲取上傳記錄保留設定、待歸檔筆數與最近一次歸檔結果"""
+    from ..services.retention import retention_job
+    from ..models.database import SessionLocal
+    from ..services.executors import run_in_db_pool
+    
+    def count():
+        db = SessionLocal()
+        try:
+            return retention_job.count_candidates(db)
+        finally:
+            db.close()
+    
+    status = retention_job.status()
+    status["pending"] = await run_in_db_pool(count) if retention_job.enabled else None
+    return status
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from ..models.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.database import get_async_db
 from ..models.schemas import LoginRequest, RegisterRequest, LoginResponse, UserResponse
 from ..services.auth_service import AuthService
+from ..services.replica_routing import get_async_read_db
 
 auth_router = APIRouter(prefix="/api/auth", tags=["認證"])
 security = HTTPBearer()
@@ -11,11 +12,11 @@ security = HTTPBearer()
 @auth_router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: RegisterRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """用戶註冊"""
     try:
-        user = AuthService.register_user(db, user_data)
+        user = await AuthService.register_user(db, user_data)
         return UserResponse(
             id=user.id,
             username=user.username,
@@ -36,11 +37,11 @@ async def register(
 @auth_router.post("/login", response_model=LoginResponse)
 async def login(
     login_data: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """用戶登入"""
     try:
-        user = AuthService.authenticate_user(db, login_data)
+        user = await AuthService.authenticate_user(db, login_data)
         access_token = AuthService.create_access_token(data={"sub": user.username})
         
         return LoginResponse(
@@ -67,12 +68,12 @@ async def login(
 @auth_router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """獲取當前用戶資訊"""
     try:
         username = AuthService.verify_token(credentials.credentials)
-        user = AuthService.get_user_by_username(db, username)
+        user = await AuthService.get_user_by_username(db, username)
         
         return UserResponse(
             id=user.id,
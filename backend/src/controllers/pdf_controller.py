@@ -3,35 +3,47 @@ PDF 上傳控制器
 處理 PDF 檔案上傳相關的 API 端點
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from typing import List
-from ..models.database import get_db
-from ..models.schemas import PDFUploadResponse, PDFUploadInfo
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from ..config import PAGINATION_MAX_LIMIT
+from ..models.database import get_async_db
+from ..models.pdf_upload import PDFUpload
+from ..models.schemas import PDFUploadResponse, PDFUploadInfo, PDFUploadListResponse, SimilarApplicantsResponse
+from ..repositories.pagination import InvalidCursor
 from ..services.auth_service import AuthService
 from ..services.pdf_service import PDFService
+from ..services.replica_routing import get_async_read_db
 
 pdf_router = APIRouter(prefix="/api", tags=["PDF 上傳"])
 security = HTTPBearer()
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """獲取當前用戶"""
     username = AuthService.verify_token(credentials.credentials)
-    return AuthService.get_user_by_username(db, username)
+    return await AuthService.get_user_by_username(db, username)
+
+async def get_current_reader(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """獲取當前用戶（唯讀端點，可讀取副本）"""
+    username = AuthService.verify_token(credentials.credentials)
+    return await AuthService.get_user_by_username(db, username)
 
 @pdf_router.post("/upload/pdf", response_model=PDFUploadResponse)
 async def upload_pdf(
     file: UploadFile = File(...),
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """上傳 PDF 備審資料"""
     try:
-        result = PDFService.process_pdf_upload(db, file, current_user.id)
+        result = await PDFService.process_pdf_upload(db, file, current_user.id)
         return PDFUploadResponse(**result)
         
     except HTTPException:
@@ -42,17 +54,18 @@ async def upload_pdf(
             detail=f"PDF 上傳失敗: {str(e)}"
         )
 
-@pdf_router.get("/pdf-uploads", response_model=List[PDFUploadInfo])
+@pdf_router.get("/pdf-uploads", response_model=PDFUploadListResponse)
 async def get_user_pdf_uploads(
-    skip: int = 0,
-    limit: int = 100,
-    current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=PAGINATION_MAX_LIMIT),
+    include_total: bool = False,
+    current_user = Depends(get_current_reader),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """獲取用戶的 PDF 上傳記錄"""
+    """獲取用戶的 PDF 上傳記錄（最新的在前，以上一頁的 next_cursor 取得下一頁）"""
     try:
-        uploads = PDFService.get_user_pdf_uploads(db, current_user.id, skip, limit)
-        return [PDFUploadInfo(
+        page = await PDFService.get_user_pdf_uploads(db, current_user.id, cursor, limit)
+        uploads = [PDFUploadInfo(
             id=upload.id,
             filename=upload.filename,
             file_size=upload.file_size,
@@ -61,8 +74,17 @@ async def get_user_pdf_uploads(
             status=upload.status,
             processing_time=upload.processing_time,
             created_at=upload.created_at
-        ) for upload in uploads]
+        ) for upload in page.items]
+        
+        return PDFUploadListResponse(
+            uploads=uploads,
+            next_cursor=page.next_cursor,
+            total=await PDFService.count_user_pdf_uploads(db, current_user.id) if include_total else None,
+            user_id=current_user.id
+        )
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -73,17 +95,19 @@ async def get_user_pdf_uploads(
 async def get_pdf_upload_detail(
     upload_id: int,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """獲取特定 PDF 上傳的詳細資訊"""
     try:
-        upload = PDFService.get_pdf_upload_by_id(db, upload_id, current_user.id)
+        # 原始文字只取預覽（資料庫端截取），不載入整份文字
+        detail = await PDFService.get_pdf_upload_detail(db, upload_id, current_user.id)
         
-        if not upload:
+        if not detail:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="PDF 上傳記錄不存在"
             )
+        upload, raw_text_preview = detail
         
         # 解析處理後的資料
         analysis_result = None
@@ -91,6 +115,10 @@ async def get_pdf_upload_detail(
             import json
             analysis_result = json.loads(upload.processed_data)
         
+        # 內容近似的其他上傳（估計 Jaccard 相似度；索引模組延遲匯入）
+        from ..services.duplicate_detection import find_near_duplicates
+        near_duplicates = await find_near_duplicates(db, upload)
+        
         return {
             "id": upload.id,
             "filename": upload.filename,
@@ -101,7 +129,8 @@ async def get_pdf_upload_detail(
             "processing_time": upload.processing_time,
             "created_at": upload.created_at,
             "analysis_result": analysis_result,
-            "raw_text_preview": upload.raw_text[:500] + "..." if upload.raw_text and len(upload.raw_text) > 500 else upload.raw_text
+            "near_duplicates": near_duplicates,
+            "raw_text_preview": raw_text_preview
         }
         
     except HTTPException:
@@ -112,15 +141,44 @@ async def get_pdf_upload_detail(
             detail=f"獲取 PDF 詳細資訊失敗: {str(e)}"
         )
 
+@pdf_router.get("/pdf-uploads/{upload_id}/similar", response_model=SimilarApplicantsResponse)
+async def get_similar_pdf_uploads(
+    upload_id: int,
+    k: int = Query(10, ge=1, le=100),
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """查詢與此份備審相似的過往申請者及其去向"""
+    try:
+        upload = await PDFService.get_pdf_upload_by_id(db, upload_id, current_user.id, PDFUpload.feature_vector)
+        
+        if not upload:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="PDF 上傳記錄不存在"
+            )
+        
+        from ..services.similar_applicants import get_similar_applicants
+        similar = await get_similar_applicants(db, upload, k)
+        return SimilarApplicantsResponse(upload_id=upload_id, similar=similar)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"查詢相似申請者失敗: {str(e)}"
+        )
+
 @pdf_router.delete("/pdf-uploads/{upload_id}")
 async def delete_pdf_upload(
     upload_id: int,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """刪除 PDF 上傳記錄"""
     try:
-        upload = PDFService.get_pdf_upload_by_id(db, upload_id, current_user.id)
+        upload = await PDFService.get_pdf_upload_by_id(db, upload_id, current_user.id)
         
         if not upload:
             raise HTTPException(
@@ -128,14 +186,7 @@ async def delete_pdf_upload(
                 detail="PDF 上傳記錄不存在"
             )
         
-        # 刪除檔案
-        import os
-        if os.path.exists(upload.file_path):
-            os.remove(upload.file_path)
-        
-        # 刪除資料庫記錄
-        db.delete(upload)
-        db.commit()
+        await PDFService.delete_pdf_upload(db, upload)
         
         return {"message": "PDF 上傳記錄已刪除"}
         
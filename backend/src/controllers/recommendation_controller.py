@@ -1,31 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from ..models.database import get_db
-from ..models.schemas import RecommendationListResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import PAGINATION_MAX_LIMIT
+from ..models.database import get_async_db
+from ..models.schemas import RecommendationListResponse, RecommendationFeedbackRequest, RecommendationFeedbackResponse
+from ..repositories.pagination import InvalidCursor
 from ..services.auth_service import AuthService
 from ..services.recommendation_service import RecommendationService
+from ..services.replica_routing import get_async_read_db
 
 recommendation_router = APIRouter(prefix="/api", tags=["推薦"])
 security = HTTPBearer()
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """獲取當前用戶"""
     username = AuthService.verify_token(credentials.credentials)
-    return AuthService.get_user_by_username(db, username)
+    return await AuthService.get_user_by_username(db, username)
+
+async def get_current_reader(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """獲取當前用戶（唯讀端點，可讀取副本）"""
+    username = AuthService.verify_token(credentials.credentials)
+    return await AuthService.get_user_by_username(db, username)
 
 @recommendation_router.get("/recommendation/{user_id}", response_model=RecommendationListResponse)
 async def get_recommendation(
     user_id: int,
-    skip: int = 0,
-    limit: int = 100,
-    current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=PAGINATION_MAX_LIMIT),
+    include_total: bool = False,
+    current_user = Depends(get_current_reader),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """獲取學系推薦結果"""
+    """獲取學系推薦結果（依分數遞減，以上一頁的 next_cursor 取得下一頁）"""
     try:
         # 檢查用戶權限
         if current_user.id != user_id:
@@ -34,14 +47,16 @@ async def get_recommendation(
                 detail="Not authorized to access this user's recommendations"
             )
         
-        recommendations = RecommendationService.get_user_recommendations(
-            db, user_id, skip, limit
+        recommendations = await RecommendationService.get_user_recommendations(
+            db, user_id, cursor, limit, include_total
         )
         
         return recommendations
         
     except HTTPException:
         raise
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -50,12 +65,12 @@ async def get_recommendation(
 
 @recommendation_router.get("/recommendation/me/latest")
 async def get_my_latest_recommendations(
-    current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user = Depends(get_current_reader),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """獲取當前用戶的最新推薦結果"""
     try:
-        recommendations = RecommendationService.get_latest_recommendations(
+        recommendations = await RecommendationService.get_latest_recommendations(
             db, current_user.id
         )
         
@@ -70,3 +85,24 @@ async def get_my_latest_recommendations(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get latest recommendations: {str(e)}"
         )
+
+@recommendation_router.post("/recommendation/{recommendation_id}/feedback", response_model=RecommendationFeedbackResponse)
+async def submit_recommendation_feedback(
+    recommendation_id: int,
+    feedback: RecommendationFeedbackRequest,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """回饋推薦結果（接受與否、最終選擇的學系）"""
+    try:
+        return await RecommendationService.submit_feedback(
+            db, current_user.id, recommendation_id, feedback
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to submit feedback: {str(e)}"
+        )
@@ -1,21 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..models.database import get_db
-from ..models.schemas import ResourceCreate, ResourceResponse
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import PAGINATION_MAX_LIMIT
+from ..models.database import get_async_db
+from ..models.schemas import ResourceCreate, ResourceResponse, ResourceListResponse
 from ..models.resource import Resource
+from ..repositories.pagination import InvalidCursor
+from ..repositories.resource_repository import ResourceRepository
+from ..services.replica_routing import get_async_read_db
 
 resource_router = APIRouter(prefix="/api", tags=["資源管理"])
 
-@resource_router.get("/resources", response_model=list[ResourceResponse])
+@resource_router.get("/resources", response_model=ResourceListResponse)
 async def get_resources(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=PAGINATION_MAX_LIMIT),
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """獲取資源列表"""
+    """獲取資源列表（以上一頁的 next_cursor 取得下一頁）"""
     try:
-        resources = db.query(Resource).offset(skip).limit(limit).all()
-        return resources
+        page = await ResourceRepository.list_all(db, cursor, limit)
+        return ResourceListResponse(
+            resources=page.items,
+            next_cursor=page.next_cursor,
+            total=await ResourceRepository.count_all(db) if include_total else None
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -25,11 +37,11 @@ async def get_resources(
 @resource_router.get("/resources/{resource_id}", response_model=ResourceResponse)
 async def get_resource(
     resource_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """獲取單一資源"""
     try:
-        resource = db.query(Resource).filter(Resource.id == resource_id).first()
+        resource = await ResourceRepository.get_by_id(db, resource_id)
         if not resource:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -47,15 +59,12 @@ async def get_resource(
 @resource_router.post("/resources", response_model=ResourceResponse, status_code=status.HTTP_201_CREATED)
 async def create_resource(
     resource: ResourceCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """建立新資源"""
     try:
         db_resource = Resource(**resource.dict())
-        db.add(db_resource)
-        db.commit()
-        db.refresh(db_resource)
-        return db_resource
+        return await ResourceRepository.save(db, db_resource)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -66,23 +75,18 @@ async def create_resource(
 async def update_resource(
     resource_id: int,
     resource: ResourceCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """更新資源"""
     try:
-        db_resource = db.query(Resource).filter(Resource.id == resource_id).first()
+        db_resource = await ResourceRepository.get_by_id(db, resource_id)
         if not db_resource:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Resource not found"
             )
         
-        for key, value in resource.dict().items():
-            setattr(db_resource, key, value)
-        
-        db.commit()
-        db.refresh(db_resource)
-        return db_resource
+        return await ResourceRepository.save(db, db_resource, resource.dict())
     except HTTPException:
         raise
     except Exception as e:
@@ -94,19 +98,18 @@ async def update_resource(
 @resource_router.delete("/resources/{resource_id}")
 async def delete_resource(
     resource_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """刪除資源"""
     try:
-        db_resource = db.query(Resource).filter(Resource.id == resource_id).first()
+        db_resource = await ResourceRepository.get_by_id(db, resource_id)
         if not db_resource:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Resource not found"
             )
         
-        db.delete(db_resource)
-        db.commit()
+        await ResourceRepository.delete(db, db_resource)
         return {"message": "Resource deleted successfully"}
     except HTTPException:
         raise
@@ -1,44 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from ..models.database import get_db
-from ..models.schemas import UploadResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import PAGINATION_MAX_LIMIT
+from ..models.database import get_async_db
+from ..models.schemas import UploadResponse, UploadListResponse, UploadDetailResponse
+from ..repositories.pagination import InvalidCursor
 from ..services.auth_service import AuthService
 from ..services.upload_service import UploadService
-from ..services.recommendation_service import RecommendationService
-import json
+from ..services.replica_routing import get_async_read_db
 
 upload_router = APIRouter(prefix="/api", tags=["上傳"])
 security = HTTPBearer()
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """獲取當前用戶"""
     username = AuthService.verify_token(credentials.credentials)
-    return AuthService.get_user_by_username(db, username)
+    return await AuthService.get_user_by_username(db, username)
+
+async def get_current_reader(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """獲取當前用戶（唯讀端點，可讀取副本）"""
+    username = AuthService.verify_token(credentials.credentials)
+    return await AuthService.get_user_by_username(db, username)
 
 @upload_router.post("/upload", response_model=UploadResponse)
 async def upload_file(
     file: UploadFile = File(...),
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """上傳備審資料 JSON 檔案"""
     try:
-        # 處理檔案上傳
-        upload_response = UploadService.process_upload(db, file, current_user)
-        
-        # 獲取上傳的 JSON 資料
-        upload_record = db.query(Upload).filter(Upload.id == upload_response.upload_id).first()
-        if upload_record and upload_record.data:
-            json_data = json.loads(upload_record.data)
-            
-            # 生成推薦結果
-            RecommendationService.generate_recommendations(
-                db, current_user.id, upload_record.id, json_data
-            )
+        # 處理檔案上傳並生成推薦
+        upload_response = await UploadService.process_upload(db, file, current_user)
         
         return upload_response
         
@@ -50,23 +51,59 @@ async def upload_file(
             detail=f"Upload failed: {str(e)}"
         )
 
-@upload_router.get("/uploads")
+@upload_router.get("/uploads", response_model=UploadListResponse)
 async def get_user_uploads(
-    skip: int = 0,
-    limit: int = 100,
-    current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=PAGINATION_MAX_LIMIT),
+    include_total: bool = False,
+    current_user = Depends(get_current_reader),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """獲取用戶上傳記錄"""
+    """獲取用戶上傳記錄（只含中繼資料，最新的在前，以上一頁的 next_cursor 取得下一頁）"""
     try:
-        uploads = UploadService.get_user_uploads(db, current_user.id, skip, limit)
-        return {
-            "uploads": uploads,
-            "total": len(uploads),
-            "user_id": current_user.id
-        }
+        page = await UploadService.get_user_uploads(db, current_user.id, cursor, limit)
+        return UploadListResponse(
+            uploads=page.items,
+            next_cursor=page.next_cursor,
+            total=await UploadService.count_user_uploads(db, current_user.id) if include_total else None,
+            user_id=current_user.id
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get uploads: {str(e)}"
         )
+
+@upload_router.get("/uploads/{upload_id}", response_model=UploadDetailResponse)
+async def get_upload_detail(
+    upload_id: int,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """獲取上傳記錄與 JSON 資料"""
+    try:
+        upload = await UploadService.get_upload_by_id(db, upload_id, current_user.id)
+        if not upload:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload not found"
+            )
+        
+        return UploadDetailResponse(
+            id=upload.id,
+            filename=upload.filename,
+            file_size=upload.file_size,
+            status=upload.status,
+            created_at=upload.created_at,
+            updated_at=upload.updated_at,
+            data=json.loads(upload.data) if upload.data else None
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get upload: {str(e)}"
+        )
@@ -1,11 +1,17 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from .config import APP_NAME, APP_VERSION, APP_DESCRIPTION, ALLOWED_ORIGINS
+from fastapi.responses import PlainTextResponse
+from .config import APP_NAME, APP_VERSION, APP_DESCRIPTION, ALLOWED_ORIGINS, SQL_DEBUG_HEADERS
 from .routes import main_router
-from .models.database import engine, Base
+from .models.database import pool_status, dispose_async_engine
+from .services.metrics import metrics
+from .services.executors import shutdown_executors
+from .services.department_catalog import get_department_catalog
+from .services.replica_routing import STICKY_HEADER, WRITE_METHODS, replica_router
+from .services.query_stats import route_query_stats, start_request
+from .services.retention import retention_job
 
-# 建立資料表
-Base.metadata.create_all(bind=engine)
+# 資料表由 migrations 建立（部署時執行 alembic upgrade head），啟動時不執行 DDL
 
 # 創建 FastAPI 應用程式
 app = FastAPI(
@@ -23,8 +29,49 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[STICKY_HEADER],  # 前端讀取後帶回，寫入後的查詢改讀主庫
 )
 
+@app.middleware("http")
+async def mark_client_writes(request: Request, call_next):
+    """成功的寫入請求之後，同一客戶端短時間內的唯讀查詢改讀主庫（讀到自己的寫入）"""
+    response = await call_next(request)
+    if request.method in WRITE_METHODS and response.status_code < 400 and replica_router.enabled:
+        replica_router.mark_write(request, response)
+    return response
+
+@app.middleware("http")
+async def record_request_queries(request: Request, call_next):
+    """記錄每個請求的 SQL 數與資料庫耗時（SQL_DEBUG_HEADERS 開啟時輸出於回應標頭）"""
+    stats = start_request()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    route_query_stats.observe(f"{request.method} {route.path if route is not None else 'unmatched'}", stats)
+    if SQL_DEBUG_HEADERS:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.seconds * 1000:.3f}"
+        response.headers["X-DB-Slowest-Ms"] = f"{stats.slowest_seconds * 1000:.3f}"
+        if stats.slowest_statement:
+            response.headers["X-DB-Slowest-Statement"] = stats.slowest_statement.encode("ascii", "replace").decode("ascii")
+        if stats.repeated:
+            response.headers["X-DB-Repeated-Statements"] = str(len(stats.repeated))
+    return response
+
+@app.on_event("startup")
+async def on_startup():
+    """載入學系目錄並啟動副本延遲量測與上傳記錄歸檔"""
+    get_department_catalog()
+    replica_router.start()
+    retention_job.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """關閉阻塞工作池、背景工作與非同步資料庫連線"""
+    await retention_job.stop()
+    shutdown_executors()
+    await replica_router.stop()
+    await dispose_async_engine()
+
 # 根路由
 @app.get("/")
 async def root():
@@ -42,6 +89,25 @@ async def health_check():
         "version": APP_VERSION
     }
 
+# 連線池狀態 -> 指標說明（於輸出 /metrics 時更新）
+POOL_GAUGES = {
+    "checked_out": "使用中的資料庫連線數",
+    "checked_in": "連線池中閒置的資料庫連線數",
+    "overflow": "超出 pool_size 的溢出連線數",
+    "checkouts": "累計取得連線次數",
+    "wait_seconds_total": "累計取得連線耗時（秒）",
+    "timeouts": "等待連線逾時次數"
+}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus 格式的程序內指標"""
+    status = pool_status()
+    for key, description in POOL_GAUGES.items():
+        if key in status:
+            metrics.gauge(f"db_pool_{key}", description).set(status[key])
+    return PlainTextResponse(metrics.render())
+
 # 包含所有路由
 app.include_router(main_router)
 
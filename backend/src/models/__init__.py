@@ -4,6 +4,8 @@ from .resource import Resource
 from .upload import Upload
 from .pdf_upload import PDFUpload, PDFAnalysis
 from .recommendation import Recommendation
+from .feedback import RecommendationFeedback
+from .replication import ReplicationHeartbeat
 
 __all__ = [
     "engine",
@@ -14,5 +16,7 @@ __all__ = [
     "Upload",
     "PDFUpload",
     "PDFAnalysis",
-    "Recommendation"
+    "Recommendation",
+    "RecommendationFeedback",
+    "ReplicationHeartbeat"
 ]
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from .database import Base
+from datetime import datetime
+
+class RecommendationFeedback(Base):
+    __tablename__ = "recommendation_feedback"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    recommendation_id = Column(Integer, ForeignKey("recommendations.id"), nullable=True)
+    upload_id = Column(Integer, ForeignKey("uploads.id"), nullable=True)
+    pdf_upload_id = Column(Integer, ForeignKey("pdf_uploads.id"), nullable=True)
+    accepted = Column(String(1), default="Y", nullable=False)  # 是否接受此推薦 Y/N
+    department = Column(String(255), nullable=True)  # 學生最終選擇的學系（訓練標籤）
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # 關聯
+    recommendation = relationship("Recommendation")
@@ -1,22 +1,29 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Float, LargeBinary, Index
+from sqlalchemy.orm import deferred, relationship
 from .database import Base
 from datetime import datetime
 
 class PDFUpload(Base):
     __tablename__ = "pdf_uploads"
+    __table_args__ = (
+        Index("ix_pdf_uploads_user_created", "user_id", "created_at"),  # 用戶上傳列表分頁
+        Index("ix_pdf_uploads_created_id", "created_at", "id"),  # 歸檔過期上傳
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     filename = Column(String(255), nullable=False)
     file_path = Column(String(500), nullable=False)
     file_size = Column(Integer, nullable=True)
-    raw_text = Column(Text, nullable=True)  # 提取的原始文字
-    processed_data = Column(Text, nullable=True)  # 處理後的 JSON 資料
+    # 大型欄位延遲載入：列表查詢只讀取中繼資料，需要時以 undefer() 明確載入
+    raw_text = deferred(Column(Text, nullable=True))  # 提取的原始文字
+    processed_data = deferred(Column(Text, nullable=True))  # 處理後的 JSON 資料
     status = Column(String(20), default="uploaded", nullable=False)  # uploaded, processing, completed, failed
     processing_time = Column(Float, nullable=True)  # 處理時間（秒）
     page_count = Column(Integer, nullable=True)  # PDF 頁數
     word_count = Column(Integer, nullable=True)  # 文字字數
+    feature_vector = deferred(Column(LargeBinary, nullable=True))  # 分析結果的特徵向量（float32），供相似申請者查詢
+    minhash_signature = deferred(Column(LargeBinary, nullable=True))  # 原始文字的 MinHash 簽章（uint32），供近似重複偵測
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
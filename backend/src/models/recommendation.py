@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Double, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 from datetime import datetime
 
 class Recommendation(Base):
     __tablename__ = "recommendations"
+    __table_args__ = (
+        # 依用戶查詢並依分數排序、依上傳記錄取推薦（由 migrations 建立）
+        Index("ix_recommendations_user_score", "user_id", "score"),
+        Index("ix_recommendations_user_upload", "user_id", "upload_id"),
+        Index("ix_recommendations_user_pdf_upload", "user_id", "pdf_upload_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -13,9 +19,10 @@ class Recommendation(Base):
     department = Column(String(255), nullable=False)
     university = Column(String(255))
     major = Column(String(255))
-    score = Column(Float, nullable=False)
+    score = Column(Double, nullable=False)  # 雙精度：分頁游標以分數比較，單精度會漏掉同分的資料列
     reason = Column(Text)
     rank = Column(Integer, nullable=True)  # 推薦排名
+    model_version = Column(String(64), nullable=True)  # 產生推薦的模型版本
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # 關聯
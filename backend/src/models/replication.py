@@ -0,0 +1,8 @@
+from sqlalchemy import Column, Integer, BigInteger
+from .database import Base
+
+class ReplicationHeartbeat(Base):
+    __tablename__ = "replication_heartbeat"
+    
+    id = Column(Integer, primary_key=True)
+    beat_ms = Column(BigInteger, nullable=False, default=0)  # 主庫最後一次寫入心跳的時間（Unix 毫秒），從副本讀回即可估計複寫延遲
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 
 # 用戶相關 Schema
 class UserBase(BaseModel):
@@ -47,6 +47,26 @@ class UploadResponse(BaseModel):
     upload_id: int
     status: str
 
+class UploadInfo(BaseModel):
+    id: int
+    filename: str
+    file_size: Optional[int] = None
+    status: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class UploadListResponse(BaseModel):
+    uploads: List[UploadInfo]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    user_id: int
+
+class UploadDetailResponse(UploadInfo):
+    data: Optional[Dict[str, Any]] = None
+
 # 推薦相關 Schema
 class RecommendationResponse(BaseModel):
     id: int
@@ -56,6 +76,7 @@ class RecommendationResponse(BaseModel):
     score: float
     reason: Optional[str] = None
     rank: Optional[int] = None
+    model_version: Optional[str] = None
     created_at: datetime
     
     class Config:
@@ -63,9 +84,24 @@ class RecommendationResponse(BaseModel):
 
 class RecommendationListResponse(BaseModel):
     recommendations: List[RecommendationResponse]
-    total: int
+    next_cursor: Optional[str] = None  # 下一頁游標（沒有下一頁時為 None）
+    total: Optional[int] = None  # include_total=true 時才回傳
     user_id: int
 
+class RecommendationFeedbackRequest(BaseModel):
+    accepted: bool
+    chosen_department: Optional[str] = None
+
+class RecommendationFeedbackResponse(BaseModel):
+    id: int
+    recommendation_id: int
+    accepted: str
+    department: Optional[str] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
 # PDF 上傳相關 Schema
 class PDFUploadResponse(BaseModel):
     message: str
@@ -90,6 +126,24 @@ class PDFUploadInfo(BaseModel):
     class Config:
         from_attributes = True
 
+class PDFUploadListResponse(BaseModel):
+    uploads: List[PDFUploadInfo]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    user_id: int
+
+class SimilarApplicant(BaseModel):
+    upload_id: int
+    distance: float
+    similarity: float
+    recommended_department: Optional[str] = None
+    chosen_department: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class SimilarApplicantsResponse(BaseModel):
+    upload_id: int
+    similar: List[SimilarApplicant]
+
 # 資源相關 Schema
 class ResourceCreate(BaseModel):
     title: str
@@ -108,3 +162,8 @@ class ResourceResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class ResourceListResponse(BaseModel):
+    resources: List[ResourceResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
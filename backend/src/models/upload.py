@@ -1,17 +1,21 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
+from sqlalchemy.orm import deferred, relationship
 from .database import Base
 from datetime import datetime
 
 class Upload(Base):
     __tablename__ = "uploads"
+    __table_args__ = (
+        Index("ix_uploads_user_created", "user_id", "created_at"),  # 用戶最新上傳與分頁
+        Index("ix_uploads_created_id", "created_at", "id"),  # 歸檔過期上傳
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     filename = Column(String(255), nullable=False)
     file_path = Column(String(500), nullable=False)
     file_size = Column(Integer, nullable=True)
-    data = Column(Text)  # JSON 資料
+    data = deferred(Column(Text))  # JSON 資料（延遲載入，列表查詢不讀取）
     status = Column(String(20), default="pending", nullable=False)  # pending, processing, completed, failed
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,18 @@
+"""
+非同步資料存取層
+以 AsyncSession 執行查詢，I/O 等待期間不佔用事件迴圈
+"""
+
+from .user_repository import UserRepository
+from .upload_repository import UploadRepository
+from .recommendation_repository import RecommendationRepository
+from .pdf_upload_repository import PDFUploadRepository
+from .resource_repository import ResourceRepository
+
+__all__ = [
+    "UserRepository",
+    "UploadRepository",
+    "RecommendationRepository",
+    "PDFUploadRepository",
+    "ResourceRepository"
+]
@@ -0,0 +1,137 @@
+"""
+Keyset（游標）分頁
+依索引欄位排序，下一頁從上一頁最後一列的排序值之後查詢（WHERE (score, id) < (?, ?)），
+深頁不需掃描並捨棄前面的資料列；游標是排序值經 base64 編碼的不透明字串。
+總數改為選用，並在程序內快取 PAGINATION_COUNT_CACHE_TTL 秒，寫入時清除。
+"""
+
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from ..config import PAGINATION_COUNT_CACHE_SIZE, PAGINATION_COUNT_CACHE_TTL
+
+# 排序欄位與是否遞減；最後一個欄位必須唯一（主鍵），排序才不會重複或遺漏資料列
+OrderSpec = Sequence[Tuple[Any, bool]]
+
+class InvalidCursor(ValueError):
+    """游標格式錯誤或與此列表的排序欄位不符"""
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """排序值編碼為游標"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, order_by: OrderSpec) -> List[Any]:
+    """游標解碼為排序值（依欄位型別還原日期時間）"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw.decode("utf-8"))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"無效的游標: {e}")
+    if not isinstance(values, list) or len(values) != len(order_by):
+        raise InvalidCursor("無效的游標")
+    
+    decoded = []
+    for value, (column, _) in zip(values, order_by):
+        if isinstance(value, str) and column.type.python_type is datetime:
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                raise InvalidCursor("無效的游標")
+        decoded.append(value)
+    return decoded
+
+def _after(order_by: OrderSpec, values: Sequence[Any]):
+    """排在游標之後的條件：(a > x) OR (a = x AND b > y) ...（遞減欄位改用 <）"""
+    clauses = []
+    for i, (column, descending) in enumerate(order_by):
+        equal = [order_by[j][0] == values[j] for j in range(i)]
+        compare = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal, compare))
+    if len(clauses) == 1:
+        return clauses[0]
+    # 多餘的首欄範圍條件（a >= x），讓 MySQL／SQLite 以索引範圍搜尋，而不是掃描整個用戶的資料列
+    first, descending = order_by[0]
+    return and_(first <= values[0] if descending else first >= values[0], or_(*clauses))
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    order_by: OrderSpec,
+    cursor: Optional[str] = None,
+    limit: int = 100
+) -> Page:
+    """以 keyset 分頁查詢；多取一列判斷是否還有下一頁"""
+    if cursor:
+        stmt = stmt.where(_after(order_by, decode_cursor(cursor, order_by)))
+    stmt = stmt.order_by(
+        *(column.desc() if descending else column.asc() for column, descending in order_by)
+    ).limit(limit + 1)
+    
+    result = await db.execute(stmt)
+    items = list(result.scalars().all())
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column, _ in order_by])
+    return Page(items, next_cursor)
+
+class CountCache:
+    """列表總數的 TTL 快取（執行緒安全）；多個 worker 各自快取，最多延遲 TTL 秒反映其他 worker 的寫入"""
+    
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[int]:
+        """取得未過期的總數"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def put(self, key: Hashable, value: int):
+        """寫入總數，超過上限時淘汰最久未使用的項目"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, key: Hashable):
+        """資料列新增或刪除時清除對應的總數"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+# 全域實例
+count_cache = CountCache(PAGINATION_COUNT_CACHE_SIZE, PAGINATION_COUNT_CACHE_TTL)
+
+async def cached_count(db: AsyncSession, key: Hashable, stmt: Select) -> int:
+    """執行 COUNT 查詢並快取結果"""
+    total = count_cache.get(key)
+    if total is None:
+        total = (await db.execute(stmt)).scalar_one()
+        count_cache.put(key, total)
+    return total
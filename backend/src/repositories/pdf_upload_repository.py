@@ -0,0 +1,62 @@
+from typing import Any, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+from ..models.pdf_upload import PDFUpload
+from .pagination import Page, cached_count, count_cache, paginate
+
+class PDFUploadRepository:
+    # 列表依建立時間遞減（索引 user_id, created_at；同時間以 ID 排序）
+    LIST_ORDER = ((PDFUpload.created_at, True), (PDFUpload.id, True))
+    
+    @staticmethod
+    async def insert(db: AsyncSession, pdf_upload: PDFUpload) -> PDFUpload:
+        """在目前交易中新增 PDF 上傳記錄並取得 ID（不提交）"""
+        db.add(pdf_upload)
+        await db.flush()
+        count_cache.invalidate(("pdf_uploads", pdf_upload.user_id))
+        return pdf_upload
+    
+    @staticmethod
+    async def get_for_user(db: AsyncSession, upload_id: int, user_id: int, *columns: Any) -> Optional[PDFUpload]:
+        """查詢屬於該用戶的 PDF 上傳記錄（大型欄位只載入 columns 指定的）"""
+        result = await db.execute(
+            select(PDFUpload).options(*(undefer(column) for column in columns)).where(
+                PDFUpload.id == upload_id, PDFUpload.user_id == user_id
+            )
+        )
+        return result.scalars().first()
+    
+    @staticmethod
+    async def get_detail_for_user(
+        db: AsyncSession, upload_id: int, user_id: int, preview_chars: int
+    ) -> Optional[Tuple[PDFUpload, Optional[str]]]:
+        """查詢詳細資訊：載入分析結果與 MinHash 簽章，原始文字只在資料庫端截取前 preview_chars + 1 個字"""
+        result = await db.execute(
+            select(PDFUpload, func.substr(PDFUpload.raw_text, 1, preview_chars + 1)).options(
+                undefer(PDFUpload.processed_data), undefer(PDFUpload.minhash_signature)
+            ).where(PDFUpload.id == upload_id, PDFUpload.user_id == user_id)
+        )
+        row = result.first()
+        return None if row is None else (row[0], row[1])
+    
+    @staticmethod
+    async def list_by_user(db: AsyncSession, user_id: int, cursor: Optional[str] = None, limit: int = 100) -> Page:
+        """查詢用戶的 PDF 上傳記錄（keyset 分頁，最新的在前）"""
+        return await paginate(
+            db, select(PDFUpload).where(PDFUpload.user_id == user_id), PDFUploadRepository.LIST_ORDER, cursor, limit
+        )
+    
+    @staticmethod
+    async def count_by_user(db: AsyncSession, user_id: int) -> int:
+        """用戶的 PDF 上傳總數（快取）"""
+        return await cached_count(
+            db, ("pdf_uploads", user_id), select(func.count()).select_from(PDFUpload).where(PDFUpload.user_id == user_id)
+        )
+    
+    @staticmethod
+    async def delete(db: AsyncSession, pdf_upload: PDFUpload) -> None:
+        """刪除 PDF 上傳記錄並提交"""
+        await db.delete(pdf_upload)
+        await db.commit()
+        count_cache.invalidate(("pdf_uploads", pdf_upload.user_id))
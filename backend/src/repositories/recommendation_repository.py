@@ -0,0 +1,84 @@
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.recommendation import Recommendation
+from ..models.feedback import RecommendationFeedback
+from .pagination import Page, cached_count, count_cache, paginate
+
+class RecommendationRepository:
+    # 列表依分數遞減（索引 user_id, score；同分以 ID 排序）
+    LIST_ORDER = ((Recommendation.score, True), (Recommendation.id, True))
+    
+    @staticmethod
+    async def bulk_insert(db: AsyncSession, rows: List[Dict[str, Any]]) -> List[int]:
+        """以單一 INSERT 寫入一組推薦（不提交），回傳依輸入順序的新 ID"""
+        if not rows:
+            return []
+        count_cache.invalidate(("recommendations", rows[0]["user_id"]))
+        
+        dialect = db.bind.dialect
+        if dialect.insert_executemany_returning_sort_by_parameter_order:
+            result = await db.execute(
+                insert(Recommendation).returning(Recommendation.id, sort_by_parameter_order=True), rows
+            )
+            return list(result.scalars().all())
+        
+        # 不支援 RETURNING（MySQL）：驅動將多筆參數合併為一個多列 INSERT，再以一次查詢讀回 ID
+        await db.execute(insert(Recommendation), rows)
+        first = rows[0]
+        result = await db.execute(
+            select(Recommendation.id).where(
+                Recommendation.user_id == first["user_id"],
+                Recommendation.upload_id.is_(None) if first["upload_id"] is None
+                else Recommendation.upload_id == first["upload_id"],
+                Recommendation.pdf_upload_id.is_(None) if first["pdf_upload_id"] is None
+                else Recommendation.pdf_upload_id == first["pdf_upload_id"]
+            ).order_by(Recommendation.id.desc()).limit(len(rows))
+        )
+        return sorted(result.scalars().all())
+    
+    @staticmethod
+    async def list_by_user(db: AsyncSession, user_id: int, cursor: Optional[str] = None, limit: int = 100) -> Page:
+        """查詢用戶的推薦（keyset 分頁，依分數遞減）"""
+        return await paginate(
+            db, select(Recommendation).where(Recommendation.user_id == user_id),
+            RecommendationRepository.LIST_ORDER, cursor, limit
+        )
+    
+    @staticmethod
+    async def count_by_user(db: AsyncSession, user_id: int) -> int:
+        """用戶的推薦總數（快取）"""
+        return await cached_count(
+            db, ("recommendations", user_id),
+            select(func.count()).select_from(Recommendation).where(Recommendation.user_id == user_id)
+        )
+    
+    @staticmethod
+    async def list_by_upload(db: AsyncSession, user_id: int, upload_id: int) -> List[Recommendation]:
+        """查詢某次上傳的推薦（依分數遞減）"""
+        result = await db.execute(
+            select(Recommendation).where(
+                Recommendation.user_id == user_id,
+                Recommendation.upload_id == upload_id
+            ).order_by(Recommendation.score.desc())
+        )
+        return list(result.scalars().all())
+    
+    @staticmethod
+    async def get_for_user(db: AsyncSession, recommendation_id: int, user_id: int) -> Optional[Recommendation]:
+        """查詢屬於該用戶的推薦"""
+        result = await db.execute(
+            select(Recommendation).where(
+                Recommendation.id == recommendation_id,
+                Recommendation.user_id == user_id
+            )
+        )
+        return result.scalars().first()
+    
+    @staticmethod
+    async def add_feedback(db: AsyncSession, feedback: RecommendationFeedback) -> RecommendationFeedback:
+        """新增推薦回饋並提交"""
+        db.add(feedback)
+        await db.commit()
+        await db.refresh(feedback)
+        return feedback
@@ -0,0 +1,44 @@
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.resource import Resource
+from .pagination import Page, cached_count, count_cache, paginate
+
+class ResourceRepository:
+    # 列表依 ID 遞增（主鍵）
+    LIST_ORDER = ((Resource.id, False),)
+    
+    @staticmethod
+    async def list_all(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100) -> Page:
+        """查詢資源列表（keyset 分頁）"""
+        return await paginate(db, select(Resource), ResourceRepository.LIST_ORDER, cursor, limit)
+    
+    @staticmethod
+    async def count_all(db: AsyncSession) -> int:
+        """資源總數（快取）"""
+        return await cached_count(db, ("resources",), select(func.count()).select_from(Resource))
+    
+    @staticmethod
+    async def get_by_id(db: AsyncSession, resource_id: int) -> Optional[Resource]:
+        """根據 ID 查詢資源"""
+        return await db.get(Resource, resource_id)
+    
+    @staticmethod
+    async def save(db: AsyncSession, resource: Resource, values: Optional[dict] = None) -> Resource:
+        """新增或更新資源並提交"""
+        for key, value in (values or {}).items():
+            setattr(resource, key, value)
+        created = resource.id is None
+        db.add(resource)
+        await db.commit()
+        if created:
+            count_cache.invalidate(("resources",))
+        await db.refresh(resource)
+        return resource
+    
+    @staticmethod
+    async def delete(db: AsyncSession, resource: Resource) -> None:
+        """刪除資源並提交"""
+        await db.delete(resource)
+        await db.commit()
+        count_cache.invalidate(("resources",))
@@ -0,0 +1,50 @@
+from typing import Any, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+from ..models.upload import Upload
+from .pagination import Page, cached_count, count_cache, paginate
+
+class UploadRepository:
+    # 列表依建立時間遞減（索引 user_id, created_at；同時間以 ID 排序）
+    LIST_ORDER = ((Upload.created_at, True), (Upload.id, True))
+    
+    @staticmethod
+    async def insert(db: AsyncSession, upload: Upload) -> Upload:
+        """在目前交易中新增上傳記錄並取得 ID（不提交）"""
+        db.add(upload)
+        await db.flush()
+        count_cache.invalidate(("uploads", upload.user_id))
+        return upload
+    
+    @staticmethod
+    async def get_for_user(db: AsyncSession, upload_id: int, user_id: int, *columns: Any) -> Optional[Upload]:
+        """查詢屬於該用戶的上傳記錄（大型欄位只載入 columns 指定的）"""
+        result = await db.execute(
+            select(Upload).options(*(undefer(column) for column in columns)).where(
+                Upload.id == upload_id, Upload.user_id == user_id
+            )
+        )
+        return result.scalars().first()
+    
+    @staticmethod
+    async def list_by_user(db: AsyncSession, user_id: int, cursor: Optional[str] = None, limit: int = 100) -> Page:
+        """查詢用戶的上傳記錄（keyset 分頁，最新的在前）"""
+        return await paginate(
+            db, select(Upload).where(Upload.user_id == user_id), UploadRepository.LIST_ORDER, cursor, limit
+        )
+    
+    @staticmethod
+    async def count_by_user(db: AsyncSession, user_id: int) -> int:
+        """用戶的上傳總數（快取）"""
+        return await cached_count(
+            db, ("uploads", user_id), select(func.count()).select_from(Upload).where(Upload.user_id == user_id)
+        )
+    
+    @staticmethod
+    async def get_latest_by_user(db: AsyncSession, user_id: int) -> Optional[Upload]:
+        """查詢用戶最新的上傳記錄"""
+        result = await db.execute(
+            select(Upload).where(Upload.user_id == user_id).order_by(Upload.created_at.desc()).limit(1)
+        )
+        return result.scalars().first()
@@ -0,0 +1,25 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.user import User
+
+class UserRepository:
+    @staticmethod
+    async def get_by_username(db: AsyncSession, username: str) -> Optional[User]:
+        """根據用戶名查詢用戶"""
+        result = await db.execute(select(User).where(User.username == username))
+        return result.scalars().first()
+    
+    @staticmethod
+    async def get_by_email(db: AsyncSession, email: str) -> Optional[User]:
+        """根據郵箱查詢用戶"""
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
+    
+    @staticmethod
+    async def add(db: AsyncSession, user: User) -> User:
+        """新增用戶並提交"""
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user
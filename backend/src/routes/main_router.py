@@ -4,7 +4,8 @@ from ..controllers import (
     upload_router,
     pdf_router,
     recommendation_router,
-    resource_router
+    resource_router,
+    admin_router
 )
 
 main_router = APIRouter()
@@ -15,3 +16,4 @@ main_router.include_router(upload_router)
 main_router.include_router(pdf_router)
 main_router.include_router(recommendation_router)
 main_router.include_router(resource_router)
+main_router.include_router(admin_router)
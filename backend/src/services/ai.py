@@ -1,9 +1,8 @@
 """
 AI 推薦服務模組
-使用 Pandas 和 scikit-learn 進行學系推薦分析
+以 NumPy 特徵矩陣與 scikit-learn 隨機森林進行學系推薦分析
 """
 
-import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder, StandardScaler
@@ -13,6 +12,7 @@ from typing import List, Dict, Any, Tuple
 import json
 import pickle
 import os
+from .department_catalog import get_department_catalog
 
 class DepartmentRecommendationAI:
     """學系推薦 AI 系統"""
@@ -58,8 +58,8 @@ class DepartmentRecommendationAI:
         
         print("✅ 模型訓練完成並儲存")
     
-    def _generate_mock_data(self) -> pd.DataFrame:
-        """生成假資料"""
+    def _generate_mock_data(self) -> Dict[str, np.ndarray]:
+        """生成假資料（欄位名稱 -> 數值陣列，順序即特徵欄位順序）"""
         np.random.seed(42)  # 確保結果可重現
         
         n_samples = 1000
@@ -103,9 +103,9 @@ class DepartmentRecommendationAI:
             dept = self._assign_department_by_rules(data, i)
             departments.append(dept)
         
-        data['department'] = departments
+        data['department'] = np.array(departments)
         
-        return pd.DataFrame(data)
+        return data
     
     def _assign_department_by_rules(self, data: Dict, idx: int) -> str:
         """根據規則分配學系"""
@@ -169,12 +169,12 @@ class DepartmentRecommendationAI:
         
         return max(scores, key=scores.get)
     
-    def _prepare_features_and_labels(self, data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    def _prepare_features_and_labels(self, data: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
         """準備特徵和標籤"""
         # 分離特徵和標籤
-        feature_columns = [col for col in data.columns if col != 'department']
-        X = data[feature_columns].values
-        y = data['department'].values
+        feature_columns = [col for col in data if col != 'department']
+        X = np.column_stack([data[col] for col in feature_columns]).astype(float)
+        y = data['department']
         
         # 儲存特徵列名
         self.feature_columns = feature_columns
@@ -372,34 +372,13 @@ class DepartmentRecommendationAI:
         """生成推薦結果"""
         recommendations = []
         
-        # 學系對應的大學和專業
-        dept_info = {
-            '資訊工程學系': {
-                'universities': ['國立台灣大學', '國立清華大學', '國立交通大學', '國立成功大學'],
-                'majors': ['軟體工程', '人工智慧', '資料科學', '網路工程']
-            },
-            '電機工程學系': {
-                'universities': ['國立台灣大學', '國立清華大學', '國立交通大學', '國立成功大學'],
-                'majors': ['電力工程', '控制工程', '通訊工程', '電子工程']
-            },
-            '商業管理學系': {
-                'universities': ['國立政治大學', '國立台灣大學', '國立清華大學', '國立中央大學'],
-                'majors': ['企業管理', '行銷管理', '人力資源管理', '營運管理']
-            },
-            '數學系': {
-                'universities': ['國立台灣大學', '國立清華大學', '國立交通大學', '國立中央大學'],
-                'majors': ['應用數學', '統計學', '計算數學', '純數學']
-            },
-            '外國語文學系': {
-                'universities': ['國立台灣大學', '國立政治大學', '國立清華大學', '國立中央大學'],
-                'majors': ['英語文學', '翻譯', '語言學', '比較文學']
-            }
-        }
+        # 學系對應的大學和專業（由學系目錄提供）
+        catalog = get_department_catalog()
         
         # 生成前3名推薦
         for i, (dept_name, score) in enumerate(predictions[:3]):
-            if dept_name in dept_info:
-                info = dept_info[dept_name]
+            info = catalog.get(dept_name)
+            if info:
                 import random
                 
                 recommendation = {
@@ -451,9 +430,16 @@ class DepartmentRecommendationAI:
         
         return f"推薦{dept_name}的原因：{'; '.join(reasons[:2])}"
 
-# 全域實例
-ai_recommendation = DepartmentRecommendationAI()
+# 全域實例（延遲建立，匯入模組時不建立模型）
+_ai_recommendation = None
+
+def get_ai_recommendation() -> DepartmentRecommendationAI:
+    """取得全域推薦實例，第一次使用時才建立"""
+    global _ai_recommendation
+    if _ai_recommendation is None:
+        _ai_recommendation = DepartmentRecommendationAI()
+    return _ai_recommendation
 
 def analyze_student_data(data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """分析學生資料並生成推薦（對外接口）"""
-    return ai_recommendation.analyze_student_data(data)
+    return get_ai_recommendation().analyze_student_data(data)
@@ -0,0 +1,415 @@
+"""
+AI 推薦模組
+這個檔案包含進階的 AI 推薦演算法
+"""
+
+import json
+import numpy as np
+from typing import List, Dict, Any, Optional
+from sklearn.feature_extraction.text import TfidfVectorizer
+from scipy import sparse
+import re
+from ..config import (
+    DEPARTMENT_MIN_CANDIDATES, EMBEDDING_INDEX_MIN_DEPARTMENTS, EMBEDDING_INDEX_DIM,
+    EMBEDDING_INDEX_N_PROBE, EMBEDDING_INDEX_CANDIDATES
+)
+from .department_catalog import get_department_catalog, match_terms
+from .embedding_index import DepartmentEmbeddingIndex
+
+# 推薦分數權重
+ACADEMIC_WEIGHT = 0.4
+INTEREST_WEIGHT = 0.3
+CAREER_WEIGHT = 0.2
+ACHIEVEMENT_WEIGHT = 0.1
+DESCRIPTION_WEIGHT = 0.1
+
+def _build_vocabulary(terms) -> Dict[str, int]:
+    """建立詞彙到索引的對照表"""
+    vocabulary = {}
+    for term in terms:
+        if term not in vocabulary:
+            vocabulary[term] = len(vocabulary)
+    return vocabulary
+
+def _weighted_matrix(rows: List[List[int]], n_columns: int, normalize: bool = True) -> sparse.csr_matrix:
+    """將每列的欄索引清單轉為稀疏矩陣，可選擇以列長度正規化"""
+    data, row_idx, col_idx = [], [], []
+    for i, columns in enumerate(rows):
+        if not columns:
+            continue
+        weight = 1.0 / len(columns) if normalize else 1.0
+        for j in columns:
+            row_idx.append(i)
+            col_idx.append(j)
+            data.append(weight)
+    # 重複索引會自動相加，與原本逐一計數的行為一致
+    return sparse.csr_matrix((data, (row_idx, col_idx)), shape=(len(rows), n_columns))
+
+class DepartmentScoringEngine:
+    """向量化學系評分引擎：學生只編碼一次，所有學系以稀疏矩陣乘法一起計分"""
+    
+    def __init__(self, departments_data: Dict[str, Dict[str, Any]], vectorizer: TfidfVectorizer,
+                 department_vectors: sparse.spmatrix):
+        self.department_names = list(departments_data.keys())
+        self.vectorizer = vectorizer
+        departments = list(departments_data.values())
+        n_departments = len(departments)
+        
+        # 關鍵字空間：keyword × department
+        keyword_lists = [[k.lower() for k in dept.get("keywords", [])] for dept in departments]
+        self.keyword_vocabulary = _build_vocabulary(k for keywords in keyword_lists for k in keywords)
+        self.keyword_max_length = max((len(k) for k in self.keyword_vocabulary), default=0)
+        n_keywords = len(self.keyword_vocabulary)
+        keyword_index = [[self.keyword_vocabulary[k] for k in keywords] for keywords in keyword_lists]
+        # 興趣相關性 = 命中關鍵字數 / 學系關鍵字數
+        self.keyword_weights = _weighted_matrix(keyword_index, n_keywords).T.tocsr()
+        # 成就比對只看是否命中任一關鍵字
+        self.keyword_membership = _weighted_matrix(keyword_index, n_keywords, normalize=False).T.tocsc()
+        self.keyword_membership.data[:] = 1.0
+        
+        # 學科空間：subject × department（沒有指定學科的學系給預設分數）
+        subject_lists = [dept.get("required_subjects", []) for dept in departments]
+        self.subject_vocabulary = _build_vocabulary(s for subjects in subject_lists for s in subjects)
+        subject_index = [[self.subject_vocabulary[s] for s in subjects] for subjects in subject_lists]
+        self.subject_weights = _weighted_matrix(subject_index, len(self.subject_vocabulary)).T.tocsr()
+        self.academic_default = np.array(
+            [0.0 if subjects else 0.5 for subjects in subject_lists]
+        )
+        
+        # 職業空間：career_path × career_token，career_path × department
+        path_lists = [dept.get("career_paths", []) for dept in departments]
+        paths = [path.lower().split() for paths_of_dept in path_lists for path in paths_of_dept]
+        self.career_vocabulary = _build_vocabulary(token for tokens in paths for token in tokens)
+        self.career_max_length = max((len(t) for t in self.career_vocabulary), default=0)
+        self.path_tokens = _weighted_matrix(
+            [[self.career_vocabulary[t] for t in tokens] for tokens in paths],
+            len(self.career_vocabulary), normalize=False
+        )
+        self.path_tokens.data[:] = 1.0
+        path_departments = []
+        for dept_idx, paths_of_dept in enumerate(path_lists):
+            path_departments.extend([dept_idx] * len(paths_of_dept))
+        self.path_weights = _weighted_matrix(
+            [[d] for d in path_departments], n_departments, normalize=False
+        )
+        path_counts = np.array([len(p) for p in path_lists], dtype=float)
+        self.path_weights = self.path_weights.multiply(
+            1.0 / np.maximum(path_counts, 1)[np.newaxis, :]
+        ).tocsc()
+        
+        # 線性部分合併成單一矩陣：[學科 | 關鍵字 | TF-IDF] × department
+        self.linear_weights = sparse.vstack([
+            self.subject_weights * ACADEMIC_WEIGHT,
+            self.keyword_weights * INTEREST_WEIGHT,
+            sparse.csr_matrix(department_vectors).T * DESCRIPTION_WEIGHT,
+        ]).tocsc()
+    
+    def _encode_texts(self, texts: List[str], vocabulary: Dict[str, int], max_length: int) -> sparse.csr_matrix:
+        """將多段文字編碼為命中詞彙的二元稀疏矩陣"""
+        rows = [match_terms(text.lower(), vocabulary, max_length) for text in texts]
+        matrix = _weighted_matrix(rows, len(vocabulary), normalize=False)
+        matrix.data[:] = 1.0
+        return matrix
+    
+    def interest_relevance(self, interests: List[str]) -> np.ndarray:
+        """計算每個興趣與各學系的相關性（interest × department）"""
+        hits = self._encode_texts(interests, self.keyword_vocabulary, self.keyword_max_length)
+        return (hits @ self.keyword_weights).toarray()
+    
+    def encode_student(self, student_data: Dict[str, Any]) -> sparse.csr_matrix:
+        """將學生編碼為 [學科 | 關鍵字 | TF-IDF] 空間的列向量"""
+        scores = student_data.get("academic_scores", {})
+        subject_vector = np.zeros(len(self.subject_vocabulary))
+        for subject, idx in self.subject_vocabulary.items():
+            if subject in scores:
+                subject_vector[idx] = scores[subject] / 100
+        
+        # 興趣分數為各興趣相關性的平均，先在關鍵字空間取平均即可（重複的興趣只計一次）
+        interests = student_data.get("interests", [])
+        unique_interests = list(dict.fromkeys(interests))
+        if unique_interests:
+            hits = self._encode_texts(unique_interests, self.keyword_vocabulary, self.keyword_max_length)
+            keyword_vector = sparse.csr_matrix(hits.mean(axis=0))
+        else:
+            keyword_vector = sparse.csr_matrix((1, len(self.keyword_vocabulary)))
+        
+        text = " ".join(
+            interests + student_data.get("achievements", []) + [student_data.get("career_goals", "")]
+        ).strip()
+        if text:
+            text_vector = self.vectorizer.transform([text])
+        else:
+            text_vector = sparse.csr_matrix((1, len(self.vectorizer.vocabulary_)))
+        
+        return sparse.hstack([sparse.csr_matrix(subject_vector), keyword_vector, text_vector]).tocsr()
+    
+    def department_embeddings(self) -> sparse.csr_matrix:
+        """學系嵌入向量（department × feature），與 encode_query 的內積即為線性部分分數"""
+        bias = sparse.csr_matrix(self.academic_default[:, np.newaxis] * ACADEMIC_WEIGHT)
+        return sparse.hstack([self.linear_weights.T, bias]).tocsr()
+    
+    def encode_query(self, student_data: Dict[str, Any]) -> sparse.csr_matrix:
+        """將學生編碼為與 department_embeddings 對應的查詢向量"""
+        return sparse.hstack([self.encode_student(student_data), sparse.csr_matrix([[1.0]])]).tocsr()
+    
+    def score(self, student_data: Dict[str, Any], candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        """計算學生對學系的推薦分數（指定 candidates 時只計算這些學系，順序與其相同）"""
+        linear_weights = self.linear_weights
+        path_weights = self.path_weights
+        keyword_membership = self.keyword_membership
+        academic_default = self.academic_default
+        if candidates is not None:
+            linear_weights = linear_weights[:, candidates]
+            path_weights = path_weights[:, candidates]
+            keyword_membership = keyword_membership[:, candidates]
+            academic_default = academic_default[candidates]
+        
+        # 學科、興趣、描述相似度：一次稀疏矩陣乘法
+        total = (self.encode_student(student_data) @ linear_weights).toarray().ravel()
+        total += academic_default * ACADEMIC_WEIGHT
+        
+        # 職業目標：任一詞命中即算該職涯路徑符合
+        career_goals = student_data.get("career_goals", "").lower()
+        if career_goals and self.career_vocabulary:
+            goal_hits = self._encode_texts([career_goals], self.career_vocabulary, self.career_max_length)
+            matched_paths = (goal_hits @ self.path_tokens.T) > 0
+            total += (matched_paths.astype(float) @ path_weights).toarray().ravel() * CAREER_WEIGHT
+        
+        # 成就：每項成就命中學系任一關鍵字即算一次
+        achievements = student_data.get("achievements", [])
+        if achievements:
+            hits = self._encode_texts(achievements, self.keyword_vocabulary, self.keyword_max_length)
+            matched = (hits @ keyword_membership) > 0
+            total += np.asarray(matched.sum(axis=0)).ravel() / len(achievements) * ACHIEVEMENT_WEIGHT
+        
+        return np.clip(total, 0.0, 1.0)
+
+class AdvancedAIRecommendation:
+    """進階 AI 推薦系統"""
+    
+    def __init__(self):
+        # 中文描述沒有空白分詞，使用字元 n-gram
+        self.vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 3), max_features=20000)
+        self.department_vectors = None
+        self.departments_data = None
+        self.scoring_engine = None
+        self.embedding_index = None
+        self._initialize_departments()
+    
+    def _initialize_departments(self):
+        """初始化學系資料"""
+        self.catalog = get_department_catalog()
+        self.departments_data = {dept["name"]: dept for dept in self.catalog.departments}
+        
+        # 建立 TF-IDF 向量
+        descriptions = [dept["description"] for dept in self.departments_data.values()]
+        self.department_vectors = self.vectorizer.fit_transform(descriptions)
+        self.scoring_engine = DepartmentScoringEngine(
+            self.departments_data, self.vectorizer, self.department_vectors
+        )
+        
+        # 大型目錄建立 ANN 索引，補足倒排索引找不到的候選學系
+        if len(self.departments_data) >= EMBEDDING_INDEX_MIN_DEPARTMENTS:
+            self.embedding_index = DepartmentEmbeddingIndex(
+                dim=EMBEDDING_INDEX_DIM, n_probe=EMBEDDING_INDEX_N_PROBE
+            ).fit(self.scoring_engine.department_embeddings())
+    
+    def analyze_student_profile(self, student_data: Dict[str, Any]) -> Dict[str, Any]:
+        """分析學生檔案"""
+        analysis = {
+            "academic_strengths": [],
+            "interests_analysis": {},
+            "career_orientation": "",
+            "recommended_departments": []
+        }
+        
+        # 分析學科成績
+        scores = student_data.get("academic_scores", {})
+        for subject, score in scores.items():
+            if score >= 85:
+                analysis["academic_strengths"].append(subject)
+        
+        # 分析興趣（一次矩陣乘法取得每個興趣對所有學系的相關性）
+        interests = student_data.get("interests", [])
+        if interests:
+            relevance = self.scoring_engine.interest_relevance(interests)
+            for interest, row in zip(interests, relevance):
+                analysis["interests_analysis"][interest] = dict(
+                    zip(self.scoring_engine.department_names, row.tolist())
+                )
+        
+        # 分析職業目標
+        career_goals = student_data.get("career_goals", "")
+        analysis["career_orientation"] = self._analyze_career_orientation(career_goals)
+        
+        return analysis
+    
+    def _analyze_career_orientation(self, career_goals: str) -> str:
+        """分析職業導向"""
+        if not career_goals:
+            return "未明確"
+        
+        orientations = {
+            "技術導向": ["工程師", "開發", "程式", "技術", "研發"],
+            "管理導向": ["管理", "領導", "經理", "主管", "經營"],
+            "研究導向": ["研究", "分析", "學術", "教授", "學者"],
+            "創意導向": ["設計", "創意", "藝術", "創作", "創新"]
+        }
+        
+        scores = {}
+        for orientation, keywords in orientations.items():
+            score = sum(1 for keyword in keywords if keyword in career_goals)
+            scores[orientation] = score
+        
+        return max(scores, key=scores.get) if max(scores.values()) > 0 else "未明確"
+    
+    def generate_recommendations(self, student_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """生成推薦結果"""
+        # 以倒排索引（與 ANN 索引）取得相關學系，候選不足時改為全量計分
+        texts = student_data.get("interests", []) + student_data.get("achievements", [])
+        texts.append(student_data.get("career_goals", ""))
+        candidates = set(self.catalog.candidates(texts))
+        if self.embedding_index is not None:
+            ann_ids, _ = self.embedding_index.search(
+                self.scoring_engine.encode_query(student_data), EMBEDDING_INDEX_CANDIDATES
+            )
+            candidates.update(ann_ids.tolist())
+        candidates = np.array(sorted(candidates), dtype=int)
+        if len(candidates) < DEPARTMENT_MIN_CANDIDATES:
+            candidates = np.arange(len(self.scoring_engine.department_names))
+            scores = self.scoring_engine.score(student_data)
+        else:
+            scores = self.scoring_engine.score(student_data, candidates)
+        
+        # 只推薦分數較高的學系，依分數排序後取前五名
+        passed = np.flatnonzero(scores > 0.3)
+        order = candidates[passed[np.argsort(-scores[passed], kind="stable")]][:5]
+        if len(order) == 0:
+            return []
+        scores_by_index = dict(zip(candidates.tolist(), scores.tolist()))
+        
+        # 推薦理由只需針對入選學系計算
+        analysis = {
+            "academic_strengths": [
+                subject for subject, score in student_data.get("academic_scores", {}).items()
+                if score >= 85
+            ]
+        }
+        
+        recommendations = []
+        for idx in order:
+            dept_name = self.scoring_engine.department_names[idx]
+            dept_data = self.departments_data[dept_name]
+            recommendations.append({
+                "department": dept_name,
+                "university": self._select_university(dept_data["universities"]),
+                "major": self._select_major(dept_name),
+                "score": round(scores_by_index[idx], 3),
+                "reason": self._generate_detailed_reason(
+                    student_data, analysis, dept_name, dept_data
+                ),
+                "match_factors": self._get_match_factors(
+                    student_data, analysis, dept_name, dept_data
+                )
+            })
+        
+        return recommendations
+    
+    def _select_university(self, universities: List[str]) -> str:
+        """選擇大學"""
+        import random
+        return random.choice(universities)
+    
+    def _select_major(self, dept_name: str) -> str:
+        """選擇專業"""
+        dept = self.catalog.get(dept_name)
+        majors = dept["majors"] if dept and dept["majors"] else ["一般"]
+        import random
+        return random.choice(majors)
+    
+    def _generate_detailed_reason(
+        self, 
+        student_data: Dict[str, Any], 
+        analysis: Dict[str, Any], 
+        dept_name: str, 
+        dept_data: Dict[str, Any]
+    ) -> str:
+        """生成詳細推薦理由"""
+        reasons = []
+        
+        # 基於學科成績
+        academic_strengths = analysis.get("academic_strengths", [])
+        required_subjects = dept_data.get("required_subjects", [])
+        matching_subjects = [s for s in academic_strengths if s in required_subjects]
+        
+        if matching_subjects:
+            reasons.append(f"您在{', '.join(matching_subjects)}方面表現優異")
+        
+        # 基於興趣
+        interests = student_data.get("interests", [])
+        matching_interests = []
+        for interest in interests:
+            for keyword in dept_data.get("keywords", []):
+                if keyword.lower() in interest.lower():
+                    matching_interests.append(interest)
+                    break
+        
+        if matching_interests:
+            reasons.append(f"您的興趣({', '.join(matching_interests)})與此領域高度相關")
+        
+        # 基於職業目標
+        career_goals = student_data.get("career_goals", "")
+        if career_goals:
+            career_paths = dept_data.get("career_paths", [])
+            for career_path in career_paths:
+                if any(keyword in career_goals.lower() for keyword in career_path.lower().split()):
+                    reasons.append(f"此領域的職業發展路徑符合您的目標")
+                    break
+        
+        # 預設理由
+        if not reasons:
+            reasons.append("根據您的整體表現，此領域適合您的發展潛力")
+        
+        return f"推薦{dept_name}的原因：{'; '.join(reasons[:2])}"
+    
+    def _get_match_factors(
+        self, 
+        student_data: Dict[str, Any], 
+        analysis: Dict[str, Any], 
+        dept_name: str, 
+        dept_data: Dict[str, Any]
+    ) -> List[str]:
+        """獲取匹配因素"""
+        factors = []
+        
+        # 學科匹配
+        academic_strengths = analysis.get("academic_strengths", [])
+        required_subjects = dept_data.get("required_subjects", [])
+        if any(s in academic_strengths for s in required_subjects):
+            factors.append("學科優勢")
+        
+        # 興趣匹配
+        interests = student_data.get("interests", [])
+        if any(any(keyword.lower() in interest.lower() for keyword in dept_data.get("keywords", [])) for interest in interests):
+            factors.append("興趣相符")
+        
+        # 職業目標匹配
+        career_goals = student_data.get("career_goals", "")
+        if career_goals and any(any(keyword in career_goals.lower() for keyword in career_path.lower().split()) for career_path in dept_data.get("career_paths", [])):
+            factors.append("職業目標一致")
+        
+        return factors
+
+# 全域實例（延遲建立，匯入模組時不建立模型）
+_ai_recommendation = None
+
+def get_ai_recommendation() -> AdvancedAIRecommendation:
+    """取得全域推薦實例，第一次使用時才建立"""
+    global _ai_recommendation
+    if _ai_recommendation is None:
+        _ai_recommendation = AdvancedAIRecommendation()
+    return _ai_recommendation
+
+def analyze_student_data(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """分析學生資料並生成推薦（對外接口）"""
+    return get_ai_recommendation().generate_recommendations(data)
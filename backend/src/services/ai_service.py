@@ -1,10 +1,16 @@
-from .ai_standalone import analyze_student_data as ai_analyze_student_data
 from typing import List, Dict, Any
 
 class AIService:
-    """AI 推薦服務 - 使用機器學習模型"""
+    """AI 推薦服務 - 透過推薦引擎註冊表呼叫設定的引擎（RECOMMENDER_ENGINE）"""
     
     @staticmethod
     def analyze_student_data(data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """分析學生資料並生成推薦 - 使用機器學習模型"""
-        return ai_analyze_student_data(data)
\ No newline at end of file
+        """分析學生資料並生成推薦"""
+        from .recommender_registry import recommender_registry
+        return recommender_registry.recommend(data)
+    
+    @staticmethod
+    def analyze_batch(profiles: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """批次分析學生資料並生成推薦"""
+        from .recommender_registry import recommender_registry
+        return recommender_registry.recommend_batch(profiles)
@@ -1,37 +1,60 @@
 """
 獨立 AI 推薦服務模組
-使用 Pandas 和 scikit-learn 進行學系推薦分析
-不依賴其他服務模組
+以 NumPy 特徵矩陣與 scikit-learn 隨機森林進行學系推薦分析
+不依賴其他業務服務模組
 """
 
-import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.model_selection import train_test_split
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 import json
 import pickle
+import hashlib
 import os
+import time
+from ..config import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, PREDICTION_CACHE_DECIMALS, TRAINING_N_JOBS
+from .inference_dispatcher import InferenceDispatcher
+from .feature_schema import FeatureSchema, FEATURE_COLUMNS
+from .prediction_cache import PredictionCache
+from .department_catalog import get_department_catalog
+
+# 隨機森林預設超參數（可由調參結果覆寫）
+DEFAULT_FOREST_PARAMS = {
+    "n_estimators": 100,
+    "max_depth": 10
+}
 
 class DepartmentRecommendationAI:
     """學系推薦 AI 系統"""
     
-    def __init__(self):
+    def __init__(self, bundle_path: Optional[str] = None, auto_load: bool = True):
         self.model = None
         self.label_encoder = LabelEncoder()
         self.scaler = StandardScaler()
         self.departments = []
         self.feature_columns = []
+        self.feature_schema = None  # 模型載入後建立的特徵結構
         self.model_path = "ai_models/department_recommendation_model.pkl"
         self.scaler_path = "ai_models/scaler.pkl"
         self.encoder_path = "ai_models/label_encoder.pkl"
+        self.dispatcher = None  # 啟用微批次時的推論派發器
+        self.model_version = ""  # 模型版本（bundle 版本或模型檔內容雜湊），用於快取鍵與推薦紀錄
+        self.metadata: Dict[str, Any] = {}  # bundle 附帶的訓練資訊
+        self.prediction_cache = (
+            PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, PREDICTION_CACHE_DECIMALS)
+            if PREDICTION_CACHE_SIZE > 0 else None
+        )
         
         # 確保模型目錄存在
         os.makedirs("ai_models", exist_ok=True)
         
-        # 初始化或載入模型
-        self._initialize_model()
+        # 初始化或載入模型（auto_load=False 時由呼叫者自行 fit 或 load_bundle）
+        if bundle_path:
+            self.load_bundle(bundle_path)
+        elif auto_load:
+            self._initialize_model()
     
     def _initialize_model(self):
         """初始化或載入模型"""
@@ -58,8 +81,8 @@ class DepartmentRecommendationAI:
         
         print("✅ 模型訓練完成並儲存")
     
-    def _generate_mock_data(self) -> pd.DataFrame:
-        """生成假資料"""
+    def _generate_mock_data(self) -> Dict[str, np.ndarray]:
+        """生成假資料（欄位名稱 -> 數值陣列，順序即特徵欄位順序）"""
         np.random.seed(42)  # 確保結果可重現
         
         n_samples = 1000
@@ -103,9 +126,9 @@ class DepartmentRecommendationAI:
             dept = self._assign_department_by_rules(data, i)
             departments.append(dept)
         
-        data['department'] = departments
+        data['department'] = np.array(departments)
         
-        return pd.DataFrame(data)
+        return data
     
     def _assign_department_by_rules(self, data: Dict, idx: int) -> str:
         """根據規則分配學系"""
@@ -169,15 +192,16 @@ class DepartmentRecommendationAI:
         
         return max(scores, key=scores.get)
     
-    def _prepare_features_and_labels(self, data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    def _prepare_features_and_labels(self, data: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
         """準備特徵和標籤"""
         # 分離特徵和標籤
-        feature_columns = [col for col in data.columns if col != 'department']
-        X = data[feature_columns].values
-        y = data['department'].values
+        feature_columns = [col for col in data if col != 'department']
+        X = np.column_stack([data[col] for col in feature_columns]).astype(float)
+        y = data['department']
         
-        # 儲存特徵列名
+        # 儲存特徵列名並建立特徵結構
         self.feature_columns = feature_columns
+        self.feature_schema = FeatureSchema(feature_columns)
         
         # 編碼標籤
         y_encoded = self.label_encoder.fit_transform(y)
@@ -185,7 +209,25 @@ class DepartmentRecommendationAI:
         
         return X, y_encoded
     
-    def _train_model(self, X: np.ndarray, y: np.ndarray):
+    def fit(
+        self,
+        X: np.ndarray,
+        labels: np.ndarray,
+        feature_columns: List[str],
+        params: Optional[Dict[str, Any]] = None
+    ) -> float:
+        """以給定的特徵矩陣與學系標籤訓練模型，回傳測試集準確率"""
+        self.feature_columns = list(feature_columns)
+        self.feature_schema = FeatureSchema(self.feature_columns)
+        
+        y = self.label_encoder.fit_transform(labels)
+        self.departments = self.label_encoder.classes_.tolist()
+        
+        accuracy = self._train_model(X, y, params)
+        self._set_model_version(f"unsaved-{int(time.time())}")
+        return accuracy
+    
+    def _train_model(self, X: np.ndarray, y: np.ndarray, params: Optional[Dict[str, Any]] = None) -> float:
         """訓練模型"""
         # 分割資料
         X_train, X_test, y_train, y_test = train_test_split(
@@ -198,19 +240,24 @@ class DepartmentRecommendationAI:
         
         # 訓練隨機森林模型
         self.model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=10,
+            **{**DEFAULT_FOREST_PARAMS, **(params or {})},
             random_state=42,
-            class_weight='balanced'
+            class_weight='balanced',
+            n_jobs=TRAINING_N_JOBS
         )
         
         self.model.fit(X_train_scaled, y_train)
         
+        # 推論多為單列預測，平行化只會增加執行緒排程開銷
+        self.model.n_jobs = None
+        
         # 評估模型
         y_pred = self.model.predict(X_test_scaled)
         accuracy = np.mean(y_pred == y_test)
         
         print(f"📊 模型準確率: {accuracy:.3f}")
+        
+        return float(accuracy)
     
     def _save_model(self):
         """儲存模型"""
@@ -222,6 +269,8 @@ class DepartmentRecommendationAI:
         
         with open(self.encoder_path, 'wb') as f:
             pickle.dump(self.label_encoder, f)
+        
+        self._set_model_version()
     
     def _load_model(self):
         """載入模型"""
@@ -234,18 +283,58 @@ class DepartmentRecommendationAI:
         with open(self.encoder_path, 'rb') as f:
             self.label_encoder = pickle.load(f)
         
-        # 重建特徵列名和學系列表
-        self.feature_columns = [
-            'chinese_score', 'english_score', 'math_score', 'science_score', 'social_score',
-            'interest_programming', 'interest_mathematics', 'interest_physics', 'interest_chemistry',
-            'interest_biology', 'interest_literature', 'interest_history', 'interest_art',
-            'interest_music', 'interest_sports', 'interest_leadership', 'interest_research',
-            'interest_communication', 'interest_creativity', 'interest_analysis',
-            'club_leadership', 'club_tech', 'club_art', 'club_sports', 'club_academic',
-            'competition_math', 'competition_science', 'competition_programming',
-            'competition_language', 'competition_art'
-        ]
+        # 重建特徵列名、特徵結構和學系列表
+        self.feature_columns = list(FEATURE_COLUMNS)
+        self.feature_schema = FeatureSchema(self.feature_columns)
+        self.departments = self.label_encoder.classes_.tolist()
+        self._set_model_version()
+    
+    def _set_model_version(self, version: Optional[str] = None):
+        """設定模型版本（預設以模型檔內容計算），並清空舊模型的預測快取"""
+        if version is None:
+            with open(self.model_path, 'rb') as f:
+                version = hashlib.sha256(f.read()).hexdigest()[:12]
+        self.model_version = version
+        
+        if self.prediction_cache is not None:
+            self.prediction_cache.clear()
+    
+    def save_bundle(self, directory: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """將模型、標準化器與編碼器存為單一版本化 bundle，回傳檔案路徑"""
+        os.makedirs(directory, exist_ok=True)
+        model_bytes = pickle.dumps(self.model)
+        version = f"{time.strftime('%Y%m%d%H%M%S')}-{hashlib.sha256(model_bytes).hexdigest()[:8]}"
+        bundle = {
+            "version": version,
+            "model": self.model,
+            "scaler": self.scaler,
+            "label_encoder": self.label_encoder,
+            "feature_columns": self.feature_columns,
+            "metadata": metadata or {}
+        }
+        
+        # 先寫暫存檔再改名，監看程式不會讀到寫到一半的檔案
+        path = os.path.join(directory, f"{version}.pkl")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(bundle, f)
+        os.replace(tmp_path, path)
+        
+        return path
+    
+    def load_bundle(self, path: str):
+        """載入版本化 bundle"""
+        with open(path, 'rb') as f:
+            bundle = pickle.load(f)
+        
+        self.model = bundle["model"]
+        self.scaler = bundle["scaler"]
+        self.label_encoder = bundle["label_encoder"]
+        self.feature_columns = list(bundle.get("feature_columns") or FEATURE_COLUMNS)
+        self.feature_schema = FeatureSchema(self.feature_columns)
         self.departments = self.label_encoder.classes_.tolist()
+        self.metadata = bundle.get("metadata", {})
+        self._set_model_version(bundle["version"])
     
     def analyze_student_data(self, student_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """分析學生資料並生成推薦"""
@@ -253,149 +342,90 @@ class DepartmentRecommendationAI:
         features = self._extract_features(student_data)
         
         # 預測學系
-        predictions = self._predict_departments(features)
+        predictions = self._predict_rows(features)[0]
         
         # 生成推薦結果
         recommendations = self._generate_recommendations(predictions, student_data)
         
         return recommendations
     
-    def _extract_features(self, student_data: Dict[str, Any]) -> np.ndarray:
-        """從學生資料中提取特徵"""
-        features = np.zeros(len(self.feature_columns))
-        
-        # 學科成績
-        academic_scores = student_data.get('academic_scores', {})
-        score_mapping = {
-            'chinese_score': 'chinese',
-            'english_score': 'english', 
-            'math_score': 'math',
-            'science_score': 'science',
-            'social_score': 'social'
-        }
-        
-        for feature_name, score_key in score_mapping.items():
-            if feature_name in self.feature_columns:
-                idx = self.feature_columns.index(feature_name)
-                features[idx] = academic_scores.get(score_key, 0)
-        
-        # 興趣特徵
-        interests = student_data.get('interests', [])
-        interest_mapping = {
-            'programming': ['程式設計', '程式', 'coding', '軟體', '資訊'],
-            'mathematics': ['數學', '統計', '計算'],
-            'physics': ['物理', '力學', '電學'],
-            'chemistry': ['化學', '實驗'],
-            'biology': ['生物', '生命科學'],
-            'literature': ['文學', '語文', '寫作'],
-            'history': ['歷史', '社會'],
-            'art': ['藝術', '美術', '設計'],
-            'music': ['音樂', '樂器'],
-            'sports': ['運動', '體育', '健身'],
-            'leadership': ['領導', '管理', '組織'],
-            'research': ['研究', '學術', '實驗'],
-            'communication': ['溝通', '表達', '演講'],
-            'creativity': ['創意', '創新', '創作'],
-            'analysis': ['分析', '邏輯', '思考']
-        }
+    def analyze_batch(self, profiles: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """批次分析多位學生資料，只做一次標準化與預測"""
+        if not profiles:
+            return []
         
-        for interest_type, keywords in interest_mapping.items():
-            feature_name = f'interest_{interest_type}'
-            if feature_name in self.feature_columns:
-                idx = self.feature_columns.index(feature_name)
-                # 計算興趣匹配度
-                match_score = sum(1 for interest in interests 
-                                for keyword in keywords 
-                                if keyword in interest.lower()) / len(keywords)
-                features[idx] = min(match_score, 1.0)
-        
-        # 社團經歷
-        achievements = student_data.get('achievements', [])
-        club_mapping = {
-            'club_leadership': ['社長', '會長', '幹部', '領導'],
-            'club_tech': ['資訊', '程式', '電腦', '科技'],
-            'club_art': ['美術', '藝術', '設計', '創作'],
-            'club_sports': ['運動', '體育', '球隊', '健身'],
-            'club_academic': ['學術', '研究', '讀書', '競賽']
-        }
-        
-        for club_type, keywords in club_mapping.items():
-            if club_type in self.feature_columns:
-                idx = self.feature_columns.index(club_type)
-                features[idx] = 1 if any(any(keyword in achievement.lower() 
-                                           for keyword in keywords) 
-                                       for achievement in achievements) else 0
-        
-        # 競賽獲獎
-        competition_mapping = {
-            'competition_math': ['數學', '奧林匹亞', '競賽'],
-            'competition_science': ['科學', '物理', '化學', '生物'],
-            'competition_programming': ['程式', '資訊', '軟體'],
-            'competition_language': ['語文', '英文', '國文'],
-            'competition_art': ['美術', '藝術', '創作']
-        }
+        features = self.feature_schema.transform_batch(profiles)
+        batch_predictions = self._predict_rows(features)
         
-        for comp_type, keywords in competition_mapping.items():
-            if comp_type in self.feature_columns:
-                idx = self.feature_columns.index(comp_type)
-                features[idx] = 1 if any(any(keyword in achievement.lower() 
-                                           for keyword in keywords) 
-                                       for achievement in achievements) else 0
-        
-        return features.reshape(1, -1)
+        return [
+            self._generate_recommendations(predictions, profile)
+            for predictions, profile in zip(batch_predictions, profiles)
+        ]
+    
+    def _extract_features(self, student_data: Dict[str, Any]) -> np.ndarray:
+        """從學生資料中提取特徵"""
+        return self.feature_schema.transform(student_data)
+    
+    def enable_batching(self, dispatcher: InferenceDispatcher):
+        """啟用微批次推論，合併同時抵達的預測請求"""
+        self.dispatcher = dispatcher
+    
+    def _predict_rows(self, features: np.ndarray) -> List[List[Tuple[str, float]]]:
+        """預測每列特徵的學系（先查預測快取，未命中的列才送去推論）"""
+        if self.prediction_cache is None:
+            return self._predict_uncached(features)
+        
+        keys = [self.prediction_cache.make_key(row, self.model_version) for row in features]
+        results = [self.prediction_cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        
+        if missing:
+            predicted = self._predict_uncached(features[missing])
+            for i, predictions in zip(missing, predicted):
+                results[i] = predictions
+                self.prediction_cache.put(keys[i], predictions)
+        
+        return results
+    
+    def _predict_uncached(self, features: np.ndarray) -> List[List[Tuple[str, float]]]:
+        """實際推論（啟用微批次時經由派發器）"""
+        if self.dispatcher is not None:
+            return self.dispatcher.predict_batch(self._predict_departments_batch, features)
+        return self._predict_departments_batch(features)
     
     def _predict_departments(self, features: np.ndarray) -> List[Tuple[str, float]]:
         """預測學系"""
+        return self._predict_departments_batch(features)[0]
+    
+    def _predict_departments_batch(self, features: np.ndarray) -> List[List[Tuple[str, float]]]:
+        """批次預測學系（每列一位學生）"""
         # 標準化特徵
         features_scaled = self.scaler.transform(features)
         
         # 預測機率
-        probabilities = self.model.predict_proba(features_scaled)[0]
-        
-        # 獲取預測結果
-        predictions = []
-        for i, prob in enumerate(probabilities):
-            dept_name = self.departments[i]
-            predictions.append((dept_name, prob))
+        probabilities = self.model.predict_proba(features_scaled)
         
-        # 按機率排序
-        predictions.sort(key=lambda x: x[1], reverse=True)
+        # 獲取預測結果並按機率排序
+        batch_predictions = []
+        for row in probabilities:
+            predictions = [(self.departments[i], prob) for i, prob in enumerate(row)]
+            predictions.sort(key=lambda x: x[1], reverse=True)
+            batch_predictions.append(predictions)
         
-        return predictions
+        return batch_predictions
     
     def _generate_recommendations(self, predictions: List[Tuple[str, float]], 
                                 student_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """生成推薦結果"""
         recommendations = []
         
-        # 學系對應的大學和專業
-        dept_info = {
-            '資訊工程學系': {
-                'universities': ['國立台灣大學', '國立清華大學', '國立交通大學', '國立成功大學'],
-                'majors': ['軟體工程', '人工智慧', '資料科學', '網路工程']
-            },
-            '電機工程學系': {
-                'universities': ['國立台灣大學', '國立清華大學', '國立交通大學', '國立成功大學'],
-                'majors': ['電力工程', '控制工程', '通訊工程', '電子工程']
-            },
-            '商業管理學系': {
-                'universities': ['國立政治大學', '國立台灣大學', '國立清華大學', '國立中央大學'],
-                'majors': ['企業管理', '行銷管理', '人力資源管理', '營運管理']
-            },
-            '數學系': {
-                'universities': ['國立台灣大學', '國立清華大學', '國立交通大學', '國立中央大學'],
-                'majors': ['應用數學', '統計學', '計算數學', '純數學']
-            },
-            '外國語文學系': {
-                'universities': ['國立台灣大學', '國立政治大學', '國立清華大學', '國立中央大學'],
-                'majors': ['英語文學', '翻譯', '語言學', '比較文學']
-            }
-        }
+        # 學系對應的大學和專業（由學系目錄提供）
+        catalog = get_department_catalog()
         
         # 生成前3名推薦
         for i, (dept_name, score) in enumerate(predictions[:3]):
-            if dept_name in dept_info:
-                info = dept_info[dept_name]
+            info = catalog.get(dept_name)
+            if info:
                 import random
                 
                 recommendation = {
@@ -404,7 +434,8 @@ class DepartmentRecommendationAI:
                     'major': random.choice(info['majors']),
                     'score': round(score, 3),
                     'reason': self._generate_reason(dept_name, score, student_data),
-                    'rank': i + 1
+                    'rank': i + 1,
+                    'model_version': self.model_version
                 }
                 recommendations.append(recommendation)
         
@@ -447,9 +478,15 @@ class DepartmentRecommendationAI:
         
         return f"推薦{dept_name}的原因：{'; '.join(reasons[:2])}"
 
-# 全域實例
-ai_recommendation = DepartmentRecommendationAI()
+def get_ai_recommendation() -> DepartmentRecommendationAI:
+    """取得目前使用中的推薦模型（由模型註冊表管理，第一次使用時才載入）"""
+    from .model_registry import model_registry
+    return model_registry.current()
 
 def analyze_student_data(data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """分析學生資料並生成推薦（對外接口）"""
-    return ai_recommendation.analyze_student_data(data)
+    return get_ai_recommendation().analyze_student_data(data)
+
+def analyze_student_data_batch(profiles: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """批次分析學生資料並生成推薦（對外接口）"""
+    return get_ai_recommendation().analyze_batch(profiles)
@@ -1,10 +1,11 @@
 import hashlib
 import jwt
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from ..models.user import User
 from ..models.schemas import UserCreate, LoginRequest, UserResponse
+from ..repositories.user_repository import UserRepository
 from ..config import SECRET_KEY, ALGORITHM
 
 class AuthService:
@@ -40,16 +41,16 @@ class AuthService:
             raise HTTPException(status_code=401, detail="Invalid token")
     
     @staticmethod
-    def register_user(db: Session, user_data: UserCreate) -> User:
+    async def register_user(db: AsyncSession, user_data: UserCreate) -> User:
         """用戶註冊"""
         # 檢查用戶名是否已存在
-        existing_user = db.query(User).filter(User.username == user_data.username).first()
+        existing_user = await UserRepository.get_by_username(db, user_data.username)
         if existing_user:
             raise HTTPException(status_code=400, detail="Username already registered")
         
         # 檢查郵箱是否已存在
         if user_data.email:
-            existing_email = db.query(User).filter(User.email == user_data.email).first()
+            existing_email = await UserRepository.get_by_email(db, user_data.email)
             if existing_email:
                 raise HTTPException(status_code=400, detail="Email already registered")
         
@@ -62,15 +63,12 @@ class AuthService:
             full_name=user_data.full_name
         )
         
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
-        return db_user
+        return await UserRepository.add(db, db_user)
     
     @staticmethod
-    def authenticate_user(db: Session, login_data: LoginRequest) -> User:
+    async def authenticate_user(db: AsyncSession, login_data: LoginRequest) -> User:
         """用戶認證"""
-        user = db.query(User).filter(User.username == login_data.username).first()
+        user = await UserRepository.get_by_username(db, login_data.username)
         
         if not user:
             raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -84,9 +82,9 @@ class AuthService:
         return user
     
     @staticmethod
-    def get_user_by_username(db: Session, username: str) -> User:
+    async def get_user_by_username(db: AsyncSession, username: str) -> User:
         """根據用戶名獲取用戶"""
-        user = db.query(User).filter(User.username == username).first()
+        user = await UserRepository.get_by_username(db, username)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         return user
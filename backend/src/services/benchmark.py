@@ -0,0 +1,269 @@
+"""
+推薦延遲與吞吐量基準測試
+以 frontend/public/sample-data.json 相同結構大量產生模擬學生資料，量測：
+- 各推薦引擎的冷啟動（全新程序中建立引擎並完成第一次推薦）
+- 暖機後的單筆與各批次大小的 p50/p95/p99 延遲與吞吐量
+- 隨機森林的特徵擷取與 predict_proba
+每個階段使用不重複的資料，避免命中預測快取。結果輸出為 JSON，
+可指定先前的結果作為基準，p95 退步超過門檻時以非零狀態結束，用於把關模型或引擎變更。
+
+使用方式（於 backend 目錄）：
+    python -m src.services.benchmark --engines forest,keyword --output benchmark.json
+    python -m src.services.benchmark --baseline benchmark.json --max-regression 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from .feature_schema import INTEREST_MAPPING, SCORE_MAPPING
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_SURNAMES = "陳林黃張李王吳劉蔡楊許鄭謝洪郭"
+_GIVEN_NAMES = "小明華玲志偉怡君宗翰雅婷家豪俊傑"
+_SCHOOLS = ["台北市立建國高級中學", "台北市立第一女子高級中學", "國立台中第一高級中學", "國立台南第一高級中學", "高雄市立高雄高級中學"]
+_OTHER_INTERESTS = ["閱讀", "旅行", "攝影", "烹飪", "電影", "桌遊"]
+_CONTESTS = ["資訊", "數學奧林匹亞", "物理", "化學", "生物", "英文演講", "作文", "美術", "科展"]
+_PRIZES = ["第一名", "第二名", "第三名", "佳作", "初選通過"]
+_CLUBS = ["程式設計", "熱舞", "籃球", "美術", "辯論", "天文", "吉他", "學生會"]
+_CLUB_ROLES = ["社長", "副社長", "幹部", "社員"]
+_CAREERS = ["軟體開發或人工智慧相關工作", "電子工程師", "機械設計", "企業管理", "經濟分析", "數學研究", "翻譯或外交", "教育工作"]
+
+def generate_profiles(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """產生與 sample-data.json 結構相同的模擬學生資料"""
+    from .department_catalog import get_department_catalog
+    
+    rng = random.Random(seed)
+    interests_pool = sorted({k for keywords in INTEREST_MAPPING.values() for k in keywords}) + _OTHER_INTERESTS
+    majors = [dept["name"].replace("學系", "") for dept in get_department_catalog().departments]
+    profiles = []
+    for _ in range(n):
+        # 各科成績圍繞同一程度上下浮動
+        level = rng.gauss(80, 8)
+        profiles.append({
+            "personal_info": {
+                "name": rng.choice(_SURNAMES) + "".join(rng.sample(_GIVEN_NAMES, 2)),
+                "age": rng.choice([17, 18, 18, 19]),
+                "school": rng.choice(_SCHOOLS)
+            },
+            "academic_scores": {
+                key: int(min(100, max(40, rng.gauss(level, 6)))) for key in SCORE_MAPPING.values()
+            },
+            "interests": rng.sample(interests_pool, rng.randint(2, 5)),
+            "achievements": [
+                f"全國{rng.choice(_CONTESTS)}競賽{rng.choice(_PRIZES)}" for _ in range(rng.randint(0, 2))
+            ] + [
+                f"{rng.choice(_CLUBS)}社團{rng.choice(_CLUB_ROLES)}" for _ in range(rng.randint(0, 2))
+            ],
+            "career_goals": f"希望從事{rng.choice(_CAREERS)}",
+            "preferred_majors": rng.sample(majors, min(3, len(majors)))
+        })
+    return profiles
+
+def summarize(name: str, latencies_ms: List[float], items: int, **extra: Any) -> Dict[str, Any]:
+    """彙整延遲百分位數與吞吐量（每秒處理的學生數）"""
+    values = np.asarray(latencies_ms)
+    total_seconds = values.sum() / 1000
+    return {
+        "name": name,
+        **extra,
+        "iterations": len(values),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "max_ms": round(float(values.max()), 3),
+        "throughput_per_s": round(items / total_seconds, 1) if total_seconds > 0 else None
+    }
+
+def _time_calls(fn: Callable[[Any], Any], inputs: List[Any]) -> List[float]:
+    """逐一呼叫並回傳每次耗時（毫秒）"""
+    latencies = []
+    for item in inputs:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def _chunks(profiles: List[Dict[str, Any]], size: int) -> List[List[Dict[str, Any]]]:
+    return [profiles[i:i + size] for i in range(0, len(profiles) - size + 1, size)]
+
+def cold_probe(engine: str) -> Dict[str, float]:
+    """於目前（全新）程序中建立引擎並完成第一次推薦，回傳各階段耗時"""
+    start = time.perf_counter()
+    from .recommender_registry import recommender_registry
+    import_ms = (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    recommender_registry.get(engine)
+    build_ms = (time.perf_counter() - start) * 1000
+    
+    profile = generate_profiles(1, seed=-1)[0]
+    start = time.perf_counter()
+    recommender_registry.recommend(profile, engine)
+    first_call_ms = (time.perf_counter() - start) * 1000
+    return {"import_ms": import_ms, "build_ms": build_ms, "first_call_ms": first_call_ms}
+
+def run_cold(engine: str, runs: int) -> Dict[str, Any]:
+    """在子程序中重複量測冷啟動"""
+    probes = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "src.services.benchmark", "--cold-probe", engine],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        probes.append(json.loads(output.strip().splitlines()[-1]))
+    return summarize(
+        f"{engine}/cold", [p["import_ms"] + p["build_ms"] + p["first_call_ms"] for p in probes], runs,
+        engine=engine, mode="cold", batch_size=1,
+        build_ms=round(float(np.median([p["build_ms"] for p in probes])), 3),
+        first_call_ms=round(float(np.median([p["first_call_ms"] for p in probes])), 3)
+    )
+
+def run_engine(engine: str, iterations: int, batch_sizes: List[int], batch_iterations: int,
+               warmup: int, seed: int) -> List[Dict[str, Any]]:
+    """暖機後量測單筆與批次推薦"""
+    from .recommender_registry import recommender_registry
+    
+    for profile in generate_profiles(warmup, seed=seed + 1):
+        recommender_registry.recommend(profile, engine)
+    
+    results = [summarize(
+        f"{engine}/single",
+        _time_calls(lambda p: recommender_registry.recommend(p, engine), generate_profiles(iterations, seed=seed + 2)),
+        iterations, engine=engine, mode="single", batch_size=1
+    )]
+    for offset, size in enumerate(batch_sizes):
+        batches = _chunks(generate_profiles(size * batch_iterations, seed=seed + 10 + offset), size)
+        results.append(summarize(
+            f"{engine}/batch_{size}",
+            _time_calls(lambda b: recommender_registry.recommend_batch(b, engine), batches),
+            size * len(batches), engine=engine, mode="batch", batch_size=size
+        ))
+    return results
+
+def run_components(iterations: int, batch_sizes: List[int], seed: int) -> List[Dict[str, Any]]:
+    """量測隨機森林的特徵擷取與 predict_proba（不經過快取與派發器）"""
+    from .ai_standalone import get_ai_recommendation
+    
+    model = get_ai_recommendation()
+    schema = model.feature_schema
+    profiles = generate_profiles(iterations, seed=seed + 100)
+    rows = [model.scaler.transform(schema.transform(p)) for p in profiles]
+    
+    results = [
+        summarize("features/single", _time_calls(schema.transform, profiles), iterations,
+                  mode="single", batch_size=1),
+        summarize("predict_proba/single", _time_calls(model.model.predict_proba, rows), iterations,
+                  mode="single", batch_size=1)
+    ]
+    for size in batch_sizes:
+        batches = _chunks(profiles, size) or [profiles]
+        matrices = [model.scaler.transform(schema.transform_batch(b)) for b in batches]
+        results.append(summarize(f"features/batch_{size}", _time_calls(schema.transform_batch, batches),
+                                 sum(len(b) for b in batches), mode="batch", batch_size=size))
+        results.append(summarize(f"predict_proba/batch_{size}", _time_calls(model.model.predict_proba, matrices),
+                                 sum(len(m) for m in matrices), mode="batch", batch_size=size))
+    return results
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], max_regression: float) -> List[str]:
+    """與基準結果比較 p95，回傳退步超過門檻的項目"""
+    previous = {r["name"]: r for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result["name"])
+        if before is None or not before.get("p95_ms"):
+            continue
+        change = result["p95_ms"] / before["p95_ms"] - 1
+        if change > max_regression:
+            regressions.append(
+                f"{result['name']}: p95 {before['p95_ms']:.3f}ms → {result['p95_ms']:.3f}ms（+{change:.0%}）"
+            )
+    return regressions
+
+def _engine_version(registry: Any, engine: str) -> Optional[str]:
+    """以樣本資料取得引擎回報的模型版本"""
+    for profile in generate_profiles(20, seed=-1):
+        recommendations = registry.recommend(profile, engine)
+        if recommendations:
+            return recommendations[0].get("model_version")
+    return None
+
+def _environment() -> Dict[str, Any]:
+    import sklearn
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="推薦延遲與吞吐量基準測試")
+    parser.add_argument("--engines", default="forest,keyword", help="要量測的引擎，以逗號分隔")
+    parser.add_argument("--iterations", type=int, default=300, help="單筆推薦次數")
+    parser.add_argument("--batch-sizes", default="8,32,128", help="批次大小，以逗號分隔")
+    parser.add_argument("--batch-iterations", type=int, default=20, help="每種批次大小的呼叫次數")
+    parser.add_argument("--warmup", type=int, default=20, help="暖機次數")
+    parser.add_argument("--cold-runs", type=int, default=3, help="冷啟動量測次數（0 為略過）")
+    parser.add_argument("--seed", type=int, default=0, help="模擬資料亂數種子")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON 結果輸出路徑")
+    parser.add_argument("--baseline", default=None, help="作為比較基準的先前結果")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="允許的 p95 退步比例")
+    parser.add_argument("--cold-probe", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.cold_probe:
+        print(json.dumps(cold_probe(args.cold_probe)))
+        return
+    
+    engines = [e for e in args.engines.split(",") if e]
+    batch_sizes = [int(s) for s in args.batch_sizes.split(",") if s]
+    
+    results: List[Dict[str, Any]] = []
+    for index, engine in enumerate(engines):
+        if args.cold_runs > 0:
+            results.append(run_cold(engine, args.cold_runs))
+        # 各引擎使用不同的資料（混合引擎不會命中其他引擎留下的預測快取）
+        seed = args.seed + 1000 * (index + 1)
+        results.extend(run_engine(engine, args.iterations, batch_sizes, args.batch_iterations, args.warmup, seed))
+    if "forest" in engines:
+        results.extend(run_components(args.iterations, batch_sizes, args.seed))
+    
+    for r in results:
+        print(f"{r['name']:>24}  p50 {r['p50_ms']:9.3f}ms  p95 {r['p95_ms']:9.3f}ms  "
+              f"p99 {r['p99_ms']:9.3f}ms  {r['throughput_per_s'] or 0:10.1f}/s")
+    
+    from .recommender_registry import recommender_registry
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("cold_probe", "baseline", "output")},
+        "engine_versions": {name: _engine_version(recommender_registry, name) for name in engines},
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📄 結果已寫入 {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f)["results"], args.max_regression)
+        if regressions:
+            print("❌ 效能退步超過門檻：")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"✅ 與 {args.baseline} 相比沒有超過 {args.max_regression:.0%} 的 p95 退步")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+學系目錄
+由版本化資料檔載入所有學系的描述、關鍵字、學科、職涯與大學資料，
+並建立關鍵字到學系的倒排索引，讓推薦時只需對相關學系計分。
+"""
+
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from ..config import DEPARTMENT_CATALOG_PATH
+
+REQUIRED_FIELDS = ("id", "name", "universities")
+
+def match_terms(text: str, vocabulary: Dict[str, Any], max_length: int) -> List[Any]:
+    """找出文字中出現的詞彙（列舉子字串查表，成本與詞彙量無關）"""
+    found = []
+    seen = set()
+    length = len(text)
+    for i in range(length):
+        for j in range(i + 1, min(length, i + max_length) + 1):
+            term = text[i:j]
+            if term in vocabulary and term not in seen:
+                seen.add(term)
+                found.append(vocabulary[term])
+    return found
+
+class DepartmentCatalog:
+    """學系目錄與關鍵字倒排索引"""
+    
+    def __init__(self, path: str = DEPARTMENT_CATALOG_PATH):
+        self.path = path
+        self.version: Optional[str] = None
+        self.departments: List[Dict[str, Any]] = []
+        self.keyword_index: Dict[str, List[int]] = {}
+        self._by_name: Dict[str, Dict[str, Any]] = {}
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._max_term_length = 0
+    
+    def load(self) -> "DepartmentCatalog":
+        """讀取資料檔並重建索引"""
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        
+        departments = data.get("departments", [])
+        by_name: Dict[str, Dict[str, Any]] = {}
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for dept in departments:
+            missing = [field for field in REQUIRED_FIELDS if not dept.get(field)]
+            if missing:
+                raise ValueError(f"學系資料缺少欄位 {missing}: {dept}")
+            if dept["id"] in by_id or dept["name"] in by_name:
+                raise ValueError(f"學系資料重複: {dept['id']} / {dept['name']}")
+            dept.setdefault("description", "")
+            dept.setdefault("keywords", [])
+            dept.setdefault("required_subjects", [])
+            dept.setdefault("career_paths", [])
+            dept.setdefault("majors", [])
+            by_id[dept["id"]] = dept
+            by_name[dept["name"]] = dept
+        
+        # 倒排索引：關鍵字與職涯用詞 → 學系索引
+        keyword_index: Dict[str, List[int]] = {}
+        for idx, dept in enumerate(departments):
+            terms = [k.lower() for k in dept["keywords"]]
+            terms += [token for path in dept["career_paths"] for token in path.lower().split()]
+            for term in set(terms):
+                keyword_index.setdefault(term, []).append(idx)
+        
+        self.version = str(data.get("version", "unknown"))
+        self.departments = departments
+        self.keyword_index = keyword_index
+        self._by_name = by_name
+        self._by_id = by_id
+        self._max_term_length = max((len(term) for term in keyword_index), default=0)
+        return self
+    
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """依學系名稱取得資料"""
+        return self._by_name.get(name)
+    
+    def get_by_id(self, department_id: str) -> Optional[Dict[str, Any]]:
+        """依學系 id 取得資料"""
+        return self._by_id.get(department_id)
+    
+    def candidates(self, texts: Iterable[str]) -> List[int]:
+        """以倒排索引找出與文字相關的學系索引"""
+        found = set()
+        for text in texts:
+            if not text:
+                continue
+            for indices in match_terms(text.lower(), self.keyword_index, self._max_term_length):
+                found.update(indices)
+        return sorted(found)
+    
+    def __len__(self) -> int:
+        return len(self.departments)
+
+# 全域實例（第一次使用時載入）
+_catalog: Optional[DepartmentCatalog] = None
+_catalog_lock = threading.Lock()
+
+def get_department_catalog() -> DepartmentCatalog:
+    """取得全域學系目錄"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = DepartmentCatalog().load()
+                print(f"📚 已載入學系目錄 版本 {_catalog.version}，共 {len(_catalog)} 個學系")
+    return _catalog
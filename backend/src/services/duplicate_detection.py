@@ -0,0 +1,159 @@
+"""
+備審近似重複偵測
+分析時以中文字元 n-gram 計算 MinHash 簽章並存入 PDFUpload.minhash_signature，
+記憶體中的 LSH（分段雜湊）索引讓每份新文件只需比對落在相同桶中的候選，
+不必與所有已存文件逐一比較；查詢前與資料庫增量同步（見 index_sync），其他 worker 的上傳也查得到。
+"""
+
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import (
+    MINHASH_NUM_PERM, MINHASH_NGRAM, LSH_BANDS, DUPLICATE_SIMILARITY_THRESHOLD
+)
+from ..models.pdf_upload import PDFUpload
+from .index_sync import DatabaseSyncedIndex
+from .metrics import metrics
+
+duplicate_candidates = metrics.histogram(
+    "duplicate_lsh_candidates", "每次 LSH 查詢的候選文件數", buckets=(0, 1, 2, 5, 10, 20, 50, 100, 500)
+)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# 頁碼標記、空白與標點不列入比對
+_PAGE_MARKER = re.compile(r"--- 第 \d+ 頁 ---")
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, _MERSENNE_PRIME, size=MINHASH_NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, _MERSENNE_PRIME, size=MINHASH_NUM_PERM, dtype=np.uint64)
+
+def _shingles(text: str, n: int = MINHASH_NGRAM) -> Set[int]:
+    """正規化後取字元 n-gram 的 32 位元雜湊集合（中文不需分詞）"""
+    normalized = _NON_WORD.sub("", _PAGE_MARKER.sub("", text)).lower()
+    if len(normalized) < n:
+        return {zlib.crc32(normalized.encode("utf-8"))} if normalized else set()
+    return {zlib.crc32(normalized[i:i + n].encode("utf-8")) for i in range(len(normalized) - n + 1)}
+
+def compute_minhash(text: str) -> Optional[bytes]:
+    """計算 MinHash 簽章（MINHASH_NUM_PERM 個 uint32），無內容時回傳 None"""
+    shingles = _shingles(text or "")
+    if not shingles:
+        return None
+    hashes = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+    signature = np.full(MINHASH_NUM_PERM, _MAX_HASH, dtype=np.uint64)
+    # 分塊計算，避免長文件一次配置 num_perm × shingles 的大矩陣
+    for start in range(0, len(hashes), 4096):
+        chunk = hashes[start:start + 4096]
+        permuted = ((np.outer(_PERM_A, chunk) + _PERM_B[:, np.newaxis]) % _MERSENNE_PRIME) & _MAX_HASH
+        signature = np.minimum(signature, permuted.min(axis=1))
+    return signature.astype(np.uint32).tobytes()
+
+def estimate_similarity(signature_a: bytes, signature_b: bytes) -> float:
+    """以簽章相同位置的比例估計 Jaccard 相似度"""
+    a = np.frombuffer(signature_a, dtype=np.uint32)
+    b = np.frombuffer(signature_b, dtype=np.uint32)
+    return float(np.mean(a == b))
+
+class LSHIndex(DatabaseSyncedIndex):
+    """MinHash 簽章的 LSH 索引：簽章切成 bands 段，任一段完全相同即為候選"""
+    
+    column_name = "minhash_signature"
+    label = "🔍 近似重複索引"
+    
+    def __init__(self, num_perm: int = MINHASH_NUM_PERM, bands: int = LSH_BANDS):
+        super().__init__()
+        if num_perm % bands:
+            raise ValueError("MINHASH_NUM_PERM 必須能被 LSH_BANDS 整除")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: List[Dict[bytes, Set[int]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[int, bytes] = {}
+        self._lock = threading.Lock()
+    
+    def _band_keys(self, signature: bytes) -> List[bytes]:
+        """簽章各段的桶鍵"""
+        width = self.rows * 4
+        return [signature[i * width:(i + 1) * width] for i in range(self.bands)]
+    
+    def add(self, upload_id: int, signature: bytes):
+        """新增一份文件的簽章"""
+        with self._lock:
+            self._discard(upload_id)
+            self._signatures[upload_id] = signature
+            for band, key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(key, set()).add(upload_id)
+    
+    def remove(self, upload_id: int):
+        """移除一份文件"""
+        with self._lock:
+            self._discard(upload_id)
+    
+    def _discard(self, upload_id: int):
+        signature = self._signatures.pop(upload_id, None)
+        if signature is None:
+            return
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(upload_id)
+                if not bucket:
+                    del self._buckets[band][key]
+    
+    def query(self, signature: bytes, threshold: float = DUPLICATE_SIMILARITY_THRESHOLD,
+              exclude_id: Optional[int] = None) -> List[Tuple[int, float]]:
+        """找出估計相似度不低於 threshold 的文件，回傳 [(upload_id, 相似度)]（遞減）"""
+        with self._lock:
+            candidates: Set[int] = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates.update(self._buckets[band].get(key, ()))
+            candidates.discard(exclude_id)
+            candidate_signatures = [(cid, self._signatures[cid]) for cid in candidates]
+        duplicate_candidates.observe(len(candidate_signatures))
+        
+        results = []
+        for candidate_id, candidate_signature in candidate_signatures:
+            similarity = estimate_similarity(signature, candidate_signature)
+            if similarity >= threshold:
+                results.append((candidate_id, round(similarity, 4)))
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results
+    
+    def ids(self) -> Set[int]:
+        with self._lock:
+            return set(self._signatures)
+    
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+# 全域實例
+duplicate_index = LSHIndex()
+
+async def _existing(db: AsyncSession, matches: List[Tuple[int, float]]) -> List[Dict[str, float]]:
+    """排除已刪除或歸檔（尚未比對移除）的上傳"""
+    existing = await duplicate_index.drop_missing(db, [upload_id for upload_id, _ in matches])
+    return [
+        {"upload_id": upload_id, "similarity": similarity}
+        for upload_id, similarity in matches if upload_id in existing
+    ]
+
+async def find_near_duplicates(db: AsyncSession, pdf_upload: PDFUpload) -> List[Dict[str, float]]:
+    """查詢與指定上傳內容近似的其他上傳"""
+    if not pdf_upload.minhash_signature:
+        return []
+    await duplicate_index.sync(db)
+    return await _existing(db, duplicate_index.query(pdf_upload.minhash_signature, exclude_id=pdf_upload.id))
+
+async def register_upload(db: AsyncSession, upload_id: int, signature: Optional[bytes]) -> List[Dict[str, float]]:
+    """新上傳加入索引並回傳其近似重複的既有上傳"""
+    if not signature:
+        return []
+    await duplicate_index.sync(db)
+    duplicates = duplicate_index.query(signature, exclude_id=upload_id)
+    duplicate_index.add(upload_id, signature)
+    return await _existing(db, duplicates)
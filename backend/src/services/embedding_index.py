@@ -0,0 +1,248 @@
+"""
+學系嵌入向量索引
+將推薦器的稀疏特徵以隨機化 SVD 降維為 NumPy 向量，再以 k-means 分成多個分區（IVF）。
+查詢時只在與學生向量最相近的 n_probe 個分區內計分；n_probe 越大召回率越高、延遲也越高。
+召回率以原始稀疏特徵的暴力計分為基準。
+
+基準測試（於 backend 目錄執行）：
+    python -m src.services.embedding_index --departments 5000 --n-probe 1,2,4,8,16
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from scipy import sparse
+
+def _to_dense_row(query: Any) -> np.ndarray:
+    """將查詢向量轉為一維 NumPy 陣列"""
+    if sparse.issparse(query):
+        return query.toarray().ravel()
+    return np.asarray(query, dtype=float).ravel()
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2 正規化每一列（零向量維持不變）"""
+    norms = np.linalg.norm(vectors, axis=1)
+    norms[norms == 0] = 1.0
+    return vectors / norms[:, np.newaxis]
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """取得分數最高的 k 個索引（依分數遞減）"""
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+def fit_projection(vectors: Any, dim: int, seed: int = 0, n_oversample: int = 10) -> np.ndarray:
+    """以隨機化 SVD 求出保留內積的降維投影矩陣（feature × dim）"""
+    n_features = vectors.shape[1]
+    dim = min(dim, n_features, vectors.shape[0])
+    rng = np.random.default_rng(seed)
+    omega = rng.standard_normal((vectors.shape[0], min(dim + n_oversample, vectors.shape[0])))
+    # 右奇異子空間：對 X^T 取值域
+    sample = np.asarray(vectors.T @ omega)
+    basis, _ = np.linalg.qr(sample)
+    reduced = np.asarray(vectors @ basis)
+    _, _, vt = np.linalg.svd(reduced, full_matrices=False)
+    return basis @ vt[:dim].T
+
+class IVFIndex:
+    """以 k-means 分區的近似最近鄰索引（內積相似度）"""
+    
+    def __init__(self, n_lists: Optional[int] = None, n_probe: int = 8, n_iter: int = 20, seed: int = 0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.seed = seed
+        self.vectors: Optional[np.ndarray] = None  # 依分區排序後的向量
+        self.centroids: Optional[np.ndarray] = None
+        self.order: Optional[np.ndarray] = None  # 排序後第 i 列對應的原始索引
+        self.offsets: Optional[np.ndarray] = None  # 每個分區的起訖列
+    
+    def fit(self, vectors: np.ndarray) -> "IVFIndex":
+        """以球面 k-means 建立分區"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n = vectors.shape[0]
+        n_lists = min(self.n_lists or max(1, int(np.sqrt(n))), n)
+        rng = np.random.default_rng(self.seed)
+        normalized = _normalize_rows(vectors)
+        
+        centroids = normalized[rng.choice(n, n_lists, replace=False)].copy()
+        assignments = np.zeros(n, dtype=int)
+        for iteration in range(self.n_iter):
+            new_assignments = (normalized @ centroids.T).argmax(axis=1)
+            if iteration > 0 and np.array_equal(new_assignments, assignments):
+                break
+            assignments = new_assignments
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, normalized)
+            counts = np.bincount(assignments, minlength=n_lists)
+            # 空分區改以隨機向量重新初始化
+            empty = np.flatnonzero(counts == 0)
+            sums[empty] = normalized[rng.choice(n, len(empty))]
+            centroids = _normalize_rows(sums)
+        
+        # 向量依分區重新排列，探測分區時只需取連續的列
+        self.order = np.argsort(assignments, kind="stable")
+        self.vectors = vectors[self.order]
+        self.centroids = centroids
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=n_lists))])
+        self.n_lists = n_lists
+        return self
+    
+    def search(self, query: np.ndarray, k: int, n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """在最相近的 n_probe 個分區內搜尋內積最高的 k 個向量，回傳 (索引, 分數)"""
+        q = np.asarray(query, dtype=np.float32).ravel()
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        probes = _top_k(self.centroids @ q, n_probe)
+        rows = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probes])
+        scores = self.vectors[rows] @ q
+        top = _top_k(scores, k)
+        return self.order[rows[top]], scores[top]
+    
+    def __len__(self) -> int:
+        return 0 if self.vectors is None else self.vectors.shape[0]
+
+class DepartmentEmbeddingIndex:
+    """學系嵌入索引：將推薦器的稀疏特徵（學科、關鍵字、TF-IDF）降維為 NumPy 向量後建立 IVF"""
+    
+    def __init__(self, dim: int = 128, n_lists: Optional[int] = None, n_probe: int = 8,
+                 rerank: int = 4, seed: int = 0):
+        self.dim = dim
+        self.rerank = rerank  # 先取 k * rerank 個近似結果，再以原始向量精確重排
+        self.seed = seed
+        self.projection: Optional[np.ndarray] = None
+        self.embeddings = None  # 原始稀疏向量，用於暴力計分基準
+        self.ivf = IVFIndex(n_lists=n_lists, n_probe=n_probe, seed=seed)
+    
+    def fit(self, embeddings: Any) -> "DepartmentEmbeddingIndex":
+        """建立投影與分區"""
+        self.embeddings = sparse.csr_matrix(embeddings)
+        self.projection = fit_projection(self.embeddings, self.dim, self.seed).astype(np.float32)
+        self.ivf.fit(np.asarray(self.embeddings @ self.projection))
+        return self
+    
+    def project(self, query: Any) -> np.ndarray:
+        """將查詢向量投影到嵌入空間"""
+        if sparse.issparse(query):
+            # 與投影矩陣同為 float32，避免每次查詢複製整個投影矩陣
+            return np.asarray(query.astype(np.float32) @ self.projection).ravel()
+        return _to_dense_row(query).astype(np.float32) @ self.projection
+    
+    def search(self, query: Any, k: int, n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """近似搜尋內積最高的 k 個學系"""
+        ids, _ = self.ivf.search(self.project(query), k * max(1, self.rerank), n_probe)
+        scores = np.asarray(self.embeddings[ids] @ _to_dense_row(query)).ravel()
+        top = _top_k(scores, k)
+        return ids[top], scores[top]
+    
+    def brute_force(self, query: Any, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """以原始稀疏向量對所有學系精確計分"""
+        scores = np.asarray(self.embeddings @ _to_dense_row(query)).ravel()
+        top = _top_k(scores, k)
+        return top, scores[top]
+    
+    @property
+    def n_lists(self) -> int:
+        return self.ivf.n_lists
+    
+    def __len__(self) -> int:
+        return len(self.ivf)
+
+def benchmark(index: DepartmentEmbeddingIndex, queries: List[Any], k: int, n_probes: List[int]) -> List[Dict[str, float]]:
+    """比較不同 n_probe 的 top-k 召回率與延遲（以暴力計分為基準，同分視為命中）"""
+    thresholds = []
+    exact_scores = []
+    start = time.perf_counter()
+    for query in queries:
+        _, top_scores = index.brute_force(query, k)
+        thresholds.append(top_scores[-1])
+    brute_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    for query in queries:
+        exact_scores.append(np.asarray(index.embeddings @ _to_dense_row(query)).ravel())
+    
+    results = [{"n_probe": index.n_lists, "recall": 1.0, "latency_ms": brute_ms, "brute_force": True}]
+    for n_probe in n_probes:
+        start = time.perf_counter()
+        found = [index.search(query, k, n_probe)[0] for query in queries]
+        latency_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        hits = sum(
+            int(np.sum(scores[ids] >= threshold - 1e-9))
+            for ids, scores, threshold in zip(found, exact_scores, thresholds)
+        )
+        results.append({
+            "n_probe": n_probe,
+            "recall": hits / (k * len(queries)),
+            "latency_ms": latency_ms,
+            "brute_force": False
+        })
+    return results
+
+def _synthetic_catalog(n_departments: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """以內建學系目錄為樣本產生大型模擬目錄"""
+    from .department_catalog import get_department_catalog
+    
+    rng = random.Random(seed)
+    base = get_department_catalog().departments
+    keyword_pool = sorted({k for dept in base for k in dept["keywords"]})
+    catalog = {}
+    for i in range(n_departments):
+        dept = base[i % len(base)]
+        keywords = rng.sample(dept["keywords"], min(3, len(dept["keywords"])))
+        keywords += rng.sample(keyword_pool, 2) + [f"專長{i % (n_departments // 4 + 1)}"]
+        catalog[f"{dept['name']}{i}"] = {
+            **dept,
+            "keywords": keywords,
+            "description": dept["description"] + "、".join(keywords)
+        }
+    return catalog
+
+def _synthetic_students(n_students: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """產生模擬學生資料"""
+    from .department_catalog import get_department_catalog
+    
+    rng = random.Random(seed)
+    keyword_pool = sorted({k for dept in get_department_catalog().departments for k in dept["keywords"]})
+    subjects = ["數學", "物理", "國文", "英文"]
+    return [
+        {
+            "academic_scores": {s: rng.randint(60, 100) for s in rng.sample(subjects, 2)},
+            "interests": rng.sample(keyword_pool, 2),
+            "achievements": [rng.choice(keyword_pool) + "競賽"],
+            "career_goals": ""
+        }
+        for _ in range(n_students)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="學系 ANN 索引召回率與延遲基準測試")
+    parser.add_argument("--departments", type=int, default=5000, help="模擬學系數")
+    parser.add_argument("--queries", type=int, default=200, help="查詢學生數")
+    parser.add_argument("--k", type=int, default=20, help="top-k")
+    parser.add_argument("--dim", type=int, default=128, help="嵌入維度")
+    parser.add_argument("--rerank", type=int, default=4, help="精確重排的候選倍數")
+    parser.add_argument("--n-lists", type=int, default=None, help="分區數（預設為學系數開根號）")
+    parser.add_argument("--n-probe", default="1,2,4,8,16,32", help="要比較的 n_probe，以逗號分隔")
+    args = parser.parse_args()
+    
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from .ai_advanced import DepartmentScoringEngine
+    
+    catalog = _synthetic_catalog(args.departments)
+    vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 3), max_features=20000)
+    department_vectors = vectorizer.fit_transform([d["description"] for d in catalog.values()])
+    engine = DepartmentScoringEngine(catalog, vectorizer, department_vectors)
+    
+    start = time.perf_counter()
+    index = DepartmentEmbeddingIndex(dim=args.dim, n_lists=args.n_lists, rerank=args.rerank).fit(engine.department_embeddings())
+    print(f"🧭 建立索引：{len(index)} 個學系、{args.dim} 維、{index.n_lists} 個分區，耗時 {time.perf_counter() - start:.2f}s")
+    
+    queries = [engine.encode_query(s) for s in _synthetic_students(args.queries)]
+    n_probes = [int(p) for p in args.n_probe.split(",") if p]
+    for row in benchmark(index, queries, args.k, n_probes):
+        label = "暴力計分" if row["brute_force"] else f"n_probe={row['n_probe']}"
+        print(f"{label:>12}  recall@{args.k}={row['recall']:.3f}  {row['latency_ms']:.3f} ms/查詢")
+
+if __name__ == "__main__":
+    main()
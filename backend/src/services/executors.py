@@ -0,0 +1,55 @@
+"""
+阻塞工作池
+控制器為 async def，同步的資料庫查詢、PDF 解析與模型推論必須交給有上限的
+執行緒池或程序池，避免單一請求卡住整個 worker 的事件迴圈
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+from ..config import DB_THREAD_POOL_SIZE, CPU_THREAD_POOL_SIZE, PDF_PROCESS_POOL_SIZE
+
+db_executor = ThreadPoolExecutor(max_workers=DB_THREAD_POOL_SIZE, thread_name_prefix="db")
+cpu_executor = ThreadPoolExecutor(max_workers=CPU_THREAD_POOL_SIZE, thread_name_prefix="cpu")
+_pdf_executor: Optional[ProcessPoolExecutor] = None
+
+def get_pdf_executor() -> Executor:
+    """PDF 提取用的程序池（第一次使用時才建立）"""
+    global _pdf_executor
+    if PDF_PROCESS_POOL_SIZE <= 0:
+        return cpu_executor
+    if _pdf_executor is None:
+        _pdf_executor = ProcessPoolExecutor(max_workers=PDF_PROCESS_POOL_SIZE)
+    return _pdf_executor
+
+async def _run_in_thread_pool(executor: Executor, func: Callable, *args, **kwargs) -> Any:
+    """在執行緒池中執行，並保留目前請求的 contextvars"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, functools.partial(context.run, func, *args, **kwargs))
+
+async def run_in_db_pool(func: Callable, *args, **kwargs) -> Any:
+    """在資料庫執行緒池中執行同步的查詢或檔案 I/O"""
+    return await _run_in_thread_pool(db_executor, func, *args, **kwargs)
+
+async def run_in_cpu_pool(func: Callable, *args, **kwargs) -> Any:
+    """在 CPU 執行緒池中執行推論或文字分析"""
+    return await _run_in_thread_pool(cpu_executor, func, *args, **kwargs)
+
+async def run_in_pdf_pool(func: Callable, *args) -> Any:
+    """在 PDF 程序池中執行（func 與參數必須可 pickle）"""
+    executor = get_pdf_executor()
+    if executor is cpu_executor:
+        return await run_in_cpu_pool(func, *args)
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+def shutdown_executors():
+    """關閉所有工作池"""
+    global _pdf_executor
+    db_executor.shutdown(wait=False)
+    cpu_executor.shutdown(wait=False)
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown(wait=False)
+        _pdf_executor = None
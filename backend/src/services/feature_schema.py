@@ -0,0 +1,127 @@
+"""
+學系推薦特徵結構
+模型載入時預先計算欄位索引與小寫關鍵字表，
+將單一或一批學生資料一次轉換為密集特徵矩陣
+"""
+
+from typing import List, Dict, Any, Sequence, Tuple
+import numpy as np
+
+# 模型使用的特徵欄位（順序需與訓練時一致）
+FEATURE_COLUMNS = [
+    'chinese_score', 'english_score', 'math_score', 'science_score', 'social_score',
+    'interest_programming', 'interest_mathematics', 'interest_physics', 'interest_chemistry',
+    'interest_biology', 'interest_literature', 'interest_history', 'interest_art',
+    'interest_music', 'interest_sports', 'interest_leadership', 'interest_research',
+    'interest_communication', 'interest_creativity', 'interest_analysis',
+    'club_leadership', 'club_tech', 'club_art', 'club_sports', 'club_academic',
+    'competition_math', 'competition_science', 'competition_programming',
+    'competition_language', 'competition_art'
+]
+
+# 學科成績：特徵欄位 -> academic_scores 的鍵
+SCORE_MAPPING = {
+    'chinese_score': 'chinese',
+    'english_score': 'english',
+    'math_score': 'math',
+    'science_score': 'science',
+    'social_score': 'social'
+}
+
+# 興趣特徵：興趣類型 -> 關鍵字
+INTEREST_MAPPING = {
+    'programming': ['程式設計', '程式', 'coding', '軟體', '資訊'],
+    'mathematics': ['數學', '統計', '計算'],
+    'physics': ['物理', '力學', '電學'],
+    'chemistry': ['化學', '實驗'],
+    'biology': ['生物', '生命科學'],
+    'literature': ['文學', '語文', '寫作'],
+    'history': ['歷史', '社會'],
+    'art': ['藝術', '美術', '設計'],
+    'music': ['音樂', '樂器'],
+    'sports': ['運動', '體育', '健身'],
+    'leadership': ['領導', '管理', '組織'],
+    'research': ['研究', '學術', '實驗'],
+    'communication': ['溝通', '表達', '演講'],
+    'creativity': ['創意', '創新', '創作'],
+    'analysis': ['分析', '邏輯', '思考']
+}
+
+# 社團經歷：特徵欄位 -> 關鍵字
+CLUB_MAPPING = {
+    'club_leadership': ['社長', '會長', '幹部', '領導'],
+    'club_tech': ['資訊', '程式', '電腦', '科技'],
+    'club_art': ['美術', '藝術', '設計', '創作'],
+    'club_sports': ['運動', '體育', '球隊', '健身'],
+    'club_academic': ['學術', '研究', '讀書', '競賽']
+}
+
+# 競賽獲獎：特徵欄位 -> 關鍵字
+COMPETITION_MAPPING = {
+    'competition_math': ['數學', '奧林匹亞', '競賽'],
+    'competition_science': ['科學', '物理', '化學', '生物'],
+    'competition_programming': ['程式', '資訊', '軟體'],
+    'competition_language': ['語文', '英文', '國文'],
+    'competition_art': ['美術', '藝術', '創作']
+}
+
+class FeatureSchema:
+    """特徵結構：欄位索引與分組關鍵字表，於模型載入時建立一次"""
+    
+    def __init__(self, feature_columns: Sequence[str]):
+        self.feature_columns = list(feature_columns)
+        self.n_features = len(self.feature_columns)
+        column_index = {name: idx for idx, name in enumerate(self.feature_columns)}
+        
+        # (欄位索引, 成績鍵)
+        self.score_fields: List[Tuple[int, str]] = [
+            (column_index[name], key)
+            for name, key in SCORE_MAPPING.items() if name in column_index
+        ]
+        
+        # (欄位索引, 小寫關鍵字, 關鍵字數)
+        self.interest_fields: List[Tuple[int, Tuple[str, ...], int]] = [
+            (column_index[f'interest_{name}'], tuple(k.lower() for k in keywords), len(keywords))
+            for name, keywords in INTEREST_MAPPING.items() if f'interest_{name}' in column_index
+        ]
+        
+        # 社團與競賽皆為「任一成就包含任一關鍵字」的二元特徵
+        self.achievement_fields: List[Tuple[int, Tuple[str, ...]]] = [
+            (column_index[name], tuple(k.lower() for k in keywords))
+            for mapping in (CLUB_MAPPING, COMPETITION_MAPPING)
+            for name, keywords in mapping.items() if name in column_index
+        ]
+    
+    def transform(self, student_data: Dict[str, Any]) -> np.ndarray:
+        """單一學生資料轉為 (1, n_features) 特徵矩陣"""
+        return self.transform_batch([student_data])
+    
+    def transform_batch(self, profiles: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """一批學生資料轉為 (n_profiles, n_features) 特徵矩陣"""
+        features = np.zeros((len(profiles), self.n_features))
+        
+        for row, student_data in enumerate(profiles):
+            self._fill_row(features[row], student_data)
+        
+        return features
+    
+    def _fill_row(self, row: np.ndarray, student_data: Dict[str, Any]):
+        """填入單列特徵"""
+        # 學科成績
+        academic_scores = student_data.get('academic_scores', {})
+        for idx, key in self.score_fields:
+            row[idx] = academic_scores.get(key, 0)
+        
+        # 興趣特徵：每個興趣只轉小寫一次
+        interests = [interest.lower() for interest in student_data.get('interests', [])]
+        if interests:
+            for idx, keywords, keyword_count in self.interest_fields:
+                match_count = sum(1 for interest in interests for keyword in keywords if keyword in interest)
+                row[idx] = min(match_count / keyword_count, 1.0)
+        
+        # 社團經歷與競賽獲獎：成就合併為單一字串（換行分隔，關鍵字不含換行不會跨筆誤判）
+        achievements = student_data.get('achievements', [])
+        if achievements:
+            achievement_text = '\n'.join(achievements).lower()
+            for idx, keywords in self.achievement_fields:
+                row[idx] = 1 if any(keyword in achievement_text for keyword in keywords) else 0
@@ -0,0 +1,112 @@
+"""
+記憶體索引與資料庫同步
+相似申請者與近似重複索引在每個 worker 各有一份；查詢前以主鍵水位（id > 上次讀到的最大 ID）增量讀取
+其他 worker 新增的上傳，並每 INDEX_RECONCILE_SECONDS 秒比對一次資料庫中的 ID，
+移除已刪除或已歸檔的上傳、補上晚於水位提交的資料列。
+以請求的 AsyncSession 查詢（不另外佔用同步連線池），解碼與建索引在 CPU 工作池執行。
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import INDEX_RECONCILE_SECONDS
+from ..models.pdf_upload import PDFUpload
+from .executors import run_in_cpu_pool
+
+# 每批讀取的筆數
+LOAD_BATCH_SIZE = 5000
+
+class DatabaseSyncedIndex(ABC):
+    """以 PDFUpload 的某個欄位建立、與資料庫增量同步的索引；子類別實作 add、remove 與 ids"""
+    
+    column_name = ""  # PDFUpload 的欄位名稱
+    label = ""
+    
+    def __init__(self):
+        self.column = getattr(PDFUpload, self.column_name)
+        self.last_id = 0
+        self.loaded = False
+        self._reconciled_at = 0.0  # time.monotonic()
+        self._sync_lock = asyncio.Lock()
+    
+    @abstractmethod
+    def add(self, upload_id: int, raw: bytes):
+        """新增或更新一筆上傳"""
+    
+    @abstractmethod
+    def remove(self, upload_id: int):
+        """移除一筆上傳"""
+    
+    @abstractmethod
+    def ids(self) -> Set[int]:
+        """索引中的上傳 ID"""
+    
+    @abstractmethod
+    def __len__(self) -> int:
+        """索引筆數"""
+    
+    def _add_rows(self, rows: List[Tuple[int, bytes]]):
+        for upload_id, raw in rows:
+            self.add(upload_id, raw)
+    
+    async def _load_after(self, db: AsyncSession, after_id: int) -> int:
+        """載入 ID 大於 after_id 的資料列，回傳筆數"""
+        loaded = 0
+        while True:
+            rows = (await db.execute(
+                select(PDFUpload.id, self.column).where(
+                    PDFUpload.id > after_id,
+                    self.column.isnot(None)
+                ).order_by(PDFUpload.id).limit(LOAD_BATCH_SIZE)
+            )).all()
+            if not rows:
+                return loaded
+            await run_in_cpu_pool(self._add_rows, rows)
+            after_id = rows[-1][0]
+            self.last_id = max(self.last_id, after_id)
+            loaded += len(rows)
+    
+    async def _load_ids(self, db: AsyncSession, upload_ids: Iterable[int]):
+        upload_ids = list(upload_ids)
+        for start in range(0, len(upload_ids), LOAD_BATCH_SIZE):
+            rows = (await db.execute(
+                select(PDFUpload.id, self.column).where(
+                    PDFUpload.id.in_(upload_ids[start:start + LOAD_BATCH_SIZE])
+                )
+            )).all()
+            await run_in_cpu_pool(self._add_rows, rows)
+    
+    async def reconcile(self, db: AsyncSession):
+        """比對資料庫中的 ID：移除已刪除的、補上漏掉的"""
+        stored = set((await db.execute(select(PDFUpload.id).where(self.column.isnot(None)))).scalars())
+        indexed = self.ids()
+        for upload_id in indexed - stored:
+            self.remove(upload_id)
+        await self._load_ids(db, stored - indexed)
+        self._reconciled_at = time.monotonic()
+    
+    async def sync(self, db: AsyncSession):
+        """查詢前呼叫：第一次完整載入，之後增量讀取新資料列並定期比對刪除"""
+        async with self._sync_lock:
+            if not self.loaded:
+                await self._load_after(db, 0)
+                self.loaded = True
+                self._reconciled_at = time.monotonic()
+                print(f"{self.label}已載入 {len(self)} 筆")
+                return
+            await self._load_after(db, self.last_id)
+            if time.monotonic() - self._reconciled_at >= INDEX_RECONCILE_SECONDS:
+                await self.reconcile(db)
+    
+    async def drop_missing(self, db: AsyncSession, upload_ids: Iterable[int]) -> Set[int]:
+        """查詢結果中已不在資料庫的上傳自索引移除，回傳仍存在的 ID"""
+        upload_ids = set(upload_ids)
+        if not upload_ids:
+            return upload_ids
+        existing = set((await db.execute(select(PDFUpload.id).where(PDFUpload.id.in_(upload_ids)))).scalars())
+        for upload_id in upload_ids - existing:
+            self.remove(upload_id)
+        return existing
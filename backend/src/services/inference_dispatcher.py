@@ -0,0 +1,112 @@
+"""
+推論微批次派發器
+收集同時抵達的特徵向量，在等待時間或批次大小上限到達時合併為一次
+scaler.transform 與 predict_proba，再把結果分回各呼叫者的 Future
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+from .metrics import metrics
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+batch_size_histogram = metrics.histogram(
+    "inference_batch_size", "每次批次推論的資料筆數", BATCH_SIZE_BUCKETS
+)
+queue_wait_histogram = metrics.histogram(
+    "inference_queue_wait_seconds", "特徵向量在派發佇列中等待的時間（秒）"
+)
+batch_latency_histogram = metrics.histogram(
+    "inference_batch_seconds", "一次批次推論的執行時間（秒）"
+)
+
+PredictBatchFn = Callable[[np.ndarray], List[List[Tuple[str, float]]]]
+
+class InferenceDispatcher:
+    """微批次推論派發器（背景執行緒）
+    
+    每筆提交都帶著要使用的模型預測函式，同一批中依模型分組執行，
+    因此模型熱更新時，已提交的請求仍會在舊模型上完成
+    """
+    
+    def __init__(self, max_wait_ms: float, max_batch: int):
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self._queue: "queue.Queue[Tuple[PredictBatchFn, np.ndarray, Future, float]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="inference-dispatcher", daemon=True)
+        self._worker.start()
+    
+    def submit(self, predict_batch: PredictBatchFn, features: np.ndarray) -> Future:
+        """提交特徵矩陣（每列一位學生），回傳對應各列預測結果的 Future"""
+        future = Future()
+        self._queue.put((predict_batch, np.atleast_2d(features), future, time.perf_counter()))
+        return future
+    
+    def predict_batch(self, predict_batch: PredictBatchFn, features: np.ndarray) -> List[List[Tuple[str, float]]]:
+        """提交並等待結果"""
+        return self.submit(predict_batch, features).result()
+    
+    def _collect(self) -> list:
+        """取出第一筆後，在等待時間內持續收集直到批次額滿"""
+        pending = [self._queue.get()]
+        rows = len(pending[0][1])
+        deadline = time.perf_counter() + self.max_wait
+        
+        while rows < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            pending.append(item)
+            rows += len(item[1])
+        
+        return pending
+    
+    def _run(self):
+        while True:
+            pending = self._collect()
+            try:
+                self._dispatch(pending)
+            except Exception as e:
+                # 未預期的錯誤只讓這一批失敗，派發執行緒繼續處理後續請求（否則呼叫者會永遠等待）
+                print(f"推論批次失敗: {e}")
+                for _, _, future, _ in pending:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    def _dispatch(self, pending: list):
+        started = time.perf_counter()
+        
+        # 依模型分組（一般情況只有一組）
+        groups: Dict[PredictBatchFn, list] = {}
+        for predict_batch, features, future, enqueued in pending:
+            queue_wait_histogram.observe(started - enqueued)
+            groups.setdefault(predict_batch, []).append((features, future))
+        
+        for predict_batch, items in groups.items():
+            self._run_group(predict_batch, items)
+    
+    def _run_group(self, predict_batch: PredictBatchFn, items: List[Tuple[np.ndarray, Future]]):
+        """對同一模型的請求執行一次批次推論"""
+        started = time.perf_counter()
+        try:
+            features = np.vstack([item[0] for item in items])
+            batch_size_histogram.observe(len(features))
+            results = predict_batch(features)
+        except Exception as e:
+            for _, future in items:
+                future.set_exception(e)
+            return
+        finally:
+            batch_latency_histogram.observe(time.perf_counter() - started)
+        
+        # 依提交順序切回各自的結果
+        offset = 0
+        for rows, future in items:
+            future.set_result(results[offset:offset + len(rows)])
+            offset += len(rows)
@@ -0,0 +1,53 @@
+"""
+模型推論服務用戶端
+API worker 透過 Unix socket 呼叫 model_server，協定請見 model_server.py
+"""
+
+import json
+import socket
+from typing import List, Dict, Any
+from ..config import MODEL_SERVER_TIMEOUT
+
+class ModelServerError(Exception):
+    """模型服務呼叫失敗"""
+
+class ModelServerClient:
+    """模型服務用戶端（每次呼叫建立一條連線）"""
+    
+    def __init__(self, socket_path: str, timeout: float = MODEL_SERVER_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+    
+    def analyze_batch(self, profiles: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """送出一批學生資料，取得每位學生的推薦結果"""
+        payload = json.dumps({"profiles": profiles}, ensure_ascii=False).encode("utf-8") + b"\n"
+        
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+                sock.sendall(payload)
+                
+                chunks = []
+                while True:
+                    chunk = sock.recv(65536)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    if chunk.endswith(b"\n"):
+                        break
+        except OSError as e:
+            raise ModelServerError(f"無法連線模型服務 {self.socket_path}: {e}") from e
+        
+        try:
+            response = json.loads(b"".join(chunks).decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ModelServerError(f"模型服務回應格式錯誤: {e}") from e
+        
+        if "error" in response:
+            raise ModelServerError(response["error"])
+        return response["results"]
+    
+    def analyze_student_data(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """分析單一學生資料"""
+        return self.analyze_batch([data])[0]
@@ -0,0 +1,176 @@
+"""
+模型註冊表
+管理目前使用中的學系推薦模型：監看版本化 bundle 目錄或接受管理端觸發，
+在背景載入並預熱新模型後，原子性地替換使用中的模型參照。
+已取得舊模型參照的請求會在舊模型上完成。
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from ..config import (
+    MODEL_BUNDLE_DIR, MODEL_WATCH_INTERVAL,
+    INFERENCE_BATCH_MAX_WAIT_MS, INFERENCE_BATCH_MAX_SIZE
+)
+from .ai_standalone import DepartmentRecommendationAI
+from .inference_dispatcher import InferenceDispatcher
+from .metrics import metrics
+
+model_reloads = metrics.counter("model_reloads_total", "模型熱更新成功次數")
+model_reload_failures = metrics.counter("model_reload_failures_total", "模型熱更新失敗次數")
+
+# 預熱用的學生資料
+WARMUP_PROFILES: List[Dict[str, Any]] = [
+    {
+        "academic_scores": {"chinese": 85, "english": 92, "math": 88, "science": 90, "social": 87},
+        "interests": ["程式設計", "數學", "物理", "人工智慧"],
+        "achievements": ["全國資訊競賽第三名", "數學奧林匹亞初選通過", "程式設計社團社長"]
+    },
+    {
+        "academic_scores": {"chinese": 90, "english": 88, "math": 70, "science": 65, "social": 92},
+        "interests": ["文學", "寫作", "溝通"],
+        "achievements": ["全國語文競賽優勝", "學生會會長"]
+    },
+    {
+        "academic_scores": {"chinese": 75, "english": 80, "math": 78, "science": 82, "social": 70},
+        "interests": ["藝術", "設計", "創意"],
+        "achievements": ["美術比賽佳作"]
+    }
+]
+
+class ModelRegistry:
+    """使用中模型的註冊表（執行緒安全）"""
+    
+    def __init__(self, bundle_dir: str = MODEL_BUNDLE_DIR, watch_interval: float = MODEL_WATCH_INTERVAL):
+        self.bundle_dir = bundle_dir
+        self.watch_interval = watch_interval
+        self.dispatcher = (
+            InferenceDispatcher(INFERENCE_BATCH_MAX_WAIT_MS, INFERENCE_BATCH_MAX_SIZE)
+            if INFERENCE_BATCH_MAX_WAIT_MS > 0 else None
+        )
+        self.last_reload_error: Optional[str] = None
+        self.last_failed_version: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self._active: Optional[DepartmentRecommendationAI] = None
+        self._init_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+    
+    def current(self) -> DepartmentRecommendationAI:
+        """取得使用中的模型，第一次呼叫時載入並啟動監看"""
+        active = self._active
+        if active is not None:
+            return active
+        
+        with self._init_lock:
+            if self._active is None:
+                latest = self.latest_bundle()
+                self._activate(self._build(latest))
+                self._start_watcher()
+            return self._active
+    
+    @property
+    def active_version(self) -> Optional[str]:
+        return self._active.model_version if self._active is not None else None
+    
+    def list_versions(self) -> List[str]:
+        """列出 bundle 目錄中的版本（由舊到新，版本名稱以時間戳開頭）"""
+        if not os.path.isdir(self.bundle_dir):
+            return []
+        return sorted(
+            name[:-len(".pkl")] for name in os.listdir(self.bundle_dir) if name.endswith(".pkl")
+        )
+    
+    def latest_bundle(self) -> Optional[str]:
+        """最新 bundle 的路徑，沒有 bundle 時回傳 None"""
+        versions = self.list_versions()
+        return self.bundle_path(versions[-1]) if versions else None
+    
+    def bundle_path(self, version: str) -> str:
+        return os.path.join(self.bundle_dir, f"{version}.pkl")
+    
+    def reload(self, version: Optional[str] = None) -> str:
+        """載入指定（預設最新）版本、預熱後替換使用中的模型，回傳新版本"""
+        with self._reload_lock:
+            path = self.bundle_path(version) if version else self.latest_bundle()
+            if path is None or not os.path.exists(path):
+                raise FileNotFoundError(f"找不到模型 bundle: {version or self.bundle_dir}")
+            
+            try:
+                new_model = self._build(path)
+                self._warm_up(new_model)
+            except Exception as e:
+                model_reload_failures.inc()
+                self.last_reload_error = str(e)
+                self.last_failed_version = os.path.basename(path)[:-len(".pkl")]
+                raise
+            
+            old_version = self.active_version
+            self._activate(new_model)
+            model_reloads.inc()
+            print(f"🔄 模型已切換: {old_version} -> {new_model.model_version}")
+            return new_model.model_version
+    
+    def reload_in_background(self, version: Optional[str] = None) -> threading.Thread:
+        """在背景執行緒中熱更新模型"""
+        def run():
+            try:
+                self.reload(version)
+            except Exception as e:
+                print(f"❌ 模型熱更新失敗: {e}")
+        
+        thread = threading.Thread(target=run, name="model-reload", daemon=True)
+        thread.start()
+        return thread
+    
+    def _build(self, bundle_path: Optional[str]) -> DepartmentRecommendationAI:
+        """建立模型實例（無 bundle 時沿用舊版三個 pkl 檔或重新訓練）"""
+        model = DepartmentRecommendationAI(bundle_path)
+        if self.dispatcher is not None:
+            model.enable_batching(self.dispatcher)
+        return model
+    
+    def _warm_up(self, model: DepartmentRecommendationAI):
+        """以範例資料預熱新模型"""
+        model.analyze_batch(WARMUP_PROFILES)
+        for profile in WARMUP_PROFILES:
+            model.analyze_student_data(profile)
+    
+    def _activate(self, model: DepartmentRecommendationAI):
+        """替換使用中的模型參照（單一屬性賦值為原子操作）"""
+        self._active = model
+        self.loaded_at = time.time()
+        self.last_reload_error = None
+    
+    def _start_watcher(self):
+        """啟動背景監看執行緒"""
+        if self.watch_interval <= 0 or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+    
+    def _watch(self):
+        """定期檢查 bundle 目錄是否出現新版本"""
+        while True:
+            time.sleep(self.watch_interval)
+            try:
+                versions = self.list_versions()
+                if versions and versions[-1] not in (self.active_version, self.last_failed_version):
+                    self.reload(versions[-1])
+            except Exception as e:
+                print(f"❌ 模型監看失敗: {e}")
+    
+    def status(self) -> Dict[str, Any]:
+        """註冊表狀態"""
+        active = self._active
+        return {
+            "active_version": active.model_version if active is not None else None,
+            "loaded_at": self.loaded_at,
+            "available_versions": self.list_versions(),
+            "metadata": active.metadata if active is not None else {},
+            "last_reload_error": self.last_reload_error
+        }
+
+# 全域註冊表
+model_registry = ModelRegistry()
@@ -0,0 +1,75 @@
+"""
+模型推論服務（sidecar）
+在獨立程序中只載入一次模型，透過本機 Unix socket 提供推論給所有 API worker
+
+協定：每行一個 JSON 物件
+    請求 {"profiles": [學生資料, ...]}
+    回應 {"results": [[推薦, ...], ...]} 或 {"error": "錯誤訊息"}
+
+啟動方式（於 backend 目錄）：
+    MODEL_SERVER_SOCKET=/tmp/resource_school_model.sock python -m src.services.model_server
+"""
+
+import asyncio
+import json
+import os
+from ..config import MODEL_SERVER_SOCKET
+from .ai_standalone import get_ai_recommendation, analyze_student_data_batch
+
+DEFAULT_SOCKET_PATH = "/tmp/resource_school_model.sock"
+STREAM_LIMIT = 16 * 1024 * 1024  # 單行請求上限 16MB
+
+class ModelServer:
+    """模型服務：每個請求交由執行緒池推論，同時抵達的請求由推論派發器合併成批次"""
+    
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+    
+    async def serve(self):
+        """載入模型並開始監聽 Unix socket"""
+        # 啟動時即載入模型（同時啟動模型註冊表的版本監看）
+        get_ai_recommendation()
+        
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        
+        server = await asyncio.start_unix_server(
+            self._handle_connection, path=self.socket_path, limit=STREAM_LIMIT
+        )
+        print(f"🧠 模型服務已啟動: {self.socket_path}")
+        
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """處理單一連線的請求"""
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            
+            try:
+                profiles = json.loads(line.decode("utf-8"))["profiles"]
+                # 每次請求重新取得使用中的模型，熱更新後立即生效
+                results = await asyncio.get_running_loop().run_in_executor(
+                    None, analyze_student_data_batch, profiles
+                )
+                response = {"results": results}
+            except Exception as e:
+                response = {"error": f"推論失敗: {str(e)}"}
+            
+            writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+def main():
+    """啟動模型服務"""
+    asyncio.run(ModelServer(MODEL_SERVER_SOCKET or DEFAULT_SOCKET_PATH).serve())
+
+if __name__ == "__main__":
+    main()
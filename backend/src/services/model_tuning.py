@@ -0,0 +1,256 @@
+"""
+隨機森林超參數搜尋
+在程序池中平行評估候選參數，受總時間預算限制；每組參數同時評估準確率與
+單列推論 p99 延遲，取 Pareto 前緣中最佳的一組重新訓練並寫入模型 bundle metadata
+
+使用方式（於 backend 目錄）：
+    python -m src.services.model_tuning --budget 300 --workers 4 --method halving
+"""
+
+import argparse
+import os
+import random
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, List, Optional
+import numpy as np
+from ..config import TUNING_MAX_P99_MS
+
+SEARCH_SPACE: Dict[str, List[Any]] = {
+    "n_estimators": [25, 50, 100, 200, 300],
+    "max_depth": [4, 6, 8, 10, 14, None],
+    "min_samples_leaf": [1, 2, 4, 8],
+    "max_features": ["sqrt", "log2", 0.5]
+}
+LATENCY_SAMPLES = 200  # 量測 p99 的單列預測次數
+HALVING_FACTOR = 3
+
+# 工作程序內的資料（由 initializer 設定一次，避免每個任務重複傳送）
+_worker_data: Dict[str, np.ndarray] = {}
+
+def _init_worker(X_train: np.ndarray, y_train: np.ndarray, X_val: np.ndarray, y_val: np.ndarray):
+    _worker_data.update(X_train=X_train, y_train=y_train, X_val=X_val, y_val=y_val)
+
+def _evaluate(params: Dict[str, Any], fraction: float) -> Dict[str, Any]:
+    """在工作程序中以部分訓練資料訓練並評估一組參數"""
+    from sklearn.ensemble import RandomForestClassifier
+    
+    X_train, y_train = _worker_data["X_train"], _worker_data["y_train"]
+    X_val, y_val = _worker_data["X_val"], _worker_data["y_val"]
+    n_rows = max(int(len(X_train) * fraction), 1)
+    
+    started = time.perf_counter()
+    model = RandomForestClassifier(**params, random_state=42, class_weight="balanced", n_jobs=1)
+    model.fit(X_train[:n_rows], y_train[:n_rows])
+    fit_seconds = time.perf_counter() - started
+    
+    accuracy = float(np.mean(model.predict(X_val) == y_val))
+    
+    # 單列推論延遲（與線上推論相同的呼叫方式）
+    latencies = []
+    for i in range(LATENCY_SAMPLES):
+        row = X_val[i % len(X_val)].reshape(1, -1)
+        t = time.perf_counter()
+        model.predict_proba(row)
+        latencies.append((time.perf_counter() - t) * 1000)
+    
+    return {
+        "params": params,
+        "fraction": fraction,
+        "accuracy": accuracy,
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "fit_seconds": round(fit_seconds, 3)
+    }
+
+def sample_candidates(n: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """從搜尋空間隨機抽取不重複的參數組合"""
+    rng = random.Random(seed)
+    seen, candidates = set(), []
+    max_combinations = int(np.prod([len(values) for values in SEARCH_SPACE.values()]))
+    
+    while len(candidates) < min(n, max_combinations):
+        params = {name: rng.choice(values) for name, values in SEARCH_SPACE.items()}
+        key = _params_key(params)
+        if key not in seen:
+            seen.add(key)
+            candidates.append(params)
+    
+    return candidates
+
+def _params_key(params: Dict[str, Any]) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in params.items()))
+
+def pareto_front(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """準確率越高、p99 越低越好；回傳不被其他結果支配的集合（依準確率排序）"""
+    front = [
+        r for r in results
+        if not any(
+            o["accuracy"] >= r["accuracy"] and o["p99_ms"] <= r["p99_ms"]
+            and (o["accuracy"] > r["accuracy"] or o["p99_ms"] < r["p99_ms"])
+            for o in results
+        )
+    ]
+    return sorted(front, key=lambda r: (-r["accuracy"], r["p99_ms"]))
+
+def select_best(front: List[Dict[str, Any]], max_p99_ms: float) -> Dict[str, Any]:
+    """Pareto 前緣中符合延遲上限的最高準確率；都不符合時取延遲最低者"""
+    within_budget = [r for r in front if r["p99_ms"] <= max_p99_ms]
+    if within_budget:
+        return within_budget[0]
+    return min(front, key=lambda r: r["p99_ms"])
+
+class HyperparameterSearch:
+    """在時間預算內以程序池平行評估候選參數"""
+    
+    def __init__(self, X: np.ndarray, y: np.ndarray, budget_seconds: float, workers: int, max_p99_ms: float):
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import StandardScaler
+        
+        X_train, X_val, y_train, y_val = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
+        )
+        scaler = StandardScaler().fit(X_train)
+        self.data = (scaler.transform(X_train), y_train, scaler.transform(X_val), y_val)
+        self.deadline = time.monotonic() + budget_seconds
+        self.workers = workers
+        self.max_p99_ms = max_p99_ms
+        self.timed_out = False
+        self.overshoot_seconds = 0.0  # 超過時間預算的秒數（終止工作程序所需的時間）
+    
+    @contextmanager
+    def _pool(self):
+        """評估用的程序池；逾時時不等待執行中的評估，取消排隊中的任務並終止工作程序"""
+        pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=self.data)
+        try:
+            yield pool
+        finally:
+            if self.timed_out:
+                processes = list((pool._processes or {}).values())
+                pool.shutdown(wait=False, cancel_futures=True)
+                for process in processes:
+                    process.terminate()
+                for process in processes:
+                    process.join()
+            else:
+                pool.shutdown(wait=True)
+            self.overshoot_seconds = round(max(time.monotonic() - self.deadline, 0.0), 3)
+    
+    def _run_round(self, pool: ProcessPoolExecutor, candidates: List[Dict[str, Any]], fraction: float) -> List[Dict[str, Any]]:
+        """評估一輪候選參數，超過時間預算即停止（程序池結束時終止執行中的評估）"""
+        pending = {pool.submit(_evaluate, params, fraction) for params in candidates}
+        results = []
+        
+        while pending:
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0:
+                self.timed_out = True
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"⚠️ 參數評估失敗: {e}")
+        
+        return results
+    
+    def random_search(self, n_candidates: int) -> List[Dict[str, Any]]:
+        """隨機搜尋：所有候選皆使用完整訓練資料"""
+        with self._pool() as pool:
+            return self._run_round(pool, sample_candidates(n_candidates), 1.0)
+    
+    def successive_halving(self, n_candidates: int, rounds: int = 3) -> List[Dict[str, Any]]:
+        """連續減半：先以少量資料評估全部候選，每輪保留前 1/HALVING_FACTOR 並增加資料量；
+        逾時時每個存活的候選取最近一次完成的評估（本輪未完成者沿用前一輪結果）"""
+        candidates = sample_candidates(n_candidates)
+        results: List[Dict[str, Any]] = []
+        latest: Dict[tuple, Dict[str, Any]] = {}
+        
+        with self._pool() as pool:
+            for round_index in range(rounds):
+                fraction = 1.0 / HALVING_FACTOR ** (rounds - 1 - round_index)
+                round_results = self._run_round(pool, candidates, fraction)
+                for result in round_results:
+                    latest[_params_key(result["params"])] = result
+                results = [
+                    latest[_params_key(params)] for params in candidates if _params_key(params) in latest
+                ]
+                if self.timed_out and round_index > 0:
+                    print(f"⏱️ 第 {round_index + 1} 輪逾時，完成 {len(round_results)}/{len(candidates)} 組，其餘沿用前一輪結果")
+                if self.timed_out or round_index == rounds - 1 or not results:
+                    break
+                
+                # 優先保留符合延遲上限者，再依準確率排序
+                keep = max(len(results) // HALVING_FACTOR, 1)
+                results.sort(key=lambda r: (r["p99_ms"] > self.max_p99_ms, -r["accuracy"], r["p99_ms"]))
+                candidates = [r["params"] for r in results[:keep]]
+                print(f"🔎 第 {round_index + 1} 輪（資料比例 {fraction:.2f}）保留 {len(candidates)} 組")
+        
+        return results
+
+def run_tuning(
+    budget_seconds: float,
+    workers: int,
+    method: str = "halving",
+    n_candidates: int = 27,
+    max_p99_ms: float = TUNING_MAX_P99_MS,
+    include_mock: bool = True
+) -> Optional[str]:
+    """執行超參數搜尋，以最佳參數重新訓練並輸出 bundle"""
+    from .training_pipeline import load_training_data, run_training
+    
+    training_data = load_training_data(include_mock=include_mock)
+    X, y, _ = training_data
+    search = HyperparameterSearch(X, y, budget_seconds, workers, max_p99_ms)
+    
+    started = time.time()
+    if method == "random":
+        results = search.random_search(n_candidates)
+    else:
+        results = search.successive_halving(n_candidates)
+    
+    if search.timed_out:
+        print(f"⏱️ 搜尋逾時，超出時間預算 {search.overshoot_seconds:.2f} 秒")
+    if not results:
+        print("❌ 時間預算內沒有完成任何評估")
+        return None
+    
+    front = pareto_front(results)
+    best = select_best(front, max_p99_ms)
+    print(f"🏆 最佳參數: {best['params']}（準確率 {best['accuracy']:.3f}，p99 {best['p99_ms']:.2f}ms）")
+    
+    tuning_metadata = {
+        "tuning": {
+            "method": method,
+            "budget_seconds": budget_seconds,
+            "elapsed_seconds": round(time.time() - started, 2),
+            "timed_out": search.timed_out,
+            "overshoot_seconds": search.overshoot_seconds,
+            "evaluated": len(results),
+            "max_p99_ms": max_p99_ms,
+            "selected": best,
+            "pareto_front": front
+        }
+    }
+    return run_training(
+        include_mock=include_mock, params=best["params"], extra_metadata=tuning_metadata, training_data=training_data
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="學系推薦模型超參數搜尋")
+    parser.add_argument("--budget", type=float, default=300, help="總時間預算（秒）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="平行程序數")
+    parser.add_argument("--method", choices=["random", "halving"], default="halving")
+    parser.add_argument("--candidates", type=int, default=27, help="候選參數組數")
+    parser.add_argument("--max-p99-ms", type=float, default=TUNING_MAX_P99_MS, help="單列推論 p99 延遲上限")
+    parser.add_argument("--no-mock", action="store_true", help="不混入模擬資料")
+    args = parser.parse_args()
+    
+    run_tuning(
+        args.budget, args.workers, args.method, args.candidates,
+        args.max_p99_ms, include_mock=not args.no_mock
+    )
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,57 @@ import json
 import time
 from typing import Dict, Any, Optional, Tuple
 from fastapi import UploadFile, HTTPException
-import PyPDF2
-import pdfplumber
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models.pdf_upload import PDFUpload, PDFAnalysis
 from ..models.user import User
-from .ai_standalone import analyze_student_data
+from ..repositories.pagination import Page
+from ..repositories.pdf_upload_repository import PDFUploadRepository
+from .ai_service import AIService
+from .recommendation_service import RecommendationService
+from .executors import run_in_db_pool, run_in_cpu_pool, run_in_pdf_pool
+
+# PDF 解析函式庫與相似度索引（numpy）於第一次處理 PDF 時才匯入，
+# 只提供認證或資源 API 的 worker 不需載入
+
+def extract_pdf_text(file_path: str) -> Dict[str, Any]:
+    """從 PDF 提取文字（模組層級函式，可在程序池中執行）"""
+    import PyPDF2
+    import pdfplumber
+    
+    # 使用 pdfplumber 提取文字（更準確）
+    text_content = ""
+    page_count = 0
+    word_count = 0
+    
+    with pdfplumber.open(file_path) as pdf:
+        page_count = len(pdf.pages)
+        
+        for page_num, page in enumerate(pdf.pages):
+            page_text = page.extract_text()
+            if page_text:
+                text_content += f"\n--- 第 {page_num + 1} 頁 ---\n"
+                text_content += page_text
+                word_count += len(page_text.split())
+    
+    # 如果 pdfplumber 失敗，嘗試 PyPDF2
+    if not text_content.strip():
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            page_count = len(pdf_reader.pages)
+            
+            for page_num, page in enumerate(pdf_reader.pages):
+                page_text = page.extract_text()
+                if page_text:
+                    text_content += f"\n--- 第 {page_num + 1} 頁 ---\n"
+                    text_content += page_text
+                    word_count += len(page_text.split())
+    
+    return {
+        "raw_text": text_content.strip(),
+        "page_count": page_count,
+        "word_count": word_count,
+        "extraction_method": "pdfplumber" if text_content.strip() else "PyPDF2"
+    }
 
 class PDFService:
     """PDF 處理服務"""
@@ -21,6 +66,7 @@ class PDFService:
     UPLOAD_DIR = "uploads/pdf"
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
     ALLOWED_EXTENSIONS = ['.pdf']
+    RAW_TEXT_PREVIEW_CHARS = 500  # 詳細資訊中原始文字預覽的字數
     
     @staticmethod
     def ensure_upload_dir():
@@ -66,41 +112,7 @@ class PDFService:
     def extract_text_from_pdf(file_path: str) -> Dict[str, Any]:
         """從 PDF 提取文字"""
         try:
-            # 使用 pdfplumber 提取文字（更準確）
-            text_content = ""
-            page_count = 0
-            word_count = 0
-            
-            with pdfplumber.open(file_path) as pdf:
-                page_count = len(pdf.pages)
-                
-                for page_num, page in enumerate(pdf.pages):
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_content += f"\n--- 第 {page_num + 1} 頁 ---\n"
-                        text_content += page_text
-                        word_count += len(page_text.split())
-            
-            # 如果 pdfplumber 失敗，嘗試 PyPDF2
-            if not text_content.strip():
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    page_count = len(pdf_reader.pages)
-                    
-                    for page_num, page in enumerate(pdf_reader.pages):
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_content += f"\n--- 第 {page_num + 1} 頁 ---\n"
-                            text_content += page_text
-                            word_count += len(page_text.split())
-            
-            return {
-                "raw_text": text_content.strip(),
-                "page_count": page_count,
-                "word_count": word_count,
-                "extraction_method": "pdfplumber" if text_content.strip() else "PyPDF2"
-            }
-            
+            return extract_pdf_text(file_path)
         except Exception as e:
             raise HTTPException(
                 status_code=500,
@@ -256,17 +268,21 @@ class PDFService:
             )
     
     @staticmethod
-    def create_pdf_upload_record(
-        db: Session,
+    async def create_pdf_upload_record(
+        db: AsyncSession,
         user_id: int,
         filename: str,
         file_path: str,
         file_size: int,
         raw_text: str,
         page_count: int,
-        word_count: int
+        word_count: int,
+        minhash_signature: Optional[bytes] = None,
+        analysis_result: Optional[Dict[str, Any]] = None,
+        processing_time: Optional[float] = None,
+        feature_vector: Optional[bytes] = None
     ) -> PDFUpload:
-        """創建 PDF 上傳記錄"""
+        """在目前交易中創建 PDF 上傳記錄與分析結果（不提交）；沒有分析結果即標記為失敗"""
         pdf_upload = PDFUpload(
             user_id=user_id,
             filename=filename,
@@ -275,22 +291,25 @@ class PDFService:
             raw_text=raw_text,
             page_count=page_count,
             word_count=word_count,
-            status="uploaded"
+            minhash_signature=minhash_signature,
+            processed_data=json.dumps(analysis_result, ensure_ascii=False) if analysis_result is not None else None,
+            feature_vector=feature_vector,
+            processing_time=processing_time,
+            status="completed" if analysis_result is not None else "failed"
         )
         
-        db.add(pdf_upload)
-        db.commit()
-        db.refresh(pdf_upload)
-        
-        return pdf_upload
+        return await PDFUploadRepository.insert(db, pdf_upload)
     
     @staticmethod
-    def process_pdf_upload(
-        db: Session,
+    async def process_pdf_upload(
+        db: AsyncSession,
         file: UploadFile,
         user_id: int
     ) -> Dict[str, Any]:
-        """處理 PDF 上傳的完整流程"""
+        """處理 PDF 上傳的完整流程（阻塞步驟皆在工作池中執行，資料庫寫入只提交一次）"""
+        from .similar_applicants import applicant_index, extract_applicant_vector
+        from .duplicate_detection import compute_minhash, register_upload
+        
         start_time = time.time()
         
         try:
@@ -298,91 +317,124 @@ class PDFService:
             PDFService.validate_pdf_file(file)
             
             # 2. 儲存檔案
-            file_path, filename = PDFService.save_pdf_file(file, user_id)
+            file_path, filename = await run_in_db_pool(PDFService.save_pdf_file, file, user_id)
             file_size = os.path.getsize(file_path)
             
-            # 3. 提取文字
-            text_result = PDFService.extract_text_from_pdf(file_path)
+            # 3. 提取文字（程序池）
+            try:
+                text_result = await run_in_pdf_pool(extract_pdf_text, file_path)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"PDF 文字提取失敗: {str(e)}")
             raw_text = text_result["raw_text"]
             page_count = text_result["page_count"]
             word_count = text_result["word_count"]
             
-            # 4. 創建上傳記錄
-            pdf_upload = PDFService.create_pdf_upload_record(
-                db, user_id, filename, file_path, file_size,
-                raw_text, page_count, word_count
-            )
+            # 4. MinHash 簽章與內容分析（純運算，不佔用資料庫連線）
+            minhash_signature = await run_in_cpu_pool(compute_minhash, raw_text)
+            analysis_error = None
+            try:
+                analysis_result = await run_in_cpu_pool(PDFService.analyze_pdf_content, raw_text)
+                feature_vector = extract_applicant_vector(analysis_result)
+            except Exception as e:
+                analysis_error, analysis_result, feature_vector = e, None, None
+            processing_time = time.time() - start_time
             
-            # 5. 分析內容
-            pdf_upload.status = "processing"
-            db.commit()
+            # 5. 使用 AI 進行推薦分析
+            recommendations = []
+            if analysis_result is not None:
+                try:
+                    recommendations = await run_in_cpu_pool(AIService.analyze_student_data, analysis_result)
+                except Exception as e:
+                    print(f"AI 分析失敗: {e}")
+                    # 即使 AI 分析失敗，PDF 上傳仍然成功
             
-            analysis_result = PDFService.analyze_pdf_content(raw_text)
+            # 6. 上傳記錄、分析結果與推薦在同一個交易中寫入
+            pdf_upload = await PDFService.create_pdf_upload_record(
+                db, user_id, filename, file_path, file_size,
+                raw_text, page_count, word_count, minhash_signature,
+                analysis_result, processing_time, feature_vector
+            )
+            upload_id = pdf_upload.id
+            if recommendations:
+                try:
+                    # 推薦寫入失敗只回復到儲存點，上傳記錄照常提交
+                    async with db.begin_nested():
+                        await RecommendationService.insert_recommendations(
+                            db, user_id, recommendations, pdf_upload_id=upload_id
+                        )
+                except Exception as e:
+                    print(f"推薦結果儲存失敗: {e}")
+            await db.commit()
             
-            # 6. 儲存分析結果
-            pdf_upload.processed_data = json.dumps(analysis_result, ensure_ascii=False)
-            pdf_upload.status = "completed"
-            pdf_upload.processing_time = time.time() - start_time
-            db.commit()
+            # 7. 提交後更新記憶體索引並比對近似重複的既有上傳
+            duplicates = await register_upload(db, upload_id, minhash_signature)
+            if duplicates:
+                print(f"⚠️ PDF 上傳 {upload_id} 與既有上傳內容相近: {duplicates[:5]}")
+            if feature_vector:
+                applicant_index.add(upload_id, feature_vector)
             
-            # 7. 使用 AI 進行推薦分析
-            try:
-                recommendations = analyze_student_data(analysis_result)
-                
-                # 儲存推薦結果
-                from ..models.recommendation import Recommendation
-                for i, rec in enumerate(recommendations):
-                    recommendation = Recommendation(
-                        user_id=user_id,
-                        pdf_upload_id=pdf_upload.id,
-                        department=rec["department"],
-                        university=rec.get("university"),
-                        major=rec.get("major"),
-                        score=rec["score"],
-                        reason=rec.get("reason"),
-                        rank=i + 1
-                    )
-                    db.add(recommendation)
-                
-                db.commit()
-                
-            except Exception as e:
-                print(f"AI 分析失敗: {e}")
-                # 即使 AI 分析失敗，PDF 上傳仍然成功
+            if analysis_error is not None:
+                raise analysis_error
             
             return {
                 "message": "PDF 上傳並分析完成",
-                "upload_id": pdf_upload.id,
+                "upload_id": upload_id,
                 "filename": filename,
                 "page_count": page_count,
                 "word_count": word_count,
-                "processing_time": round(pdf_upload.processing_time, 2),
-                "status": pdf_upload.status,
+                "processing_time": round(processing_time, 2),
+                "status": "completed",
                 "analysis_result": analysis_result
             }
             
         except Exception as e:
-            # 更新狀態為失敗
-            if 'pdf_upload' in locals():
-                pdf_upload.status = "failed"
-                db.commit()
-            
+            await db.rollback()
             raise HTTPException(
                 status_code=500,
                 detail=f"PDF 處理失敗: {str(e)}"
             )
     
     @staticmethod
-    def get_user_pdf_uploads(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-        """獲取用戶的 PDF 上傳記錄"""
-        return db.query(PDFUpload).filter(
-            PDFUpload.user_id == user_id
-        ).offset(skip).limit(limit).all()
+    async def get_user_pdf_uploads(db: AsyncSession, user_id: int, cursor: Optional[str] = None, limit: int = 100) -> Page:
+        """獲取用戶的 PDF 上傳記錄（keyset 分頁）"""
+        return await PDFUploadRepository.list_by_user(db, user_id, cursor, limit)
+    
+    @staticmethod
+    async def count_user_pdf_uploads(db: AsyncSession, user_id: int) -> int:
+        """用戶的 PDF 上傳總數（快取）"""
+        return await PDFUploadRepository.count_by_user(db, user_id)
     
     @staticmethod
-    def get_pdf_upload_by_id(db: Session, upload_id: int, user_id: int) -> Optional[PDFUpload]:
-        """根據 ID 獲取 PDF 上傳記錄"""
-        return db.query(PDFUpload).filter(
-            PDFUpload.id == upload_id,
-            PDFUpload.user_id == user_id
-        ).first()
+    async def delete_pdf_upload(db: AsyncSession, pdf_upload: PDFUpload) -> None:
+        """刪除 PDF 檔案與資料庫記錄"""
+        # 刪除檔案
+        if os.path.exists(pdf_upload.file_path):
+            await run_in_db_pool(os.remove, pdf_upload.file_path)
+        
+        # 刪除資料庫記錄
+        upload_id = pdf_upload.id
+        await PDFUploadRepository.delete(db, pdf_upload)
+        from .similar_applicants import applicant_index
+        from .duplicate_detection import duplicate_index
+        applicant_index.remove(upload_id)
+        duplicate_index.remove(upload_id)
+    
+    @staticmethod
+    async def get_pdf_upload_by_id(db: AsyncSession, upload_id: int, user_id: int, *columns: Any) -> Optional[PDFUpload]:
+        """根據 ID 獲取 PDF 上傳記錄（原始文字等大型欄位只載入 columns 指定的）"""
+        return await PDFUploadRepository.get_for_user(db, upload_id, user_id, *columns)
+    
+    @staticmethod
+    async def get_pdf_upload_detail(
+        db: AsyncSession, upload_id: int, user_id: int
+    ) -> Optional[Tuple[PDFUpload, Optional[str]]]:
+        """獲取 PDF 上傳記錄與原始文字預覽（預覽在資料庫端截取，不讀取整份原始文字）"""
+        row = await PDFUploadRepository.get_detail_for_user(
+            db, upload_id, user_id, PDFService.RAW_TEXT_PREVIEW_CHARS
+        )
+        if row is None:
+            return None
+        upload, preview = row
+        if preview and len(preview) > PDFService.RAW_TEXT_PREVIEW_CHARS:
+            preview = preview[:PDFService.RAW_TEXT_PREVIEW_CHARS] + "..."
+        return upload, preview
@@ -0,0 +1,75 @@
+"""
+預測結果快取
+許多學生資料會落在相同的特徵向量上（相同成績、相同關鍵字命中），重複上傳更是完全相同；
+以量化後的特徵向量與模型版本為鍵的 LRU + TTL 快取可直接跳過預測
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+import numpy as np
+from .metrics import metrics
+
+cache_hits = metrics.counter("prediction_cache_hits_total", "預測快取命中次數")
+cache_misses = metrics.counter("prediction_cache_misses_total", "預測快取未命中次數")
+cache_size = metrics.gauge("prediction_cache_size", "預測快取目前的項目數")
+cache_hit_ratio = metrics.gauge("prediction_cache_hit_ratio", "預測快取累計命中率")
+
+class PredictionCache:
+    """LRU + TTL 預測快取（執行緒安全）"""
+    
+    def __init__(self, max_size: int, ttl_seconds: float, decimals: int = 4):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.decimals = decimals
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def make_key(self, features: np.ndarray, model_version: str) -> bytes:
+        """單列特徵向量量化後與模型版本一起雜湊"""
+        quantized = np.round(np.asarray(features, dtype=np.float64), self.decimals) + 0.0  # +0.0 消除 -0.0
+        digest = hashlib.blake2b(quantized.tobytes(), digest_size=16)
+        digest.update(model_version.encode("utf-8"))
+        return digest.digest()
+    
+    def get(self, key: bytes) -> Optional[Any]:
+        """取得快取值，過期或不存在時回傳 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            
+            if entry is None:
+                cache_misses.inc()
+            else:
+                self._entries.move_to_end(key)
+                cache_hits.inc()
+            self._update_gauges()
+        
+        return None if entry is None else entry[1]
+    
+    def put(self, key: bytes, value: Any):
+        """寫入快取，超過上限時淘汰最久未使用的項目"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._update_gauges()
+    
+    def clear(self):
+        """清空快取（載入新模型時呼叫）"""
+        with self._lock:
+            self._entries.clear()
+            self._update_gauges()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _update_gauges(self):
+        cache_size.set(len(self._entries))
+        total = cache_hits.value + cache_misses.value
+        cache_hit_ratio.set(cache_hits.value / total if total else 0.0)
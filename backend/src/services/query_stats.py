@@ -0,0 +1,141 @@
+"""
+每個請求的 SQL 統計
+以 SQLAlchemy 引擎事件記錄請求內的查詢數、資料庫耗時與最慢的語句（含非同步引擎與唯讀副本），
+同一種語句（參數化後的 SQL，IN 清單長度不計）在一個請求內執行超過 SQL_N_PLUS_ONE_THRESHOLD 次即警告（疑似 N+1 查詢）。
+請求的統計以 contextvars 傳遞，工作池中的同步查詢（run_in_db_pool）也會計入。
+"""
+
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from ..config import SQL_N_PLUS_ONE_THRESHOLD
+from .metrics import metrics
+
+queries_per_request = metrics.histogram(
+    "db_queries_per_request", "每個請求執行的 SQL 數", buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+)
+db_seconds_per_request = metrics.histogram("db_seconds_per_request", "每個請求花在資料庫的時間（秒）")
+n_plus_one_warnings = metrics.counter("db_n_plus_one_warnings_total", "同一語句在單一請求內重複過多次的警告數")
+
+# IN 清單的參數（?, ?, ...）與多列 VALUES 視為同一種語句
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# 最慢語句保留的字元數
+STATEMENT_PREVIEW_CHARS = 300
+
+def statement_shape(statement: str) -> str:
+    """參數化 SQL 正規化為語句形狀"""
+    return _PARAM_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+class RequestQueryStats:
+    """單一請求的 SQL 統計"""
+    
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.shapes: Dict[str, int] = {}
+        self.repeated: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, statement: str, seconds: float) -> Optional[str]:
+        """記錄一次查詢；同一形狀剛超過門檻時回傳該形狀"""
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            if seconds >= self.slowest_seconds:
+                self.slowest_seconds = seconds
+                self.slowest_statement = shape[:STATEMENT_PREVIEW_CHARS]
+            times = self.shapes.get(shape, 0) + 1
+            self.shapes[shape] = times
+            if times > SQL_N_PLUS_ONE_THRESHOLD:
+                self.repeated[shape] = times
+                return shape if times == SQL_N_PLUS_ONE_THRESHOLD + 1 else None
+        return None
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+def start_request() -> RequestQueryStats:
+    """開始記錄目前請求的查詢"""
+    stats = RequestQueryStats()
+    _current.set(stats)
+    return stats
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("query_start")
+    if stats is None or not starts:
+        return
+    shape = stats.record(statement, time.perf_counter() - starts.pop())
+    if shape is not None:
+        n_plus_one_warnings.inc()
+        print(f"⚠️ 同一語句在單一請求內執行超過 {SQL_N_PLUS_ONE_THRESHOLD} 次（疑似 N+1 查詢）: {shape[:STATEMENT_PREVIEW_CHARS]}")
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # 執行失敗時不會觸發 after_cursor_execute，清除開始時間
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection is not None else None
+    if starts:
+        starts.pop()
+
+class RouteQueryStats:
+    """各路由的 SQL 統計累計（管理端點使用）"""
+    
+    def __init__(self):
+        self._routes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, route: str, stats: RequestQueryStats):
+        """記錄一個請求的統計，並更新 /metrics 的直方圖"""
+        queries_per_request.observe(stats.count)
+        db_seconds_per_request.observe(stats.seconds)
+        with self._lock:
+            entry = self._routes.setdefault(route, {
+                "requests": 0, "queries": 0, "db_seconds": 0.0, "max_queries": 0,
+                "n_plus_one_requests": 0, "slowest_ms": 0.0, "slowest_statement": None
+            })
+            entry["requests"] += 1
+            entry["queries"] += stats.count
+            entry["db_seconds"] += stats.seconds
+            entry["max_queries"] = max(entry["max_queries"], stats.count)
+            if stats.repeated:
+                entry["n_plus_one_requests"] += 1
+            if stats.slowest_seconds * 1000 > entry["slowest_ms"]:
+                entry["slowest_ms"] = stats.slowest_seconds * 1000
+                entry["slowest_statement"] = stats.slowest_statement
+    
+    def status(self) -> Dict[str, Any]:
+        """各路由平均查詢數、資料庫耗時與最慢的語句"""
+        with self._lock:
+            routes = {route: dict(entry) for route, entry in self._routes.items()}
+        return {
+            "n_plus_one_threshold": SQL_N_PLUS_ONE_THRESHOLD,
+            "routes": {
+                route: {
+                    "requests": entry["requests"],
+                    "avg_queries": round(entry["queries"] / entry["requests"], 2),
+                    "max_queries": entry["max_queries"],
+                    "avg_db_ms": round(entry["db_seconds"] * 1000 / entry["requests"], 3),
+                    "n_plus_one_requests": entry["n_plus_one_requests"],
+                    "slowest_ms": round(entry["slowest_ms"], 3),
+                    "slowest_statement": entry["slowest_statement"]
+                }
+                for route, entry in sorted(routes.items())
+            }
+        }
+
+# 全域實例
+route_query_stats = RouteQueryStats()
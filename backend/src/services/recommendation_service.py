@@ -1,58 +1,84 @@
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from ..models.recommendation import Recommendation
 from ..models.user import User
-from ..models.schemas import RecommendationResponse, RecommendationListResponse
+from ..models.feedback import RecommendationFeedback
+from ..models.schemas import RecommendationResponse, RecommendationListResponse, RecommendationFeedbackRequest
+from ..repositories.recommendation_repository import RecommendationRepository
+from ..repositories.upload_repository import UploadRepository
+from fastapi import HTTPException
 from .ai_service import AIService
+from .executors import run_in_cpu_pool
 
 class RecommendationService:
     @staticmethod
-    def generate_recommendations(
-        db: Session, 
-        user_id: int, 
-        upload_id: int, 
+    async def generate_recommendations(
+        db: AsyncSession,
+        user_id: int,
+        upload_id: int,
         json_data: dict
-    ) -> List[Recommendation]:
+    ) -> List[int]:
         """生成學系推薦"""
-        # 使用 AI 服務分析資料
-        ai_recommendations = AIService.analyze_student_data(json_data)
-        
-        # 儲存推薦結果到資料庫
-        recommendations = []
-        for i, rec_data in enumerate(ai_recommendations):
-            recommendation = Recommendation(
-                user_id=user_id,
-                upload_id=upload_id,
-                department=rec_data["department"],
-                university=rec_data.get("university"),
-                major=rec_data.get("major"),
-                score=rec_data["score"],
-                reason=rec_data.get("reason"),
-                rank=i + 1
-            )
-            db.add(recommendation)
-            recommendations.append(recommendation)
+        # 使用 AI 服務分析資料（推論在 CPU 工作池執行）
+        ai_recommendations = await run_in_cpu_pool(AIService.analyze_student_data, json_data)
         
-        db.commit()
-        
-        # 刷新所有推薦記錄以獲取 ID
-        for rec in recommendations:
-            db.refresh(rec)
+        return await RecommendationService.save_recommendations(
+            db, user_id, ai_recommendations, upload_id=upload_id
+        )
+    
+    @staticmethod
+    async def insert_recommendations(
+        db: AsyncSession,
+        user_id: int,
+        ai_recommendations: List[dict],
+        upload_id: Optional[int] = None,
+        pdf_upload_id: Optional[int] = None
+    ) -> List[int]:
+        """在目前交易中以單一 INSERT 寫入一組推薦（不提交），回傳依排名順序的 ID"""
+        rows = [
+            {
+                "user_id": user_id,
+                "upload_id": upload_id,
+                "pdf_upload_id": pdf_upload_id,
+                "department": rec_data["department"],
+                "university": rec_data.get("university"),
+                "major": rec_data.get("major"),
+                "score": rec_data["score"],
+                "reason": rec_data.get("reason"),
+                "rank": i + 1,
+                "model_version": rec_data.get("model_version")
+            }
+            for i, rec_data in enumerate(ai_recommendations)
+        ]
         
-        return recommendations
+        return await RecommendationRepository.bulk_insert(db, rows)
     
     @staticmethod
-    def get_user_recommendations(
-        db: Session, 
-        user_id: int, 
-        skip: int = 0, 
-        limit: int = 100
+    async def save_recommendations(
+        db: AsyncSession,
+        user_id: int,
+        ai_recommendations: List[dict],
+        upload_id: Optional[int] = None,
+        pdf_upload_id: Optional[int] = None
+    ) -> List[int]:
+        """儲存 AI 推薦結果到資料庫並提交，回傳推薦 ID"""
+        ids = await RecommendationService.insert_recommendations(
+            db, user_id, ai_recommendations, upload_id=upload_id, pdf_upload_id=pdf_upload_id
+        )
+        await db.commit()
+        return ids
+    
+    @staticmethod
+    async def get_user_recommendations(
+        db: AsyncSession,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        include_total: bool = False
     ) -> RecommendationListResponse:
-        """獲取用戶推薦結果"""
+        """獲取用戶推薦結果（keyset 分頁）"""
         # 獲取推薦記錄
-        recommendations = db.query(Recommendation).filter(
-            Recommendation.user_id == user_id
-        ).order_by(Recommendation.score.desc()).offset(skip).limit(limit).all()
+        page = await RecommendationRepository.list_by_user(db, user_id, cursor, limit)
         
         # 轉換為響應格式
         rec_responses = [
@@ -64,39 +90,59 @@ class RecommendationService:
                 score=rec.score,
                 reason=rec.reason,
                 rank=rec.rank,
+                model_version=rec.model_version,
                 created_at=rec.created_at
-            ) for rec in recommendations
+            ) for rec in page.items
         ]
         
-        # 獲取總數
-        total = db.query(Recommendation).filter(
-            Recommendation.user_id == user_id
-        ).count()
+        # 總數為選用（快取的 COUNT 查詢）
+        total = await RecommendationRepository.count_by_user(db, user_id) if include_total else None
         
         return RecommendationListResponse(
             recommendations=rec_responses,
+            next_cursor=page.next_cursor,
             total=total,
             user_id=user_id
         )
     
     @staticmethod
-    def get_latest_recommendations(
-        db: Session, 
+    async def get_latest_recommendations(
+        db: AsyncSession,
         user_id: int
     ) -> List[Recommendation]:
         """獲取用戶最新的推薦結果"""
         # 獲取最新的上傳記錄
-        latest_upload = db.query(Upload).filter(
-            Upload.user_id == user_id
-        ).order_by(Upload.created_at.desc()).first()
+        latest_upload = await UploadRepository.get_latest_by_user(db, user_id)
         
         if not latest_upload:
             return []
         
         # 獲取該上傳的推薦結果
-        recommendations = db.query(Recommendation).filter(
-            Recommendation.user_id == user_id,
-            Recommendation.upload_id == latest_upload.id
-        ).order_by(Recommendation.score.desc()).all()
+        return await RecommendationRepository.list_by_upload(db, user_id, latest_upload.id)
+    
+    @staticmethod
+    async def submit_feedback(
+        db: AsyncSession,
+        user_id: int,
+        recommendation_id: int,
+        feedback: RecommendationFeedbackRequest
+    ) -> RecommendationFeedback:
+        """記錄學生對推薦的回饋，作為模型訓練標籤"""
+        recommendation = await RecommendationRepository.get_for_user(db, recommendation_id, user_id)
+        if not recommendation:
+            raise HTTPException(status_code=404, detail="Recommendation not found")
         
-        return recommendations
+        # 標籤：學生明確選擇的學系，否則接受推薦即以推薦學系為標籤
+        department = feedback.chosen_department or (
+            recommendation.department if feedback.accepted else None
+        )
+        
+        db_feedback = RecommendationFeedback(
+            user_id=user_id,
+            recommendation_id=recommendation.id,
+            upload_id=recommendation.upload_id,
+            pdf_upload_id=recommendation.pdf_upload_id,
+            accepted="Y" if feedback.accepted else "N",
+            department=department
+        )
+        return await RecommendationRepository.add_feedback(db, db_feedback)
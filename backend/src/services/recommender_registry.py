@@ -0,0 +1,242 @@
+"""
+推薦引擎註冊表
+統一三種推薦實作的介面（單筆與批次），依 RECOMMENDER_ENGINE 只匯入並建立所設定的引擎：
+- forest：隨機森林模型（ai_standalone，支援模型服務、微批次、快取與熱更新）
+- keyword：關鍵字／TF-IDF 矩陣評分（ai_advanced）
+- legacy：舊版隨機森林實作（services/ai.py）
+- hybrid：依 RECOMMENDER_HYBRID_WEIGHTS 加權混合多個引擎
+每個引擎的呼叫延遲都會記錄於 /metrics 與管理端點。
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from ..config import MODEL_SERVER_SOCKET, RECOMMENDER_ENGINE, RECOMMENDER_HYBRID_WEIGHTS
+from .metrics import metrics
+
+# 每個引擎保留最近的延遲樣本數，用於計算百分位數
+LATENCY_WINDOW = 1024
+
+class RecommenderEngine:
+    """推薦引擎共同介面：子類別至少實作 recommend 或 recommend_batch 其中之一"""
+    
+    name = ""
+    
+    def recommend(self, profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """單一學生的推薦結果"""
+        return self.recommend_batch([profile])[0]
+    
+    def recommend_batch(self, profiles: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """一批學生的推薦結果（順序與輸入相同）"""
+        return [self.recommend(profile) for profile in profiles]
+
+class ForestEngine(RecommenderEngine):
+    """隨機森林引擎：設定 MODEL_SERVER_SOCKET 時呼叫共用模型服務，否則於程序內推論"""
+    
+    name = "forest"
+    
+    def __init__(self):
+        from .model_client import ModelServerClient
+        self.model_server = ModelServerClient(MODEL_SERVER_SOCKET) if MODEL_SERVER_SOCKET else None
+    
+    def recommend_batch(self, profiles: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        from .model_client import ModelServerError
+        if self.model_server is not None:
+            try:
+                return self.model_server.analyze_batch(profiles)
+            except ModelServerError as e:
+                print(f"模型服務無法使用，改用程序內推論: {e}")
+        
+        from .ai_standalone import analyze_student_data_batch
+        return analyze_student_data_batch(profiles)
+    
+    def recommend(self, profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+        from .model_client import ModelServerError
+        if self.model_server is not None:
+            try:
+                return self.model_server.analyze_student_data(profile)
+            except ModelServerError as e:
+                print(f"模型服務無法使用，改用程序內推論: {e}")
+        
+        from .ai_standalone import analyze_student_data
+        return analyze_student_data(profile)
+
+class KeywordEngine(RecommenderEngine):
+    """關鍵字矩陣評分引擎"""
+    
+    name = "keyword"
+    
+    def __init__(self):
+        from .ai_advanced import get_ai_recommendation
+        self.model = get_ai_recommendation()
+    
+    def recommend(self, profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+        version = f"keyword-{self.model.catalog.version}"
+        return [
+            {**recommendation, "rank": rank, "model_version": version}
+            for rank, recommendation in enumerate(self.model.generate_recommendations(profile), 1)
+        ]
+
+class LegacyForestEngine(RecommenderEngine):
+    """舊版隨機森林引擎"""
+    
+    name = "legacy"
+    
+    def __init__(self):
+        from .ai import get_ai_recommendation
+        self.model = get_ai_recommendation()
+    
+    def recommend(self, profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return self.model.analyze_student_data(profile)
+
+def parse_hybrid_weights(spec: str) -> Dict[str, float]:
+    """解析 "forest:0.7,keyword:0.3" 格式的混合權重"""
+    weights = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition(":")
+        weights[name.strip()] = float(weight) if weight else 1.0
+    if not weights:
+        raise ValueError("RECOMMENDER_HYBRID_WEIGHTS 未設定任何引擎")
+    return weights
+
+class HybridEngine(RecommenderEngine):
+    """混合引擎：各引擎分數加權相加後重新排序"""
+    
+    name = "hybrid"
+    
+    def __init__(self, registry: "RecommenderRegistry", weights: Dict[str, float]):
+        unknown = [name for name in weights if name not in ENGINE_FACTORIES or name == self.name]
+        if unknown:
+            raise ValueError(f"混合模式不支援的引擎: {unknown}")
+        self.registry = registry
+        self.weights = weights
+    
+    def recommend_batch(self, profiles: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        engine_results = {
+            name: self.registry.run(name, profiles) for name in self.weights
+        }
+        return [
+            self._blend({name: results[i] for name, results in engine_results.items()})
+            for i in range(len(profiles))
+        ]
+    
+    def _blend(self, results: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """合併同一位學生在各引擎的推薦"""
+        blended: Dict[str, Dict[str, Any]] = {}
+        best_contribution: Dict[str, float] = {}
+        versions = []
+        for name, recommendations in results.items():
+            weight = self.weights[name]
+            if recommendations:
+                versions.append(f"{name}@{recommendations[0].get('model_version') or 'unknown'}")
+            for recommendation in recommendations:
+                department = recommendation["department"]
+                contribution = weight * recommendation["score"]
+                entry = blended.setdefault(department, {"score": 0.0, "engine_scores": {}})
+                entry["score"] += contribution
+                entry["engine_scores"][name] = recommendation["score"]
+                # 大學、專業與推薦理由取自貢獻最大的引擎
+                if contribution > best_contribution.get(department, -1.0):
+                    best_contribution[department] = contribution
+                    entry["base"] = recommendation
+        
+        top_k = max((len(r) for r in results.values()), default=0)
+        ranked = sorted(blended.items(), key=lambda item: -item[1]["score"])[:top_k]
+        model_version = ("hybrid:" + "+".join(versions))[:64]
+        return [
+            {
+                **entry["base"],
+                "score": round(entry["score"], 3),
+                "rank": rank,
+                "model_version": model_version,
+                "engine_scores": entry["engine_scores"]
+            }
+            for rank, (_, entry) in enumerate(ranked, 1)
+        ]
+
+# 引擎名稱 -> 建構函式（建構時才匯入對應的模型模組）
+ENGINE_FACTORIES: Dict[str, Callable[["RecommenderRegistry"], RecommenderEngine]] = {
+    "forest": lambda registry: ForestEngine(),
+    "keyword": lambda registry: KeywordEngine(),
+    "legacy": lambda registry: LegacyForestEngine(),
+    "hybrid": lambda registry: HybridEngine(registry, parse_hybrid_weights(RECOMMENDER_HYBRID_WEIGHTS)),
+}
+
+class RecommenderRegistry:
+    """推薦引擎註冊表：延遲建立引擎並記錄每個引擎的延遲"""
+    
+    def __init__(self, default_engine: str = RECOMMENDER_ENGINE):
+        if default_engine not in ENGINE_FACTORIES:
+            raise ValueError(f"未知的推薦引擎: {default_engine}")
+        self.default_engine = default_engine
+        self._engines: Dict[str, RecommenderEngine] = {}
+        self._latencies: Dict[str, Deque[Tuple[float, int]]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, name: Optional[str] = None) -> RecommenderEngine:
+        """取得引擎（第一次使用時建立）"""
+        name = name or self.default_engine
+        engine = self._engines.get(name)
+        if engine is None:
+            if name not in ENGINE_FACTORIES:
+                raise ValueError(f"未知的推薦引擎: {name}")
+            with self._lock:
+                engine = self._engines.get(name)
+                if engine is None:
+                    engine = ENGINE_FACTORIES[name](self)
+                    self._engines[name] = engine
+                    print(f"🧩 已建立推薦引擎: {name}")
+        return engine
+    
+    def run(self, name: Optional[str], profiles: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """以指定引擎批次推薦並記錄延遲"""
+        name = name or self.default_engine
+        engine = self.get(name)
+        start = time.perf_counter()
+        results = engine.recommend_batch(profiles) if len(profiles) > 1 else [engine.recommend(profiles[0])]
+        self._record(name, time.perf_counter() - start, len(profiles))
+        return results
+    
+    def recommend(self, profile: Dict[str, Any], name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """單一學生推薦"""
+        return self.run(name, [profile])[0]
+    
+    def recommend_batch(self, profiles: List[Dict[str, Any]], name: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        """批次推薦"""
+        return self.run(name, profiles) if profiles else []
+    
+    def _record(self, name: str, seconds: float, batch_size: int):
+        metrics.histogram(f"recommender_{name}_seconds", f"{name} 推薦引擎每次呼叫耗時（秒）").observe(seconds)
+        with self._lock:
+            self._latencies.setdefault(name, deque(maxlen=LATENCY_WINDOW)).append((seconds, batch_size))
+    
+    def status(self) -> Dict[str, Any]:
+        """各引擎是否已建立與最近呼叫的延遲百分位數（毫秒）"""
+        with self._lock:
+            samples = {name: list(window) for name, window in self._latencies.items()}
+        engines = {}
+        for name in ENGINE_FACTORIES:
+            latencies = sorted(seconds * 1000 for seconds, _ in samples.get(name, []))
+            engines[name] = {
+                "loaded": name in self._engines,
+                "calls": len(latencies),
+                "profiles": sum(size for _, size in samples.get(name, [])),
+                "p50_ms": _percentile(latencies, 0.50),
+                "p95_ms": _percentile(latencies, 0.95),
+                "p99_ms": _percentile(latencies, 0.99),
+            }
+        return {"default_engine": self.default_engine, "engines": engines}
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """已排序數列的百分位數（最近秩法）"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))
+    return round(sorted_values[index], 3)
+
+# 全域實例
+recommender_registry = RecommenderRegistry()
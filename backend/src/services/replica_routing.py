@@ -0,0 +1,182 @@
+"""
+讀寫分離路由
+唯讀端點以 get_async_read_db 取得 Session：副本複寫延遲不超過 REPLICA_MAX_LAG_SECONDS、
+且此客戶端 REPLICA_STICKY_SECONDS 內沒有寫入時讀取副本，否則讀取主庫。
+延遲以心跳表量測：主庫定期更新 replication_heartbeat 的時間戳記，再從副本讀回比較。
+客戶端最近的寫入以 Authorization 標頭（本 worker 記錄）、X-DB-Last-Write 標頭（前端保存後於每個請求帶回，跨 worker 與跨網域）
+與同網域的 Cookie 識別；標頭只影響讀取主庫或副本，客戶端自行修改也不會讀到其他人的資料。
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional
+from fastapi import Request, Response
+from sqlalchemy import select, update
+from ..config import REPLICA_LAG_CHECK_INTERVAL, REPLICA_MAX_LAG_SECONDS, REPLICA_STICKY_SECONDS
+from ..models.database import AsyncReplicaSessionLocal, AsyncSessionLocal, get_async_replica_engine
+from ..models.replication import ReplicationHeartbeat
+from .metrics import metrics
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+replica_reads = metrics.counter("db_replica_reads_total", "讀取副本的請求數")
+primary_reads = metrics.counter("db_primary_reads_total", "唯讀端點改讀主庫的請求數")
+replica_lag = metrics.gauge("db_replica_lag_seconds", "最近一次量測的副本複寫延遲（秒）")
+
+# 客戶端最近一次寫入時間（Unix 秒）：寫入回應帶出，客戶端於之後的請求帶回
+STICKY_HEADER = "X-DB-Last-Write"
+STICKY_COOKIE = "db_last_write"
+
+# 延遲量測超過此間隔數沒有更新即視為副本狀態未知
+STALE_CHECKS = 3
+
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+class ReplicaRouter:
+    """依副本延遲與客戶端最近的寫入決定讀取副本或主庫"""
+    
+    def __init__(self, max_lag: float = REPLICA_MAX_LAG_SECONDS, sticky_seconds: float = REPLICA_STICKY_SECONDS,
+                 check_interval: float = REPLICA_LAG_CHECK_INTERVAL):
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self.check_interval = check_interval
+        self.lag_seconds: Optional[float] = None
+        self.checked_at = 0.0  # time.monotonic()
+        self.error: Optional[str] = None
+        self._recent_writes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return get_async_replica_engine() is not None
+    
+    @staticmethod
+    def _client_key(request: Request) -> Optional[str]:
+        authorization = request.headers.get("authorization")
+        if not authorization:
+            return None
+        return hashlib.blake2b(authorization.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def mark_write(self, request: Request, response: Response):
+        """記錄客戶端的寫入，之後 REPLICA_STICKY_SECONDS 內的讀取都走主庫"""
+        now = time.time()
+        key = self._client_key(request)
+        if key is not None:
+            with self._lock:
+                self._recent_writes[key] = now
+                # 順便清除過期的紀錄
+                expired = [k for k, t in self._recent_writes.items() if now - t > self.sticky_seconds]
+                for k in expired:
+                    del self._recent_writes[k]
+        response.headers[STICKY_HEADER] = f"{now:.3f}"
+        response.set_cookie(
+            STICKY_COOKIE, f"{now:.3f}", max_age=max(1, int(self.sticky_seconds) + 1),
+            httponly=True, samesite="lax"
+        )
+    
+    def wrote_recently(self, request: Request) -> bool:
+        """客戶端是否在 REPLICA_STICKY_SECONDS 內寫入過"""
+        now = time.time()
+        key = self._client_key(request)
+        if key is not None:
+            with self._lock:
+                written_at = self._recent_writes.get(key)
+            if written_at is not None and now - written_at <= self.sticky_seconds:
+                return True
+        for written_at in (request.headers.get(STICKY_HEADER), request.cookies.get(STICKY_COOKIE)):
+            try:
+                if written_at and now - float(written_at) <= self.sticky_seconds:
+                    return True
+            except ValueError:
+                continue
+        return False
+    
+    def replica_healthy(self) -> bool:
+        """最近量測的延遲在門檻內，且量測沒有中斷"""
+        return (
+            self.lag_seconds is not None
+            and self.lag_seconds <= self.max_lag
+            and time.monotonic() - self.checked_at <= self.check_interval * STALE_CHECKS
+        )
+    
+    def use_replica(self, request: Request) -> bool:
+        """此請求是否讀取副本"""
+        return self.enabled and self.replica_healthy() and not self.wrote_recently(request)
+    
+    async def check_lag(self):
+        """從副本讀回心跳，再於主庫寫入新的心跳"""
+        try:
+            async with AsyncReplicaSessionLocal() as replica:
+                replica_ms = (await replica.execute(
+                    select(ReplicationHeartbeat.beat_ms).where(ReplicationHeartbeat.id == 1)
+                )).scalar()
+            
+            # 與目前時間比較：心跳每 REPLICA_LAG_CHECK_INTERVAL 秒才寫入一次，量得的延遲只會高估、不會低估
+            now_ms = int(time.time() * 1000)
+            self.lag_seconds = None if replica_ms is None else max(0.0, (now_ms - replica_ms) / 1000)
+            
+            async with AsyncSessionLocal() as primary:
+                await primary.execute(
+                    update(ReplicationHeartbeat).where(ReplicationHeartbeat.id == 1).values(beat_ms=now_ms)
+                )
+                await primary.commit()
+            self.error = None if replica_ms is not None else "副本沒有心跳資料"
+        except Exception as e:
+            self.lag_seconds = None
+            self.error = str(e)
+        self.checked_at = time.monotonic()
+        if self.lag_seconds is not None:
+            replica_lag.set(self.lag_seconds)
+    
+    async def _run(self):
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(self.check_interval)
+    
+    def start(self):
+        """啟動延遲量測（未設定副本時不執行）"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            print(f"🪞 已啟用唯讀副本，延遲門檻 {self.max_lag:g} 秒")
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def status(self) -> Dict[str, Any]:
+        """副本是否啟用、最近的延遲與讀取分流次數"""
+        return {
+            "enabled": self.enabled,
+            "healthy": self.enabled and self.replica_healthy(),
+            "lag_seconds": None if self.lag_seconds is None else round(self.lag_seconds, 3),
+            "max_lag_seconds": self.max_lag,
+            "sticky_seconds": self.sticky_seconds,
+            "checked_seconds_ago": round(time.monotonic() - self.checked_at, 3) if self.checked_at else None,
+            "error": self.error,
+            "replica_reads": int(replica_reads.value),
+            "primary_reads": int(primary_reads.value)
+        }
+
+# 全域實例
+replica_router = ReplicaRouter()
+
+async def get_async_read_db(request: Request) -> AsyncIterator["AsyncSession"]:
+    """唯讀端點的非同步資料庫依賴注入（副本可用時讀副本，否則讀主庫）"""
+    if replica_router.use_replica(request):
+        replica_reads.inc()
+        async with AsyncReplicaSessionLocal() as db:
+            yield db
+    else:
+        if replica_router.enabled:
+            primary_reads.inc()
+        async with AsyncSessionLocal() as db:
+            yield db
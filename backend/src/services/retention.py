@@ -0,0 +1,324 @@
+"""
+上傳記錄保留與歸檔
+建立超過 RETENTION_DAYS 天的上傳（uploads、pdf_uploads）連同其推薦、分析結果與回饋，
+寫入磁碟上的 gzip JSON Lines 檔（RETENTION_ARCHIVE_DIR/<資料表>/<年-月>/），再從資料庫刪除，原始檔案一併移到歸檔目錄。
+每批最多 RETENTION_BATCH_SIZE 筆、以主鍵刪除並各自提交，批次之間暫停 RETENTION_BATCH_PAUSE 秒，避免長時間鎖定資料表。
+有學生回饋（訓練標籤）的上傳預設保留（RETENTION_KEEP_LABELED）。
+
+使用方式（於 backend 目錄）：
+    python -m src.services.retention --dry-run   # 只計算待歸檔筆數
+    python -m src.services.retention --days 365  # 立即歸檔
+"""
+
+import argparse
+import asyncio
+import base64
+import gzip
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Table, delete, exists, func, select
+from sqlalchemy.orm import Session
+from ..config import (
+    RETENTION_ARCHIVE_DIR, RETENTION_BATCH_PAUSE, RETENTION_BATCH_SIZE, RETENTION_DAYS,
+    RETENTION_INTERVAL, RETENTION_KEEP_LABELED
+)
+from ..models.database import SessionLocal
+from ..models.feedback import RecommendationFeedback
+from ..models.pdf_upload import PDFAnalysis, PDFUpload
+from ..models.recommendation import Recommendation
+from ..models.upload import Upload
+from .metrics import metrics
+
+archived_rows = metrics.counter("retention_archived_uploads_total", "已歸檔並自資料庫刪除的上傳記錄數")
+
+uploads = Upload.__table__
+pdf_uploads = PDFUpload.__table__
+recommendations = Recommendation.__table__
+feedback = RecommendationFeedback.__table__
+pdf_analyses = PDFAnalysis.__table__
+
+# 上傳資料表 -> 推薦與回饋中參照它的欄位名稱
+UPLOAD_TABLES = {
+    "uploads": (uploads, "upload_id"),
+    "pdf_uploads": (pdf_uploads, "pdf_upload_id"),
+}
+
+# 同一主機只讓一個 worker 執行歸檔
+LOCK_FILE = ".retention.lock"
+
+def _serialize(row: Dict[str, Any]) -> Dict[str, Any]:
+    """資料列轉為可寫入 JSON 的格式（日期時間為 ISO 字串、二進位為 base64）"""
+    return {
+        key: value.isoformat() if isinstance(value, datetime)
+        else base64.b64encode(value).decode("ascii") if isinstance(value, bytes)
+        else value
+        for key, value in row.items()
+    }
+
+def _fetch(db: Session, table: Table, condition) -> List[Dict[str, Any]]:
+    return [dict(row) for row in db.execute(select(table).where(condition).order_by(table.c.id)).mappings()]
+
+class RetentionJob:
+    """分批歸檔過期的上傳記錄"""
+    
+    def __init__(self, days: int = RETENTION_DAYS, batch_size: int = RETENTION_BATCH_SIZE,
+                 archive_dir: str = RETENTION_ARCHIVE_DIR, keep_labeled: bool = RETENTION_KEEP_LABELED,
+                 batch_pause: float = RETENTION_BATCH_PAUSE, interval: float = RETENTION_INTERVAL):
+        self.days = days
+        self.batch_size = batch_size
+        self.archive_dir = archive_dir
+        self.keep_labeled = keep_labeled
+        self.batch_pause = batch_pause
+        self.interval = interval
+        self.last_run: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.days > 0
+    
+    def cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(days=self.days)
+    
+    def _candidates(self, table_name: str, cutoff: datetime):
+        """建立時間早於 cutoff 的上傳（以 (created_at, id) 索引做範圍查詢，不需掃描整張表）"""
+        table, column = UPLOAD_TABLES[table_name]
+        condition = table.c.created_at < cutoff
+        if self.keep_labeled:
+            condition = condition & ~exists().where(feedback.c[column] == table.c.id)
+        return table, column, condition
+    
+    def count_candidates(self, db: Session) -> Dict[str, int]:
+        """各上傳資料表待歸檔的筆數"""
+        cutoff = self.cutoff()
+        counts = {}
+        for table_name in UPLOAD_TABLES:
+            table, _, condition = self._candidates(table_name, cutoff)
+            counts[table_name] = db.execute(select(func.count()).select_from(table).where(condition)).scalar_one()
+        return counts
+    
+    def archive_batch(self, db: Session, table_name: str, cutoff: datetime) -> int:
+        """歸檔一批上傳記錄，回傳筆數"""
+        table, column, condition = self._candidates(table_name, cutoff)
+        ids = list(db.execute(
+            select(table.c.id).where(condition).order_by(table.c.created_at, table.c.id).limit(self.batch_size)
+        ).scalars())
+        if not ids:
+            db.rollback()
+            return 0
+        
+        # 讀取上傳與相關資料列（一致性讀取，不鎖定資料列）
+        rows = {table_name: _fetch(db, table, table.c.id.in_(ids))}
+        rows["recommendations"] = _fetch(db, recommendations, recommendations.c[column].in_(ids))
+        recommendation_ids = [row["id"] for row in rows["recommendations"]]
+        feedback_condition = feedback.c[column].in_(ids)
+        if recommendation_ids:
+            feedback_condition = feedback_condition | feedback.c.recommendation_id.in_(recommendation_ids)
+        rows["recommendation_feedback"] = _fetch(db, feedback, feedback_condition)
+        if table is pdf_uploads:
+            rows["pdf_analyses"] = _fetch(db, pdf_analyses, pdf_analyses.c.pdf_upload_id.in_(ids))
+        db.rollback()
+        
+        # 原始檔案移到歸檔目錄
+        files_dir = os.path.join(self.archive_dir, table_name, "files")
+        moves = []
+        for row in rows[table_name]:
+            if row["file_path"] and os.path.exists(row["file_path"]):
+                row["archived_file_path"] = os.path.join(files_dir, os.path.basename(row["file_path"]))
+                moves.append((row["file_path"], row["archived_file_path"]))
+        
+        path = self._write_archive(table_name, rows)
+        os.makedirs(files_dir, exist_ok=True)
+        
+        # 以主鍵刪除（子資料表先刪），單一短交易
+        if rows["recommendation_feedback"]:
+            db.execute(delete(feedback).where(feedback.c.id.in_([row["id"] for row in rows["recommendation_feedback"]])))
+        if recommendation_ids:
+            db.execute(delete(recommendations).where(recommendations.c.id.in_(recommendation_ids)))
+        if table is pdf_uploads:
+            db.execute(delete(pdf_analyses).where(pdf_analyses.c.pdf_upload_id.in_(ids)))
+        db.execute(delete(table).where(table.c.id.in_(ids)))
+        db.commit()
+        self._forget(table_name, rows)
+        
+        # 歸檔目錄通常在另一個磁碟區，shutil.move 跨磁碟區時改為複製後刪除；單一檔案失敗不中斷整批
+        for source, destination in moves:
+            try:
+                shutil.move(source, destination)
+            except FileNotFoundError:
+                pass  # 多筆記錄共用同一個檔案時已經移過
+            except OSError as e:
+                print(f"⚠️ 歸檔檔案搬移失敗 {source} -> {destination}: {e}")
+        archived_rows.inc(len(ids))
+        print(f"🗄️ 已歸檔 {len(ids)} 筆 {table_name}（ID {min(ids)}–{max(ids)}）至 {path}")
+        return len(ids)
+    
+    def _write_archive(self, table_name: str, rows: Dict[str, List[Dict[str, Any]]]) -> str:
+        """寫入 gzip JSON Lines 檔（先寫暫存檔再改名，重跑同一批會覆寫同一個檔案）"""
+        uploads_rows = rows[table_name]
+        month = uploads_rows[0]["created_at"].strftime("%Y-%m") if uploads_rows[0]["created_at"] else "unknown"
+        directory = os.path.join(self.archive_dir, table_name, month)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{table_name}-{uploads_rows[0]['id']}-{uploads_rows[-1]['id']}.jsonl.gz")
+        temp_path = path + ".tmp"
+        with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+            for name, table_rows in rows.items():
+                for row in table_rows:
+                    f.write(json.dumps({"table": name, "row": _serialize(row)}, ensure_ascii=False) + "\n")
+        with open(temp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        return path
+    
+    @staticmethod
+    def _forget(table_name: str, rows: Dict[str, List[Dict[str, Any]]]):
+        """清除本 worker 的總數快取與相似申請者／近似重複索引
+        （其他 worker 的總數快取於 TTL 後更新；索引查詢時排除已不存在的上傳，並於定期比對時移除）"""
+        from ..repositories.pagination import count_cache
+        for user_id in {row["user_id"] for row in rows[table_name]}:
+            count_cache.invalidate((table_name, user_id))
+        for user_id in {row["user_id"] for row in rows["recommendations"]}:
+            count_cache.invalidate(("recommendations", user_id))
+        if table_name == "pdf_uploads":
+            from .similar_applicants import applicant_index
+            from .duplicate_detection import duplicate_index
+            for row in rows[table_name]:
+                applicant_index.remove(row["id"])
+                duplicate_index.remove(row["id"])
+    
+    def _acquire_lock(self):
+        """取得歸檔檔案鎖；其他 worker 正在執行時回傳 None"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        lock = open(os.path.join(self.archive_dir, LOCK_FILE), "w")
+        try:
+            import fcntl
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except ImportError:
+            pass
+        except OSError:
+            lock.close()
+            return None
+        return lock
+    
+    def archive_next(self, table_name: str, cutoff: datetime) -> int:
+        """以獨立的連線歸檔一批，回傳筆數"""
+        db = SessionLocal()
+        try:
+            return self.archive_batch(db, table_name, cutoff)
+        finally:
+            db.close()
+    
+    def _finish(self, start: float, cutoff: datetime, archived: Dict[str, int]) -> Dict[str, Any]:
+        self.last_run = {
+            "finished_at": datetime.utcnow().isoformat(),
+            "cutoff": cutoff.isoformat(),
+            "archived": archived,
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+        return self.last_run
+    
+    def run_once(self) -> Dict[str, Any]:
+        """歸檔所有過期的上傳（分批提交，命令列使用）；其他 worker 正在執行時略過"""
+        lock = self._acquire_lock()
+        if lock is None:
+            return {"skipped": "另一個 worker 正在執行歸檔"}
+        try:
+            start = time.perf_counter()
+            cutoff = self.cutoff()
+            archived = {}
+            for table_name in UPLOAD_TABLES:
+                archived[table_name] = 0
+                while True:
+                    count = self.archive_next(table_name, cutoff)
+                    archived[table_name] += count
+                    if count < self.batch_size:
+                        break
+                    time.sleep(self.batch_pause)
+            return self._finish(start, cutoff, archived)
+        finally:
+            lock.close()
+    
+    async def run_once_async(self) -> Dict[str, Any]:
+        """同 run_once，但每批各自交給資料庫工作池、批次之間以 asyncio.sleep 暫停，不會整段佔用請求的資料庫執行緒"""
+        from .executors import run_in_db_pool
+        lock = self._acquire_lock()
+        if lock is None:
+            return {"skipped": "另一個 worker 正在執行歸檔"}
+        try:
+            start = time.perf_counter()
+            cutoff = self.cutoff()
+            archived = {}
+            for table_name in UPLOAD_TABLES:
+                archived[table_name] = 0
+                while True:
+                    count = await run_in_db_pool(self.archive_next, table_name, cutoff)
+                    archived[table_name] += count
+                    if count < self.batch_size:
+                        break
+                    await asyncio.sleep(self.batch_pause)
+            return self._finish(start, cutoff, archived)
+        finally:
+            lock.close()
+    
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once_async()
+            except Exception as e:
+                print(f"歸檔失敗: {e}")
+            await asyncio.sleep(self.interval)
+    
+    def start(self):
+        """啟動定期歸檔（RETENTION_DAYS 為 0 時不執行）"""
+        if self.enabled and self.interval > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            print(f"🗄️ 已啟用上傳記錄歸檔，保留 {self.days} 天")
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def status(self) -> Dict[str, Any]:
+        """保留設定與最近一次歸檔結果"""
+        return {
+            "enabled": self.enabled,
+            "days": self.days,
+            "batch_size": self.batch_size,
+            "archive_dir": self.archive_dir,
+            "keep_labeled": self.keep_labeled,
+            "last_run": self.last_run
+        }
+
+# 全域實例
+retention_job = RetentionJob()
+
+def main():
+    parser = argparse.ArgumentParser(description="歸檔過期的上傳記錄")
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS, help="保留天數")
+    parser.add_argument("--batch-size", type=int, default=RETENTION_BATCH_SIZE, help="每批筆數")
+    parser.add_argument("--dry-run", action="store_true", help="只計算待歸檔筆數")
+    args = parser.parse_args()
+    if args.days <= 0:
+        parser.error("需設定 --days 或 RETENTION_DAYS")
+    
+    job = RetentionJob(days=args.days, batch_size=args.batch_size)
+    if args.dry_run:
+        db = SessionLocal()
+        try:
+            print(json.dumps(job.count_candidates(db), ensure_ascii=False))
+        finally:
+            db.close()
+        return
+    print(json.dumps(job.run_once(), ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+相似申請者查詢
+每份 PDF 上傳分析完成時保存其特徵向量，並於記憶體中維護可增量更新的 k-NN 索引
+（查詢前與資料庫增量同步，見 index_sync）。
+向量以連續的 float32 矩陣保存（容量倍增），查詢為一次矩陣向量乘法的精確歐氏距離搜尋，
+10 萬筆 30 維資料單次查詢約數毫秒。
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.pdf_upload import PDFUpload
+from ..models.recommendation import Recommendation
+from ..models.feedback import RecommendationFeedback
+from .feature_schema import FeatureSchema, FEATURE_COLUMNS, SCORE_MAPPING
+from .index_sync import DatabaseSyncedIndex
+from .metrics import metrics
+
+similar_query_seconds = metrics.histogram("similar_applicants_query_seconds", "相似申請者查詢耗時（秒）")
+similar_index_size = metrics.gauge("similar_applicants_index_size", "相似申請者索引筆數")
+
+_feature_schema = FeatureSchema(FEATURE_COLUMNS)
+# 學科成績縮放到 0~1，與其他特徵同一尺度
+_column_scale = np.array(
+    [0.01 if name in SCORE_MAPPING else 1.0 for name in FEATURE_COLUMNS], dtype=np.float32
+)
+
+def extract_applicant_vector(analysis_result: Dict[str, Any]) -> bytes:
+    """將分析結果轉為特徵向量（float32 位元組，存於 PDFUpload.feature_vector）"""
+    return _feature_schema.transform(analysis_result)[0].astype(np.float32).tobytes()
+
+class ApplicantIndex(DatabaseSyncedIndex):
+    """上傳特徵向量的記憶體 k-NN 索引（執行緒安全，可增量新增與移除）"""
+    
+    column_name = "feature_vector"
+    label = "🧑‍🎓 相似申請者索引"
+    
+    def __init__(self, n_features: int = len(FEATURE_COLUMNS), initial_capacity: int = 1024):
+        super().__init__()
+        self.n_features = n_features
+        self._vectors = np.zeros((initial_capacity, n_features), dtype=np.float32)
+        self._norms = np.zeros(initial_capacity, dtype=np.float32)
+        self._ids = np.zeros(initial_capacity, dtype=np.int64)
+        self._positions: Dict[int, int] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def _decode(self, raw: bytes) -> Optional[np.ndarray]:
+        """還原特徵向量並縮放；維度不符（特徵欄位已變更）時略過"""
+        vector = np.frombuffer(raw, dtype=np.float32)
+        if vector.shape[0] != self.n_features:
+            return None
+        return vector * _column_scale
+    
+    def _grow(self, capacity: int):
+        """擴充容量"""
+        for name in ("_vectors", "_norms", "_ids"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+    
+    def add(self, upload_id: int, raw: bytes) -> bool:
+        """新增或更新一筆上傳的特徵向量"""
+        vector = self._decode(raw)
+        if vector is None:
+            return False
+        with self._lock:
+            position = self._positions.get(upload_id)
+            if position is None:
+                if self._size == len(self._ids):
+                    self._grow(len(self._ids) * 2)
+                position = self._size
+                self._size += 1
+                self._positions[upload_id] = position
+                self._ids[position] = upload_id
+            self._vectors[position] = vector
+            self._norms[position] = vector @ vector
+            similar_index_size.set(self._size)
+        return True
+    
+    def remove(self, upload_id: int):
+        """移除一筆上傳（以最後一筆填補空位）"""
+        with self._lock:
+            position = self._positions.pop(upload_id, None)
+            if position is None:
+                return
+            last = self._size - 1
+            if position != last:
+                moved_id = int(self._ids[last])
+                self._vectors[position] = self._vectors[last]
+                self._norms[position] = self._norms[last]
+                self._ids[position] = moved_id
+                self._positions[moved_id] = position
+            self._size = last
+            similar_index_size.set(self._size)
+    
+    def search(self, raw: bytes, k: int, exclude_id: Optional[int] = None) -> List[Tuple[int, float]]:
+        """找出距離最近的 k 筆上傳，回傳 [(upload_id, 距離)]"""
+        query = self._decode(raw)
+        if query is None:
+            return []
+        start = time.perf_counter()
+        with self._lock:
+            size = self._size
+            # ||x - q||^2 = ||x||^2 - 2 x·q + ||q||^2
+            distances = self._norms[:size] - 2 * (self._vectors[:size] @ query) + query @ query
+            ids = self._ids[:size].copy()
+        if exclude_id is not None:
+            distances[ids == exclude_id] = np.inf
+        k = min(k, size)
+        if k <= 0:
+            return []
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top], kind="stable")]
+        similar_query_seconds.observe(time.perf_counter() - start)
+        return [
+            (int(ids[i]), float(np.sqrt(max(distances[i], 0.0))))
+            for i in top if np.isfinite(distances[i])
+        ]
+    
+    def ids(self) -> Set[int]:
+        with self._lock:
+            return set(self._positions)
+    
+    def __len__(self) -> int:
+        return self._size
+
+# 全域實例
+applicant_index = ApplicantIndex()
+
+async def get_similar_applicants(db: AsyncSession, pdf_upload: PDFUpload, k: int = 10) -> List[Dict[str, Any]]:
+    """查詢與指定上傳相似的過往申請者，以及他們的推薦與最終選擇學系"""
+    if not pdf_upload.feature_vector:
+        return []
+    await applicant_index.sync(db)
+    neighbors = applicant_index.search(pdf_upload.feature_vector, k, exclude_id=pdf_upload.id)
+    if not neighbors:
+        return []
+    
+    # 已刪除或歸檔（其他 worker 處理）但尚未比對移除的上傳：立即自索引移除
+    existing = await applicant_index.drop_missing(db, [upload_id for upload_id, _ in neighbors])
+    neighbors = [(upload_id, distance) for upload_id, distance in neighbors if upload_id in existing]
+    neighbor_ids = [upload_id for upload_id, _ in neighbors]
+    if not neighbor_ids:
+        return []
+    
+    created = dict((await db.execute(
+        select(PDFUpload.id, PDFUpload.created_at).where(PDFUpload.id.in_(neighbor_ids))
+    )).all())
+    
+    # 各鄰居的第一名推薦與最新回饋
+    top_recommendations = dict((await db.execute(
+        select(Recommendation.pdf_upload_id, Recommendation.department).where(
+            Recommendation.pdf_upload_id.in_(neighbor_ids),
+            Recommendation.rank == 1
+        )
+    )).all())
+    chosen_departments: Dict[int, str] = {}
+    for upload_id, department in (await db.execute(
+        select(RecommendationFeedback.pdf_upload_id, RecommendationFeedback.department).where(
+            RecommendationFeedback.pdf_upload_id.in_(neighbor_ids),
+            RecommendationFeedback.department.isnot(None)
+        ).order_by(RecommendationFeedback.id)
+    )).all():
+        chosen_departments[upload_id] = department
+    
+    return [
+        {
+            "upload_id": upload_id,
+            "distance": round(distance, 4),
+            "similarity": round(1 / (1 + distance), 4),
+            "recommended_department": top_recommendations.get(upload_id),
+            "chosen_department": chosen_departments.get(upload_id),
+            "created_at": created.get(upload_id)
+        }
+        for upload_id, distance in neighbors
+    ]
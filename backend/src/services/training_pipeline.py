@@ -0,0 +1,254 @@
+"""
+學系推薦模型訓練流程
+從已儲存的上傳資料（Upload.data、PDFUpload.processed_data）與學生回饋取得標註樣本，
+將特徵矩陣以欄式格式快取在磁碟上，增量更新時只處理上次建置後新增的回饋，
+再以所有核心訓練隨機森林並輸出版本化 bundle（模型註冊表會自動熱更新）
+
+使用方式（於 backend 目錄）：
+    python -m src.services.training_pipeline            # 增量更新特徵並訓練
+    python -m src.services.training_pipeline --full     # 重建特徵快取
+    python -m src.services.training_pipeline --no-mock  # 不混入模擬資料
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from ..config import MODEL_BUNDLE_DIR, TRAINING_FEATURE_STORE_DIR
+from ..models.database import SessionLocal
+from ..models.feedback import RecommendationFeedback
+from ..models.upload import Upload
+from ..models.pdf_upload import PDFUpload
+from .feature_schema import FeatureSchema, FEATURE_COLUMNS
+
+MIN_SAMPLES_PER_CLASS = 2  # 分層切分時每個學系至少需要的樣本數
+
+class TrainingFeatureStore:
+    """欄式特徵快取：每個特徵欄一個 .npy 檔，另有標籤、樣本鍵與 manifest"""
+    
+    MANIFEST = "manifest.json"
+    
+    def __init__(self, directory: str = TRAINING_FEATURE_STORE_DIR, feature_columns: List[str] = FEATURE_COLUMNS):
+        self.directory = directory
+        self.feature_columns = list(feature_columns)
+        self.reset()
+    
+    def reset(self):
+        """清空快取內容"""
+        self.features = np.zeros((0, len(self.feature_columns)), dtype=np.float32)
+        self.labels = np.array([], dtype=str)
+        self.keys = np.array([], dtype=str)
+        self.watermark = 0  # 已處理的最大回饋 ID
+    
+    def load(self) -> bool:
+        """載入快取；不存在或特徵欄位已變更時回傳 False"""
+        manifest_path = os.path.join(self.directory, self.MANIFEST)
+        if not os.path.exists(manifest_path):
+            return False
+        
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("feature_columns") != self.feature_columns:
+            return False
+        
+        columns = [
+            np.load(self._column_path(name), mmap_mode="r") for name in self.feature_columns
+        ]
+        self.features = np.column_stack(columns).astype(np.float32)
+        self.labels = np.load(os.path.join(self.directory, "labels.npy"))
+        self.keys = np.load(os.path.join(self.directory, "keys.npy"))
+        self.watermark = manifest["watermark"]
+        return True
+    
+    def upsert(self, keys: List[str], features: np.ndarray, labels: List[str]):
+        """新增樣本；同一樣本鍵已存在時以新標籤與特徵覆蓋"""
+        if not keys:
+            return
+        
+        index = {key: i for i, key in enumerate(self.keys.tolist())}
+        all_features = self.features
+        all_labels = self.labels.astype(object)
+        new_keys, new_rows, new_labels = [], [], []
+        
+        for key, row, label in zip(keys, features, labels):
+            if key in index:
+                all_features[index[key]] = row
+                all_labels[index[key]] = label
+            else:
+                index[key] = len(self.keys) + len(new_keys)
+                new_keys.append(key)
+                new_rows.append(row)
+                new_labels.append(label)
+        
+        if new_keys:
+            all_features = np.vstack([all_features, np.asarray(new_rows, dtype=np.float32)])
+            all_labels = np.concatenate([all_labels, np.array(new_labels, dtype=object)])
+            self.keys = np.concatenate([self.keys, np.array(new_keys, dtype=str)])
+        
+        self.features = all_features
+        self.labels = all_labels.astype(str)
+    
+    def save(self):
+        """寫入磁碟，manifest 最後寫入，讀取端不會看到不完整的快取"""
+        os.makedirs(self.directory, exist_ok=True)
+        
+        for j, name in enumerate(self.feature_columns):
+            self._atomic_save(self._column_path(name), np.ascontiguousarray(self.features[:, j]))
+        self._atomic_save(os.path.join(self.directory, "labels.npy"), self.labels)
+        self._atomic_save(os.path.join(self.directory, "keys.npy"), self.keys)
+        
+        manifest = {
+            "feature_columns": self.feature_columns,
+            "row_count": int(len(self.keys)),
+            "watermark": int(self.watermark),
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+        }
+        manifest_path = os.path.join(self.directory, self.MANIFEST)
+        with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(manifest_path + ".tmp", manifest_path)
+    
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"col_{name}.npy")
+    
+    @staticmethod
+    def _atomic_save(path: str, array: np.ndarray):
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, array)
+        os.replace(path + ".tmp", path)
+
+def fetch_labeled_profiles(db: Session, after_feedback_id: int = 0) -> Tuple[List[str], List[Dict[str, Any]], List[str], int]:
+    """取得回饋 ID 大於 after_feedback_id 的標註樣本，回傳 (樣本鍵, 學生資料, 標籤, 新水位)"""
+    feedback_rows = db.query(RecommendationFeedback).filter(
+        RecommendationFeedback.id > after_feedback_id,
+        RecommendationFeedback.department.isnot(None)
+    ).order_by(RecommendationFeedback.id).all()
+    
+    if not feedback_rows:
+        return [], [], [], after_feedback_id
+    
+    upload_ids = {row.upload_id for row in feedback_rows if row.upload_id}
+    pdf_upload_ids = {row.pdf_upload_id for row in feedback_rows if row.pdf_upload_id}
+    
+    # 一次取回所有相關上傳的資料欄位
+    upload_data = dict(
+        db.query(Upload.id, Upload.data).filter(Upload.id.in_(upload_ids)).all()
+    ) if upload_ids else {}
+    pdf_data = dict(
+        db.query(PDFUpload.id, PDFUpload.processed_data).filter(PDFUpload.id.in_(pdf_upload_ids)).all()
+    ) if pdf_upload_ids else {}
+    
+    # 同一份上傳有多筆回饋時，以最新的為準
+    samples: Dict[str, Tuple[Dict[str, Any], str]] = {}
+    for row in feedback_rows:
+        if row.upload_id and upload_data.get(row.upload_id):
+            key, raw = f"upload:{row.upload_id}", upload_data[row.upload_id]
+        elif row.pdf_upload_id and pdf_data.get(row.pdf_upload_id):
+            key, raw = f"pdf:{row.pdf_upload_id}", pdf_data[row.pdf_upload_id]
+        else:
+            continue
+        
+        try:
+            samples[key] = (json.loads(raw), row.department)
+        except json.JSONDecodeError:
+            continue
+    
+    keys = list(samples.keys())
+    profiles = [samples[key][0] for key in keys]
+    labels = [samples[key][1] for key in keys]
+    return keys, profiles, labels, feedback_rows[-1].id
+
+def refresh_feature_store(db: Session, store: TrainingFeatureStore, full: bool = False) -> int:
+    """更新特徵快取，回傳本次新處理的樣本數"""
+    if full or not store.load():
+        store.reset()
+    
+    keys, profiles, labels, watermark = fetch_labeled_profiles(db, store.watermark)
+    if profiles:
+        features = FeatureSchema(store.feature_columns).transform_batch(profiles)
+        store.upsert(keys, features, labels)
+    store.watermark = watermark
+    store.save()
+    return len(profiles)
+
+def _mock_training_data(ai) -> Tuple[np.ndarray, np.ndarray]:
+    """以既有的模擬資料作為基礎樣本"""
+    mock_data = ai._generate_mock_data()
+    return np.column_stack([mock_data[col] for col in FEATURE_COLUMNS]).astype(float), mock_data["department"]
+
+def _drop_rare_classes(X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """移除樣本數不足以分層切分的學系"""
+    counts = Counter(y.tolist())
+    rare = {label for label, count in counts.items() if count < MIN_SAMPLES_PER_CLASS}
+    if not rare:
+        return X, y
+    print(f"⚠️ 樣本不足而略過的學系: {', '.join(sorted(rare))}")
+    mask = np.array([label not in rare for label in y.tolist()])
+    return X[mask], y[mask]
+
+def load_training_data(full: bool = False, include_mock: bool = True) -> Tuple[np.ndarray, np.ndarray, TrainingFeatureStore]:
+    """更新特徵快取並組出訓練用的 (X, y)"""
+    from .ai_standalone import DepartmentRecommendationAI
+    
+    store = TrainingFeatureStore()
+    db = SessionLocal()
+    try:
+        new_rows = refresh_feature_store(db, store, full=full)
+    finally:
+        db.close()
+    print(f"📦 特徵快取: {len(store.keys)} 筆（本次新增/更新 {new_rows} 筆）")
+    
+    X, y = store.features.astype(np.float64), store.labels
+    if include_mock:
+        X_mock, y_mock = _mock_training_data(DepartmentRecommendationAI(auto_load=False))
+        X, y = np.vstack([X_mock, X]), np.concatenate([y_mock.astype(str), y])
+    
+    X, y = _drop_rare_classes(X, y)
+    return X, y, store
+
+def run_training(
+    full: bool = False,
+    include_mock: bool = True,
+    bundle_dir: str = MODEL_BUNDLE_DIR,
+    params: Optional[Dict[str, Any]] = None,
+    extra_metadata: Optional[Dict[str, Any]] = None,
+    training_data: Optional[Tuple[np.ndarray, np.ndarray, TrainingFeatureStore]] = None
+) -> Optional[str]:
+    """完整訓練流程，回傳輸出的 bundle 路徑（training_data 為已載入的 load_training_data 結果時不重新載入）"""
+    from .ai_standalone import DepartmentRecommendationAI, DEFAULT_FOREST_PARAMS
+    
+    start_time = time.time()
+    X, y, store = training_data or load_training_data(full=full, include_mock=include_mock)
+    if len(set(y.tolist())) < 2:
+        print("❌ 可用的學系標籤不足，無法訓練")
+        return None
+    
+    ai = DepartmentRecommendationAI(auto_load=False)
+    accuracy = ai.fit(X, y, store.feature_columns, params)
+    path = ai.save_bundle(bundle_dir, metadata={
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "training_seconds": round(time.time() - start_time, 2),
+        "n_samples": int(len(y)),
+        "n_real_samples": int(len(store.keys)),
+        "include_mock": include_mock,
+        "feedback_watermark": int(store.watermark),
+        "accuracy": accuracy,
+        "hyperparameters": {**DEFAULT_FOREST_PARAMS, **(params or {})},
+        **(extra_metadata or {})
+    })
+    print(f"✅ 模型 bundle 已輸出: {path}")
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="訓練學系推薦模型")
+    parser.add_argument("--full", action="store_true", help="重建特徵快取")
+    parser.add_argument("--no-mock", action="store_true", help="不混入模擬資料")
+    args = parser.parse_args()
+    run_training(full=args.full, include_mock=not args.no_mock)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
 import json
 import os
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, UploadFile
 from ..models.upload import Upload
 from ..models.user import User
 from ..models.schemas import UploadResponse
+from ..repositories.pagination import Page
+from ..repositories.upload_repository import UploadRepository
+from .ai_service import AIService
+from .executors import run_in_cpu_pool, run_in_db_pool
+from .recommendation_service import RecommendationService
 
 class UploadService:
     UPLOAD_DIR = "uploads"
@@ -59,14 +66,14 @@ class UploadService:
         return file_path, filename
     
     @staticmethod
-    def create_upload_record(
-        db: Session, 
+    async def create_upload_record(
+        db: AsyncSession, 
         user_id: int, 
         filename: str, 
         file_path: str, 
         json_data: dict
     ) -> Upload:
-        """創建上傳記錄"""
+        """在目前交易中創建上傳記錄（不提交）"""
         file_size = os.path.getsize(file_path)
         
         upload = Upload(
@@ -78,28 +85,50 @@ class UploadService:
             status="completed"
         )
         
-        db.add(upload)
-        db.commit()
-        db.refresh(upload)
-        return upload
+        return await UploadRepository.insert(db, upload)
     
     @staticmethod
-    def process_upload(
-        db: Session, 
+    async def process_upload(
+        db: AsyncSession, 
         file: UploadFile, 
         current_user: User
     ) -> UploadResponse:
-        """處理檔案上傳"""
+        """處理檔案上傳並生成推薦（檔案讀寫與推論在工作池執行，上傳記錄與推薦只提交一次）"""
         # 驗證檔案
-        json_data = UploadService.validate_json_file(file)
+        json_data = await run_in_db_pool(UploadService.validate_json_file, file)
         
         # 儲存檔案
-        file_path, filename = UploadService.save_upload_file(file, current_user.id)
+        file_path, filename = await run_in_db_pool(UploadService.save_upload_file, file, current_user.id)
         
-        # 創建上傳記錄
-        upload = UploadService.create_upload_record(
-            db, current_user.id, filename, file_path, json_data
-        )
+        # 生成推薦結果（開始寫入前完成推論，交易不會等待模型）
+        ai_recommendations = []
+        try:
+            ai_recommendations = await run_in_cpu_pool(AIService.analyze_student_data, json_data)
+        except Exception as e:
+            print(f"AI 分析失敗: {e}")
+            # 即使 AI 分析失敗，上傳仍然成功（不含推薦）
+        
+        try:
+            # 創建上傳記錄
+            upload = await UploadService.create_upload_record(
+                db, current_user.id, filename, file_path, json_data
+            )
+            
+            if ai_recommendations:
+                # 推薦寫入失敗只回復到儲存點，上傳記錄照常提交
+                try:
+                    async with db.begin_nested():
+                        await RecommendationService.insert_recommendations(
+                            db, current_user.id, ai_recommendations, upload_id=upload.id
+                        )
+                except Exception as e:
+                    print(f"推薦結果儲存失敗: {e}")
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            # 上傳記錄未寫入，刪除已儲存的檔案
+            await run_in_db_pool(os.remove, file_path)
+            raise
         
         return UploadResponse(
             message="File uploaded successfully",
@@ -108,9 +137,16 @@ class UploadService:
         )
     
     @staticmethod
-    def get_user_uploads(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-        """獲取用戶上傳記錄"""
-        uploads = db.query(Upload).filter(
-            Upload.user_id == user_id
-        ).offset(skip).limit(limit).all()
-        return uploads
+    async def get_upload_by_id(db: AsyncSession, upload_id: int, user_id: int) -> Optional[Upload]:
+        """根據 ID 獲取用戶的上傳記錄（含 JSON 資料）"""
+        return await UploadRepository.get_for_user(db, upload_id, user_id, Upload.data)
+    
+    @staticmethod
+    async def get_user_uploads(db: AsyncSession, user_id: int, cursor: Optional[str] = None, limit: int = 100) -> Page:
+        """獲取用戶上傳記錄（keyset 分頁）"""
+        return await UploadRepository.list_by_user(db, user_id, cursor, limit)
+    
+    @staticmethod
+    async def count_user_uploads(db: AsyncSession, user_id: int) -> int:
+        """用戶上傳總數（快取）"""
+        return await UploadRepository.count_by_user(db, user_id)
@@ -0,0 +1,59 @@
+"""
+測試環境：主庫與唯讀副本各為一個 SQLite 檔案，放在暫存目錄
+環境變數須在匯入 src 之前設定（設定值於匯入時讀取）
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORK_DIR = tempfile.mkdtemp(prefix="resource-school-test-")
+PRIMARY_DB = os.path.join(WORK_DIR, "primary.db")
+REPLICA_DB = os.path.join(WORK_DIR, "replica.db")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{PRIMARY_DB}"
+os.environ["DATABASE_REPLICA_URL"] = f"sqlite:///{REPLICA_DB}"
+os.environ["REPLICA_MAX_LAG_SECONDS"] = "5"
+os.environ["REPLICA_LAG_CHECK_INTERVAL"] = "3600"  # 測試中手動量測延遲
+os.environ["REPLICA_STICKY_SECONDS"] = "30"
+os.environ["RETENTION_DAYS"] = "0"
+os.environ["MODEL_WATCH_INTERVAL"] = "0"
+
+sys.path.insert(0, BACKEND_DIR)
+# 上傳檔案與模型檔案寫入暫存目錄
+os.chdir(WORK_DIR)
+
+import pytest
+from alembic import command
+from alembic.config import Config
+
+
+def sync_replica():
+    """把主庫完整複製到副本（模擬複寫追上）"""
+    source = sqlite3.connect(PRIMARY_DB)
+    target = sqlite3.connect(REPLICA_DB)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+
+def _migrate():
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    command.upgrade(config, "head")
+    sync_replica()
+
+
+_migrate()
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from src.main import app
+    with TestClient(app) as test_client:
+        yield test_client
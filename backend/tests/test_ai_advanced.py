@@ -0,0 +1,72 @@
+"""向量化學系評分引擎：與原本逐一學系計分的迴圈結果相同（不含新增的描述相似度）"""
+
+import numpy as np
+import pytest
+from src.services import ai_advanced
+from src.services.ai_advanced import AdvancedAIRecommendation, DepartmentScoringEngine
+
+PROFILES = [
+    {
+        "academic_scores": {"math": 95, "physics": 88, "chinese": 70},
+        "interests": ["程式設計", "人工智慧", "程式設計", "機器人"],
+        "career_goals": "成為軟體工程師或資料科學家",
+        "achievements": ["全國程式設計競賽第一名", "科展物理組佳作"]
+    },
+    {
+        "academic_scores": {"chinese": 92, "english": 90, "social": 85},
+        "interests": ["文學", "寫作", "文學", "文學", "歷史"],
+        "career_goals": "",
+        "achievements": []
+    },
+    {
+        "academic_scores": {"biology": 93, "chemistry": 91},
+        "interests": [],
+        "career_goals": "醫師 研究員",
+        "achievements": ["生物奧林匹亞銀牌"]
+    },
+]
+
+
+def reference_score(student_data, dept_data):
+    """原本的逐一學系計分（興趣以字典彙整，重複的興趣只計一次）"""
+    scores = student_data.get("academic_scores", {})
+    required_subjects = dept_data.get("required_subjects", [])
+    if required_subjects:
+        academic = sum(scores[s] / 100 for s in required_subjects if s in scores) / len(required_subjects)
+    else:
+        academic = 0.5
+
+    keywords = dept_data["keywords"]
+    relevance = {
+        interest: sum(1 for k in keywords if k.lower() in interest.lower()) / len(keywords)
+        for interest in student_data.get("interests", [])
+    }
+    interest = np.mean(list(relevance.values())) if relevance else 0.0
+
+    career_goals = student_data.get("career_goals", "").lower()
+    career_paths = dept_data.get("career_paths", [])
+    career = 0.0
+    if career_goals and career_paths:
+        career = sum(
+            1 for path in career_paths if any(k in career_goals for k in path.lower().split())
+        ) / len(career_paths)
+
+    achievements = student_data.get("achievements", [])
+    achievement = 0.0
+    if achievements and keywords:
+        achievement = sum(
+            1 for a in achievements if any(k.lower() in a.lower() for k in keywords)
+        ) / len(achievements)
+
+    return min(1.0, max(0.0, academic * 0.4 + interest * 0.3 + career * 0.2 + achievement * 0.1))
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_matches_reference_scorer(profile, monkeypatch):
+    recommender = AdvancedAIRecommendation()
+    monkeypatch.setattr(ai_advanced, "DESCRIPTION_WEIGHT", 0.0)
+    engine = DepartmentScoringEngine(
+        recommender.departments_data, recommender.vectorizer, recommender.department_vectors
+    )
+    expected = [reference_score(profile, dept) for dept in recommender.departments_data.values()]
+    np.testing.assert_allclose(engine.score(profile), expected, atol=1e-9)
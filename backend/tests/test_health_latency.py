@@ -0,0 +1,71 @@
+"""處理大型 PDF 時事件迴圈不被阻塞：上傳進行中輪詢 /health，延遲須維持在低檔"""
+
+import threading
+import time
+
+# 上傳期間 /health 單次回應的延遲上限（秒）
+HEALTH_LATENCY_BOUND = 0.5
+
+
+def build_pdf(pages: int, lines_per_page: int = 50) -> bytes:
+    """產生每頁多行文字的 PDF"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        text = b"BT /F1 10 Tf 40 800 Td 12 TL " + b" ".join(
+            b"(Page %d line %d: math 95 physics 90 programming robotics research) '" % (page, line)
+            for line in range(lines_per_page)
+        ) + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(text), text))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), pages)
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+def login(client, username):
+    client.post("/api/auth/register", json={"username": username, "password": "secret"})
+    token = client.post("/api/auth/login", json={"username": username, "password": "secret"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_health_stays_fast_during_large_pdf_upload(client):
+    headers = login(client, "health-latency")
+    pdf = build_pdf(pages=15)
+    result = {}
+
+    def upload():
+        result["response"] = client.post(
+            "/api/upload/pdf", headers=headers, files={"file": ("large.pdf", pdf, "application/pdf")}
+        )
+
+    uploader = threading.Thread(target=upload)
+    started = time.perf_counter()
+    uploader.start()
+    latencies = []
+    while uploader.is_alive():
+        start = time.perf_counter()
+        assert client.get("/health").status_code == 200
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.05)
+    uploader.join()
+    upload_seconds = time.perf_counter() - started
+
+    assert result["response"].status_code == 200, result["response"].text
+    assert result["response"].json()["page_count"] == 15
+    # 上傳期間確實輪詢了多次，且每次都沒有等到上傳完成
+    assert len(latencies) >= 5, (len(latencies), upload_seconds)
+    assert max(latencies) < HEALTH_LATENCY_BOUND, (max(latencies), upload_seconds)
@@ -0,0 +1,108 @@
+"""記憶體索引與資料庫同步：其他 worker 新增或刪除的上傳在下一次查詢時反映"""
+
+import uuid
+import numpy as np
+import pytest
+from src.models.database import AsyncSessionLocal, SessionLocal
+from src.models.pdf_upload import PDFUpload
+from src.models.user import User
+from src.services.duplicate_detection import compute_minhash, find_near_duplicates
+from src.services.feature_schema import FEATURE_COLUMNS
+from src.services.index_sync import DatabaseSyncedIndex
+from src.services.similar_applicants import applicant_index, get_similar_applicants
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user_id(db):
+    user = User(username=f"index-sync-{uuid.uuid4().hex[:8]}", password_hash="x")
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def insert_upload(db, user_id, **columns):
+    """直接寫入資料庫（模擬另一個 worker 的上傳，本 worker 的索引不會收到 add）"""
+    upload = PDFUpload(user_id=user_id, filename="a.pdf", file_path="a.pdf", status="completed", **columns)
+    db.add(upload)
+    db.commit()
+    return upload
+
+
+def delete_upload(db, upload):
+    db.delete(upload)
+    db.commit()
+
+
+def run(client, func, *args):
+    """以請求用的 AsyncSession 在應用程式的事件迴圈中執行"""
+    async def call():
+        async with AsyncSessionLocal() as session:
+            return await func(session, *args)
+    return client.portal.call(call)
+
+
+def similar_ids(client, target):
+    return {n["upload_id"] for n in run(client, get_similar_applicants, target)}
+
+
+def duplicate_ids(client, target):
+    return {match["upload_id"] for match in run(client, find_near_duplicates, target)}
+
+
+def vector(value):
+    return np.full(len(FEATURE_COLUMNS), value, dtype=np.float32).tobytes()
+
+
+def test_similar_applicants_sees_other_workers_uploads(client, db, user_id):
+    target = insert_upload(db, user_id, feature_vector=vector(1.0))
+    first = insert_upload(db, user_id, feature_vector=vector(1.0))
+    assert first.id in similar_ids(client, target)
+
+    second = insert_upload(db, user_id, feature_vector=vector(1.0))
+    assert second.id in similar_ids(client, target)
+
+    delete_upload(db, first)
+    assert first.id not in similar_ids(client, target)
+    assert first.id not in applicant_index.ids()
+
+
+def test_reconcile_removes_deleted_uploads(client, db, user_id):
+    upload = insert_upload(db, user_id, feature_vector=vector(2.0))
+    run(client, applicant_index.sync)
+    assert upload.id in applicant_index.ids()
+
+    delete_upload(db, upload)
+    run(client, applicant_index.reconcile)
+    assert upload.id not in applicant_index.ids()
+
+
+def test_near_duplicates_sees_other_workers_uploads(client, db, user_id):
+    signature = compute_minhash("這是一份用來測試近似重複偵測的備審資料，內容完全相同。" * 5)
+    target = insert_upload(db, user_id, minhash_signature=signature)
+    duplicate_ids(client, target)
+
+    copy = insert_upload(db, user_id, minhash_signature=signature)
+    assert copy.id in duplicate_ids(client, target)
+
+    delete_upload(db, copy)
+    assert copy.id not in duplicate_ids(client, target)
+
+
+def test_subclass_must_implement_index_methods():
+    class Incomplete(DatabaseSyncedIndex):
+        column_name = "feature_vector"
+
+        def add(self, upload_id, raw):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
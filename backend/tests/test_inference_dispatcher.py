@@ -0,0 +1,30 @@
+"""推論微批次派發器：單一批次出錯時只讓該批失敗，派發執行緒繼續運作"""
+
+import numpy as np
+import pytest
+from src.services.inference_dispatcher import InferenceDispatcher
+
+
+def predict(features):
+    return [[("系", float(row.sum()))] for row in features]
+
+
+def test_mismatched_rows_fail_only_their_batch():
+    dispatcher = InferenceDispatcher(max_wait_ms=200, max_batch=8)
+    # 同一批中欄數不同，合併（vstack）失敗
+    first = dispatcher.submit(predict, np.ones(3))
+    second = dispatcher.submit(predict, np.ones(4))
+    with pytest.raises(ValueError):
+        first.result(timeout=5)
+    with pytest.raises(ValueError):
+        second.result(timeout=5)
+
+    assert dispatcher.submit(predict, np.ones(3)).result(timeout=5) == [[("系", 3.0)]]
+
+
+def test_bad_results_do_not_stop_the_dispatcher():
+    dispatcher = InferenceDispatcher(max_wait_ms=1, max_batch=8)
+    with pytest.raises(TypeError):
+        dispatcher.submit(lambda features: None, np.ones(3)).result(timeout=5)
+
+    assert dispatcher.submit(predict, np.ones(2)).result(timeout=5) == [[("系", 2.0)]]
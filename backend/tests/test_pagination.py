@@ -0,0 +1,43 @@
+"""推薦列表 keyset 分頁：同分的資料列跨頁時不會遺漏或重複"""
+
+from sqlalchemy import Double
+from src.models.database import SessionLocal
+from src.models.recommendation import Recommendation
+
+
+def login(client, username):
+    client.post("/api/auth/register", json={"username": username, "password": "secret"})
+    token = client.post("/api/auth/login", json={"username": username, "password": "secret"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_score_is_double_precision():
+    # MySQL 的 FLOAT 為單精度，游標中的 0.853 與儲存的 0.85300004 比較不相等
+    assert isinstance(Recommendation.__table__.c.score.type, Double)
+
+
+def test_pages_through_tied_scores(client):
+    headers = login(client, "tied-scores")
+    user_id = client.get("/api/auth/me", headers=headers).json()["id"]
+    scores = [0.9, 0.853, 0.853, 0.853, 0.853, 0.853, 0.853, 0.853, 0.5, 0.5]
+    db = SessionLocal()
+    try:
+        rows = [Recommendation(user_id=user_id, department=f"系 {i}", score=score) for i, score in enumerate(scores)]
+        db.add_all(rows)
+        db.commit()
+        expected = [row.id for row in sorted(rows, key=lambda row: (-row.score, -row.id))]
+    finally:
+        db.close()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get(f"/api/recommendation/{user_id}", headers=headers, params=params).json()
+        seen.extend(item["id"] for item in page["recommendations"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == expected
@@ -0,0 +1,15 @@
+"""推薦引擎註冊表：延遲百分位數（最近秩法）"""
+
+import math
+from src.services.recommender_registry import _percentile
+
+
+def test_percentile_uses_nearest_rank():
+    for n in range(1, 50):
+        values = [float(i) for i in range(1, n + 1)]
+        for q in (0.5, 0.95, 0.99):
+            assert _percentile(values, q) == values[math.ceil(q * n) - 1], (n, q)
+
+
+def test_percentile_of_empty_list():
+    assert _percentile([], 0.5) is None
@@ -0,0 +1,114 @@
+"""唯讀副本路由：延遲過高時改讀主庫、寫入後讀到自己的資料（兩個 SQLite 檔案模擬主庫與副本）"""
+
+import sqlite3
+import time
+from conftest import REPLICA_DB, sync_replica
+from src.services.replica_routing import STICKY_HEADER, primary_reads, replica_reads, replica_router
+
+SAMPLE_PROFILE = b'{"personal_info": {"name": "test"}, "academic_scores": {"math": 95, "physics": 90}, "interests": ["programming"]}'
+
+
+def check_lag(client):
+    client.portal.call(replica_router.check_lag)
+
+
+def replica_caught_up(client):
+    """寫入新心跳後複製到副本，量得的延遲接近 0"""
+    check_lag(client)
+    sync_replica()
+    check_lag(client)
+    assert replica_router.replica_healthy(), replica_router.status()
+
+
+def reads(client, method, *args, **kwargs):
+    """執行請求並回傳 (回應, 讀副本次數, 讀主庫次數)"""
+    replica_before, primary_before = replica_reads.value, primary_reads.value
+    response = getattr(client, method)(*args, **kwargs)
+    return response, replica_reads.value - replica_before, primary_reads.value - primary_before
+
+
+def login(client, username):
+    client.post("/api/auth/register", json={"username": username, "password": "secret"})
+    token = client.post("/api/auth/login", json={"username": username, "password": "secret"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def forget_writes(client):
+    """清除本 worker 的寫入紀錄與 Cookie，模擬下一個請求由另一個 worker 處理"""
+    replica_router._recent_writes.clear()
+    client.cookies.clear()
+
+
+def test_reads_replica_when_caught_up(client):
+    replica_caught_up(client)
+    forget_writes(client)
+    response, replica, primary = reads(client, "get", "/api/resources")
+    assert response.status_code == 200
+    assert (replica, primary) == (1, 0)
+
+
+def test_falls_back_to_primary_when_lag_exceeds_threshold(client):
+    replica_caught_up(client)
+    forget_writes(client)
+
+    # 副本停在 60 秒前的心跳
+    replica = sqlite3.connect(REPLICA_DB)
+    replica.execute("UPDATE replication_heartbeat SET beat_ms = ? WHERE id = 1", (int((time.time() - 60) * 1000),))
+    replica.commit()
+    replica.close()
+    check_lag(client)
+
+    status = replica_router.status()
+    assert status["lag_seconds"] >= 60 and not status["healthy"]
+    response, replica, primary = reads(client, "get", "/api/resources")
+    assert response.status_code == 200
+    assert (replica, primary) == (0, 1)
+
+
+def test_lag_is_not_under_reported(client):
+    """副本的心跳比門檻舊時一定判定為延遲過高（不與上一次心跳比較）"""
+    replica_caught_up(client)
+    replica = sqlite3.connect(REPLICA_DB)
+    replica.execute(
+        "UPDATE replication_heartbeat SET beat_ms = ? WHERE id = 1",
+        (int((time.time() - replica_router.max_lag - 1) * 1000),)
+    )
+    replica.commit()
+    replica.close()
+    check_lag(client)
+    assert replica_router.lag_seconds > replica_router.max_lag
+    assert not replica_router.replica_healthy()
+
+
+def test_reads_own_upload_on_another_worker(client):
+    headers = login(client, "replica-user")
+    replica_caught_up(client)
+    forget_writes(client)
+
+    # 上傳只寫入主庫，副本沒有這筆資料
+    upload = client.post("/api/upload", headers=headers, files={"file": ("profile.json", SAMPLE_PROFILE, "application/json")})
+    assert upload.status_code == 200, upload.text
+    last_write = upload.headers[STICKY_HEADER]
+    forget_writes(client)
+
+    # 沒有帶回寫入時間：讀副本，看不到剛上傳的推薦
+    response, replica, primary = reads(client, "get", "/api/recommendation/me/latest", headers=headers)
+    assert response.status_code == 200
+    assert (replica, primary) == (1, 0)
+    assert response.json()["recommendations"] == []
+
+    # 帶回寫入時間（前端保存的 X-DB-Last-Write）：改讀主庫
+    response, replica, primary = reads(
+        client, "get", "/api/recommendation/me/latest", headers={**headers, STICKY_HEADER: last_write}
+    )
+    assert response.status_code == 200
+    assert (replica, primary) == (0, 1)
+    assert response.json()["recommendations"]
+
+
+def test_login_marks_write_without_authorization_header(client):
+    client.post("/api/auth/register", json={"username": "login-user", "password": "secret"})
+    forget_writes(client)
+    response = client.post("/api/auth/login", json={"username": "login-user", "password": "secret"})
+    assert response.status_code == 200
+    assert STICKY_HEADER in response.headers
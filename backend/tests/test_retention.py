@@ -0,0 +1,49 @@
+"""上傳記錄歸檔：原始檔案搬到另一個磁碟區的歸檔目錄"""
+
+import asyncio
+import errno
+import os
+from datetime import datetime
+from src.models.database import SessionLocal
+from src.models.upload import Upload
+from src.models.user import User
+from src.services.retention import RetentionJob
+
+
+def test_archives_files_across_volumes(tmp_path, monkeypatch):
+    db = SessionLocal()
+    try:
+        user = User(username="retention-exdev", password_hash="x")
+        db.add(user)
+        db.commit()
+        file_path = tmp_path / "old.json"
+        file_path.write_text("{}")
+        upload = Upload(user_id=user.id, filename="old.json", file_path=str(file_path), data="{}",
+                        status="completed", created_at=datetime(2000, 1, 1))
+        db.add(upload)
+        db.commit()
+        upload_id = upload.id
+    finally:
+        db.close()
+
+    # 搬到歸檔檔案目錄時 rename 失敗（EXDEV，跨磁碟區），必須改為複製後刪除
+    def cross_device(original):
+        def rename(source, destination, *args, **kwargs):
+            if os.sep + "files" + os.sep in str(destination):
+                raise OSError(errno.EXDEV, "Invalid cross-device link")
+            return original(source, destination, *args, **kwargs)
+        return rename
+
+    monkeypatch.setattr(os, "rename", cross_device(os.rename))
+    monkeypatch.setattr(os, "replace", cross_device(os.replace))
+    job = RetentionJob(days=365, batch_size=10, archive_dir=str(tmp_path / "archive"), batch_pause=0)
+    result = asyncio.run(job.run_once_async())
+
+    assert result["archived"]["uploads"] >= 1
+    assert not file_path.exists()
+    assert (tmp_path / "archive" / "uploads" / "files" / "old.json").read_text() == "{}"
+    db = SessionLocal()
+    try:
+        assert db.get(Upload, upload_id) is None
+    finally:
+        db.close()
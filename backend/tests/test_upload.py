@@ -0,0 +1,39 @@
+"""JSON 上傳：推論失敗時仍保存上傳記錄（不含推薦）"""
+
+import json
+import os
+from src.models.database import SessionLocal
+from src.models.recommendation import Recommendation
+from src.models.upload import Upload
+from src.services.ai_service import AIService
+
+SAMPLE_PROFILE = {"personal_info": {"name": "test"}, "academic_scores": {"math": 95, "physics": 90}, "interests": ["programming"]}
+
+
+def login(client, username):
+    client.post("/api/auth/register", json={"username": username, "password": "secret"})
+    token = client.post("/api/auth/login", json={"username": username, "password": "secret"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_upload_is_stored_when_inference_fails(client, monkeypatch):
+    def fail(student_data):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(AIService, "analyze_student_data", staticmethod(fail))
+    headers = login(client, "inference-failure")
+    response = client.post(
+        "/api/upload", headers=headers,
+        files={"file": ("profile.json", json.dumps(SAMPLE_PROFILE).encode("utf-8"), "application/json")}
+    )
+    assert response.status_code == 200, response.text
+
+    upload_id = response.json()["upload_id"]
+    db = SessionLocal()
+    try:
+        upload = db.get(Upload, upload_id)
+        assert upload is not None and upload.status == "completed"
+        assert os.path.exists(upload.file_path)
+        assert db.query(Recommendation).filter(Recommendation.upload_id == upload_id).count() == 0
+    finally:
+        db.close()
@@ -61,6 +61,11 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    // 帶回最近一次寫入的時間，後端在複寫完成前改讀主庫（讀到自己剛上傳的資料）
+    const lastWrite = localStorage.getItem('dbLastWrite');
+    if (lastWrite) {
+      config.headers['X-DB-Last-Write'] = lastWrite;
+    }
     return config;
   },
   (error) => {
@@ -71,6 +76,10 @@ api.interceptors.request.use(
 // 響應攔截器
 api.interceptors.response.use(
   (response) => {
+    const lastWrite = response.headers['x-db-last-write'];
+    if (lastWrite) {
+      localStorage.setItem('dbLastWrite', lastWrite);
+    }
     return response;
   },
   (error) => {
@@ -143,8 +152,8 @@ export class ApiService {
   // 資源管理 API (原有的)
   static async getResources(): Promise<Resource[]> {
     try {
-      const response: AxiosResponse<Resource[]> = await api.get('/resources');
-      return response.data;
+      const response: AxiosResponse<{ resources: Resource[]; next_cursor: string | null }> = await api.get('/resources');
+      return response.data.resources;
     } catch (error: any) {
       throw new Error(error.response?.data?.message || '獲取資源失敗');
     }